@@ -0,0 +1,59 @@
+"""
+Compare the precompiled indicator engine against the original
+one-regex-pass-per-pattern loop on the PDFs in DATA_DIR.
+
+    python -m bench.extraction
+"""
+import os
+import time
+
+import regex as re
+
+from src.config import settings
+from src.extraction.indicators import NORMALIZERS, PATTERNS, extract_many
+
+
+def reference_extract(text: str) -> list[dict]:
+    """The original extract_indicators loop, kept as the ground truth."""
+    found: list[dict] = []
+    for typ, pat in PATTERNS:
+        for m in re.finditer(pat, text, flags=re.IGNORECASE):
+            raw = m.group(0)
+            norm = NORMALIZERS.get(typ, lambda x: x)(raw)
+            found.append({"type": typ, "value": norm, "confidence": 0.9})
+    key = {(x['type'], x['value']): x for x in found}
+    return list(key.values())
+
+
+def load_chunk_texts() -> list[str]:
+    from src.ingest.ingest import ingest_pdf
+    from src.preprocessing.chunking import chunk_text
+
+    texts = []
+    for name in sorted(os.listdir(settings.data_dir)):
+        if name.lower().endswith(".pdf"):
+            docs = ingest_pdf(os.path.join(settings.data_dir, name))
+            texts.extend(c["text"] for c in chunk_text(docs, doc_id=name))
+    return texts
+
+
+def main(repeat: int = 5):
+    texts = load_chunk_texts()
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        expected = [reference_extract(t) for t in texts]
+    ref_s = (time.perf_counter() - t0) / repeat
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        got = extract_many(texts)
+    new_s = (time.perf_counter() - t0) / repeat
+
+    assert got == expected, "engine output differs from the reference loop"
+    print(f"chunks={len(texts)} reference={ref_s * 1000:.1f}ms engine={new_s * 1000:.1f}ms "
+          f"speedup={ref_s / new_s:.2f}x identical=True")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Concurrent mixed-traffic load test against a running API.
+
+    python -m bench.load_api --url http://localhost:8000 --concurrency 32 --seconds 30
+
+Prints p50/p95/p99 latency per route and overall. Requires a populated graph.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+# (weight, path) -- heavy network traversals mixed with cheap reads
+MIX = [
+    (4, "/health"),
+    (3, "/search?q=Russian+disinformation+targeting+France&k=5"),
+    (3, "/indicators/domain"),
+    (2, "/context/t.me"),
+    (1, "/network/t.me?hops=2"),
+    (1, "/test/clusters"),
+]
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+async def worker(client: httpx.AsyncClient, deadline: float, samples: dict, errors: dict):
+    paths = [p for w, p in MIX for _ in range(w)]
+    while time.perf_counter() < deadline:
+        path = random.choice(paths)
+        route = path.split("?")[0]
+        t0 = time.perf_counter()
+        try:
+            r = await client.get(path)
+            ok = r.status_code < 500
+        except httpx.HTTPError:
+            ok = False
+        samples.setdefault(route, []).append((time.perf_counter() - t0) * 1000)
+        if not ok:
+            errors[route] = errors.get(route, 0) + 1
+
+
+async def run(url: str, concurrency: int, seconds: float) -> dict:
+    samples: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    deadline = time.perf_counter() + seconds
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        await asyncio.gather(*(worker(client, deadline, samples, errors) for _ in range(concurrency)))
+
+    report = {}
+    for route, ms in sorted(samples.items()) + [("ALL", [v for vs in samples.values() for v in vs])]:
+        report[route] = {
+            "n": len(ms),
+            "errors": errors.get(route, sum(errors.values()) if route == "ALL" else 0),
+            "p50_ms": round(percentile(ms, 50), 2),
+            "p95_ms": round(percentile(ms, 95), 2),
+            "p99_ms": round(percentile(ms, 99), 2),
+        }
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="http://localhost:8000")
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--seconds", type=float, default=30)
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = ap.parse_args()
+
+    report = asyncio.run(run(args.url, args.concurrency, args.seconds))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for route, r in report.items():
+        print(f"{route:28s} n={r['n']:6d} err={r['errors']:4d} "
+              f"p50={r['p50_ms']:8.2f}ms p95={r['p95_ms']:8.2f}ms p99={r['p99_ms']:8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Cold-start timings for the API process:
+
+    python -m bench.startup            # import + first /health
+    python -m bench.startup --warmup   # also time driver + model warmup
+"""
+import sys
+import time
+
+
+def main(warmup: bool = False):
+    t0 = time.perf_counter()
+    from fastapi.testclient import TestClient
+
+    from src.api.api import app
+    import_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with TestClient(app) as client:
+        assert client.get("/health").json() == {"ok": True}
+        health_s = time.perf_counter() - t0
+        print(f"import={import_s:.3f}s first_health={health_s:.3f}s")
+        if warmup:
+            from src import registry
+
+            print("warmup", registry.warmup())
+
+
+if __name__ == "__main__":
+    main(warmup="--warmup" in sys.argv)
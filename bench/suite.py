@@ -0,0 +1,342 @@
+"""
+Reproducible benchmark suite over the synthetic corpus (bench.corpus).
+
+For each corpus size it times chunk_text, extract_indicators,
+Embedder.embed, the graph bulk-write path of one document
+(chunks, indicators, co-mentions, campaign summary) and every API read route
+(through the ASGI app, response cache off). Results are written as JSON, and
+can be compared against a stored baseline: a stage regresses when its median
+is more than `threshold` slower and at least `min_delta_ms` slower.
+
+    python -m bench.suite run --sizes 10,50,200 --out .cache/bench/results.json
+    python -m bench.suite run --update-baseline                   # store this run as the baseline
+    python -m bench.suite run --baseline bench/baseline.json      # run, then compare (exit 1 on regressions)
+    python -m bench.suite compare .cache/bench/results.json bench/baseline.json
+
+Graph writes and reads go to GRAPH_BACKEND; the embedded in-memory backend is
+the default here so runs are self-contained (`--backend neo4j` for the live one,
+which should then be a scratch database). Stages whose dependencies are not
+installed (e.g. sentence-transformers for embed and /search) are reported as
+skipped.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from bench.corpus import make_corpus
+from src.config import settings
+from src.storage.graph_db import EMBED_DIM
+
+DEFAULT_SIZES = (10, 50, 200)
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), "..", ".cache", "bench", "results.json")
+
+
+# ---------- timing ----------
+def _measure(fn, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - t0) * 1000)
+    runs.sort()
+    return {
+        "median_ms": round(statistics.median(runs), 3),
+        "p95_ms": round(runs[min(len(runs) - 1, int(round(0.95 * (len(runs) - 1))))], 3),
+        "min_ms": round(runs[0], 3),
+        "runs": repeat,
+    }
+
+
+def _record(results: list, name: str, size: int, fn, repeat: int, items: int = None):
+    try:
+        row = {"name": name, "size": size, **_measure(fn, repeat)}
+    except ImportError as e:
+        row = {"name": name, "size": size, "skipped": f"{type(e).__name__}: {e}"}
+    if items is not None:
+        row["items"] = items
+        if "median_ms" in row and row["median_ms"]:
+            row["items_per_s"] = round(items / row["median_ms"] * 1000, 1)
+    results.append(row)
+    shown = f"{row['median_ms']:10.2f} ms" if "median_ms" in row else f"skipped ({row['skipped']})"
+    print(f"  {name:40s} {shown}", flush=True)
+
+
+# ---------- stages ----------
+def _chunk(corpus) -> dict:
+    from src.preprocessing.chunking import chunk_text
+
+    return {r.doc_id: chunk_text(r.documents(), doc_id=r.doc_id) for r in corpus}
+
+
+def _fake_vectors(chunks: list[dict], seed: int) -> list[list[float]]:
+    """Deterministic unit vectors, so graph stages do not depend on the embedding model."""
+    rng = np.random.default_rng(seed)
+    v = rng.standard_normal((len(chunks), EMBED_DIM)).astype(np.float32)
+    return (v / np.linalg.norm(v, axis=1, keepdims=True)).tolist()
+
+
+class _FixedEmbedder:
+    """Stands in for Embedder in write_prepared, returning the precomputed vectors."""
+
+    def __init__(self, chunks: list[dict], vectors: list[list[float]]):
+        self.by_text = {c["text"]: v for c, v in zip(chunks, vectors)}
+
+    def embed_array(self, texts: list[str]) -> np.ndarray:
+        return np.asarray([self.by_text[t] for t in texts], dtype=np.float32)
+
+
+def write_document(graph, report, chunks: list[dict], vectors: list[list[float]]):
+    """One new document through the pipeline's own write path (src.pipeline.write_prepared)."""
+    from src.extraction.indicators import extract_for_chunks
+    from src.pipeline import write_prepared
+
+    found = {}
+    for page_no, text in enumerate(report.pages):
+        extract_for_chunks(text, [c for c in chunks if c["page"] == page_no], found)
+    prepared = {
+        "doc_id": report.doc_id,
+        "path": f"{report.doc_id}.pdf",
+        "chunks": chunks,
+        "indicators": list(found.values()),
+        "prepare_s": 0.0,
+    }
+    write_prepared(graph, _FixedEmbedder(chunks, vectors), prepared, campaign=report.campaign)
+
+
+def _load(graph, corpus, chunks: dict, vectors: dict):
+    graph.init_schema()
+    for r in corpus:
+        write_document(graph, r, chunks[r.doc_id], vectors[r.doc_id])
+
+
+def _embed(texts: list[str]):
+    from src.embedding.cache import EmbeddingCache
+    from src.embedding.nlp import Embedder
+
+    embedder = Embedder(cache=EmbeddingCache(max_entries=len(texts) + 1))
+    embedder.embed(texts[:1])  # model load is not part of the measurement
+
+    def run():
+        embedder.cache = EmbeddingCache(max_entries=len(texts) + 1)  # cold cache every run
+        embedder.embed(texts)
+
+    return run
+
+
+def _read_routes(corpus) -> list[tuple[str, str]]:
+    """(name, path) per API read route, with parameters that hit data in this corpus."""
+    counts = {}
+    for r in corpus:
+        for v in r.planted.get("domain", ()):
+            counts[v] = counts.get(v, 0) + 1
+    hub = max(sorted(counts), key=counts.get)  # the most reused domain
+    a, b = sorted({r.campaign for r in corpus})[:2]
+    return [
+        ("GET /search", "/search?q=inauthentic+accounts+impersonating+media&k=10"),
+        ("GET /indicators/{typ}", "/indicators/domain?limit=100"),
+        ("GET /indicators/{typ} ndjson", "/indicators/domain?format=ndjson"),
+        ("GET /context/{indicator}", f"/context/{hub}"),
+        ("GET /relationships/{indicator}", f"/relationships/{hub}?hops=2"),
+        ("GET /network/{indicator}", f"/network/{hub}?hops=2"),
+        ("GET /campaigns/overlaps", "/campaigns/overlaps"),
+        ("GET /campaigns/shared", f"/campaigns/shared?a={a}&b={b}"),
+        ("GET /test/clusters", "/test/clusters"),
+        ("GET /test/across-campaigns", "/test/across-campaigns"),
+        ("GET /test/timeline", f"/test/timeline?value={hub}"),
+    ]
+
+
+def run_size(n_docs: int, repeat: int, seed: int, embed_limit: int, results: list):
+    from src import registry
+    from src.extraction.indicators import extract_indicators
+    from src.storage.backend import create_graph
+
+    print(f"docs={n_docs}", flush=True)
+    corpus = make_corpus(n_docs, seed=seed)
+    chunks = _chunk(corpus)
+    texts = [c["text"] for cs in chunks.values() for c in cs]
+    vectors = {doc_id: _fake_vectors(cs, seed + i) for i, (doc_id, cs) in enumerate(chunks.items())}
+
+    _record(results, "chunk_text", n_docs, lambda: _chunk(corpus), repeat, items=len(texts))
+
+    _record(results, "extract_indicators", n_docs, lambda: [extract_indicators(t) for t in texts], repeat,
+            items=len(texts))
+
+    sample = texts[:embed_limit]
+    try:
+        embed = _embed(sample)
+    except ImportError as e:
+        results.append({"name": "Embedder.embed", "size": n_docs, "skipped": f"{type(e).__name__}: {e}"})
+        print(f"  {'Embedder.embed':40s} skipped ({e})")
+    else:
+        _record(results, "Embedder.embed", n_docs, embed, 1, items=len(sample))
+
+    def write_all():
+        g = create_graph()
+        try:
+            _load(g, corpus, chunks, vectors)
+        finally:
+            g.close()
+
+    _record(results, "graph.write_documents", n_docs, write_all, repeat, items=n_docs)
+
+    # reads: populate the shared graph once, then drive the app in-process
+    from fastapi.testclient import TestClient
+
+    from src.api.api import app
+
+    registry.shutdown()
+    routes = _read_routes(corpus)
+    try:
+        _load(registry.get_graph(), corpus, chunks, vectors)
+    except ImportError as e:  # the write path imports the embedding model
+        for name, _ in routes:
+            results.append({"name": name, "size": n_docs, "skipped": f"{type(e).__name__}: {e}"})
+        print(f"  {'read routes':40s} skipped ({e})")
+        return
+    with TestClient(app) as client:
+        for name, path in routes:
+            def get(path=path):
+                r = client.get(path)
+                if r.status_code >= 400:
+                    raise RuntimeError(f"GET {path} -> {r.status_code}: {r.text[:200]}")
+            try:
+                get()  # warm-up
+            except ImportError:
+                pass  # recorded as skipped below
+            except RuntimeError as e:
+                results.append({"name": name, "size": n_docs, "error": str(e)})
+                print(f"  {name:40s} error ({e})")
+                continue
+            _record(results, name, n_docs, get, repeat)
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes=DEFAULT_SIZES, repeat: int = 5, seed: int = 0, backend: str = "embedded",
+        embed_limit: int = 256) -> dict:
+    settings.graph_backend = backend
+    if backend == "embedded":
+        settings.embedded_db_path = ""  # fresh in-memory store per graph
+    settings.response_cache_size = 0  # time the routes, not the cache
+    settings.warmup_on_startup = False
+    results = []
+    for n in sizes:
+        run_size(n, repeat, seed, embed_limit, results)
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "commit": _git_commit(),
+            "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+            "backend": backend, "sizes": list(sizes), "repeat": repeat, "seed": seed,
+        },
+        "results": results,
+    }
+
+
+# ---------- comparison ----------
+def compare(current: dict, baseline: dict, threshold: float = 0.25, min_delta_ms: float = 1.0) -> list[dict]:
+    """One row per (name, size) with status ok / regression / improved / new / missing / skipped."""
+    def key(r):
+        return r["name"], r["size"]
+
+    base = {key(r): r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        b = base.pop(key(r), None)
+        row = {"name": r["name"], "size": r["size"], "median_ms": r.get("median_ms")}
+        if "median_ms" not in r:
+            row["status"] = "skipped"
+        elif b is None or "median_ms" not in b:
+            row["status"] = "new"
+        else:
+            ratio = r["median_ms"] / b["median_ms"] if b["median_ms"] else float("inf")
+            delta = r["median_ms"] - b["median_ms"]
+            row.update(baseline_ms=b["median_ms"], ratio=round(ratio, 3))
+            if ratio > 1 + threshold and delta >= min_delta_ms:
+                row["status"] = "regression"
+            elif ratio < 1 / (1 + threshold) and -delta >= min_delta_ms:
+                row["status"] = "improved"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    rows += [{"name": n, "size": s, "status": "missing"} for n, s in base]
+    return rows
+
+
+def print_comparison(rows: list[dict]) -> int:
+    for r in rows:
+        detail = f"{r['baseline_ms']:10.2f} -> {r['median_ms']:10.2f} ms  x{r['ratio']:.2f}" if "ratio" in r else ""
+        print(f"{r['status']:>10}  {r['name']:40s} docs={r['size']:<6} {detail}")
+    regressions = sum(r["status"] == "regression" for r in rows)
+    print(f"{regressions} regression(s)")
+    return regressions
+
+
+def _write(report: dict, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {path}")
+
+
+def _require_baseline(ap: argparse.ArgumentParser, path: str):
+    """Fail before a long run when there is nothing to compare against; no baseline is committed."""
+    if not os.path.exists(path):
+        ap.error(f"no baseline at {path}; store one first with `python -m bench.suite run --update-baseline`")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run")
+    r.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="corpus sizes in documents")
+    r.add_argument("--repeat", type=int, default=5)
+    r.add_argument("--seed", type=int, default=0)
+    r.add_argument("--backend", choices=("embedded", "neo4j"), default="embedded")
+    r.add_argument("--embed-limit", type=int, default=256, help="chunks embedded per size")
+    r.add_argument("--out", default=RESULTS_PATH)
+    r.add_argument("--baseline", help="compare against this results file afterwards")
+    r.add_argument("--update-baseline", action="store_true", help=f"also store the run as {BASELINE_PATH}")
+    for p in (r, c := sub.add_parser("compare")):
+        p.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown ratio")
+        p.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore smaller absolute slowdowns")
+    c.add_argument("current")
+    c.add_argument("baseline", nargs="?", default=BASELINE_PATH)
+    args = ap.parse_args(argv)
+    baseline_arg = args.baseline if args.cmd == "compare" or not args.update_baseline else None
+    if baseline_arg:
+        _require_baseline(ap, baseline_arg)
+
+    if args.cmd == "run":
+        report = run([int(s) for s in args.sizes.split(",")], args.repeat, args.seed, args.backend, args.embed_limit)
+        _write(report, args.out)
+        if args.update_baseline:
+            _write(report, BASELINE_PATH)
+        if not args.baseline:
+            return 0
+        current, baseline_path = report, args.baseline
+    else:
+        with open(args.current) as f:
+            current = json.load(f)
+        baseline_path = args.baseline
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    return 1 if print_comparison(compare(current, baseline, args.threshold, args.min_delta_ms)) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
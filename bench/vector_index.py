@@ -0,0 +1,145 @@
+"""
+Local vector tier vs. brute force (recall / latency) on a synthetic corpus,
+and vs. Neo4j's native chunk_vec index on the live graph. `quant` reports
+recall vs. memory for float / float16 / int8 storage, on the graph's
+embeddings when `live` is given.
+
+    python -m bench.vector_index synthetic [n]
+    python -m bench.vector_index live
+    python -m bench.vector_index quant [live]
+"""
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from src.config import settings
+from src.embedding.quantize import MODES, embedding_props
+from src.storage.graph_db import EMBED_DIM
+from src.storage.vector_index import LocalVectorIndex, _normalize
+
+
+class _ArrayGraph:
+    """Just enough of Graph for LocalVectorIndex.build()."""
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    def iter_chunk_embeddings(self, ids=None):
+        for i, v in enumerate(self.vectors):
+            yield f"c{i}", v
+
+
+def _timed(fn, queries) -> tuple[list, float]:
+    t0 = time.perf_counter()
+    out = [fn(q) for q in queries]
+    return out, (time.perf_counter() - t0) / len(queries) * 1000
+
+
+def _corpus(n: int, n_queries: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    # clustered data, closer to sentence embeddings than uniform noise
+    centers = _normalize(rng.standard_normal((256, EMBED_DIM)).astype(np.float32))
+    noise = 1 / np.sqrt(EMBED_DIM)  # per-dimension scale for a unit-norm perturbation
+    vectors = _normalize(centers[rng.integers(0, 256, n)] + 0.8 * noise * rng.standard_normal((n, EMBED_DIM)).astype(np.float32))
+    queries = _normalize(vectors[rng.integers(0, n, n_queries)] + 0.3 * noise * rng.standard_normal((n_queries, EMBED_DIM)).astype(np.float32))
+    return vectors, queries
+
+
+def _prop_bytes(props: dict) -> int:
+    """Approximate store payload: 8 bytes per list float, raw length for byte arrays."""
+    total = 0
+    for v in props.values():
+        if isinstance(v, list):
+            total += 8 * len(v)
+        elif isinstance(v, bytes):
+            total += len(v)
+        elif v is not None:
+            total += 8
+    return total
+
+
+def synthetic(n: int = 50_000, k: int = 10, n_queries: int = 200):
+    vectors, queries = _corpus(n, n_queries)
+
+    with tempfile.TemporaryDirectory() as d:
+        index = LocalVectorIndex(d)
+        t0 = time.perf_counter()
+        info = index.build(_ArrayGraph(vectors))
+        print(f"build: {info} in {time.perf_counter() - t0:.2f}s")
+
+        exact, exact_ms = _timed(lambda q: set(np.argpartition(-(vectors @ q), k)[:k]), queries)
+        print(f"brute force: {exact_ms:.2f} ms/query")
+        for nprobe in (1, 4, 8, 16, 32):
+            got, ms = _timed(lambda q: index.search(q, k, nprobe=nprobe), queries)
+            recall = np.mean([
+                len(e & {int(cid[1:]) for cid, _ in g}) / k for e, g in zip(exact, got)
+            ])
+            print(f"ivf nprobe={nprobe:>2}: {ms:.2f} ms/query  recall@{k}={recall:.3f}")
+
+
+def live(k: int = 10, n_queries: int = 50):
+    from src.storage.graph_db import Graph
+
+    g = Graph()
+    try:
+        index = LocalVectorIndex()
+        if not index.load():
+            print("building local index:", index.build(g))
+        sample = [e for _, e in zip(range(n_queries), g.iter_chunk_embeddings())]
+        queries = [list(map(float, e)) for e in sample]
+
+        native, native_ms = _timed(lambda q: g.vector_search(q, k), queries)
+        g.local_index = index
+        local, local_ms = _timed(lambda q: g.vector_search(q, k), queries)
+        recall = np.mean([
+            len({c["id"] for c in a} & {c["id"] for c in b}) / k for a, b in zip(native, local)
+        ])
+        print(f"native chunk_vec: {native_ms:.2f} ms/query")
+        print(f"local tier (incl. hydration): {local_ms:.2f} ms/query  overlap@{k}={recall:.3f}")
+    finally:
+        g.close()
+
+
+def quantization(use_graph: bool = False, k: int = 10, n_queries: int = 200):
+    if use_graph:
+        from src.storage.graph_db import Graph
+
+        g = Graph()
+        try:
+            vectors = _normalize(np.stack([e for _, e in g.iter_chunk_embeddings()]))
+        finally:
+            g.close()
+        rng = np.random.default_rng(0)
+        queries = vectors[rng.choice(len(vectors), min(n_queries, len(vectors)), replace=False)]
+    else:
+        vectors, queries = _corpus(50_000, n_queries)
+    k = min(k, len(vectors))
+    exact = [set(np.argpartition(-(vectors @ q), k - 1)[:k]) for q in queries]
+    print(f"{len(vectors)} vectors, {len(queries)} queries, brute force (no IVF) to isolate quantization")
+
+    settings.vector_index_min_ivf = len(vectors) + 1
+    for mode in MODES:
+        settings.vector_index_quantization = mode
+        with tempfile.TemporaryDirectory() as d:
+            index = LocalVectorIndex(d)
+            index.build(_ArrayGraph(vectors))
+            scanned = index._state.codes if index._state.codes is not None else index._state.vectors
+            graph_b = _prop_bytes(embedding_props(vectors[0], "float" if mode == "float" else "packed"))
+            line = f"{mode:>7}: scan {scanned.itemsize * EMBED_DIM:>4} B/vec, graph ~{graph_b:>4} B/chunk"
+            for rescore in ((1, settings.vector_index_rescore) if mode != "float" else (1,)):
+                got, ms = _timed(lambda q: index.search(q, k, rescore=rescore), queries)
+                recall = np.mean([len(e & {int(cid[1:]) for cid, _ in g}) / k for e, g in zip(exact, got)])
+                line += f" | rescore x{rescore}: recall@{k}={recall:.3f} {ms:.2f} ms"
+            print(line)
+
+
+if __name__ == "__main__":
+    mode = sys.argv[1] if len(sys.argv) > 1 else "synthetic"
+    if mode == "quant":
+        quantization(use_graph=sys.argv[2:] == ["live"])
+    elif mode == "live":
+        live()
+    else:
+        synthetic(int(sys.argv[2]) if len(sys.argv) > 2 else 50_000)
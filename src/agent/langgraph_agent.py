@@ -1,4 +1,5 @@
 import re
+import time
 from typing_extensions import TypedDict
 from typing import Any
 
@@ -6,6 +7,7 @@ from langgraph.graph import StateGraph, START
 
 from src.agent.tools import *
 from src.extraction.indicators import extract_indicators
+from src.metrics import AGENT_ROUTE_SECONDS
 
 class AgentState(TypedDict):
     query: str
@@ -21,10 +23,19 @@ def detect_indicator(q: str) -> bool:
     return any(regex.search(q) for regex in (RE_URL, RE_IP, RE_EMAIL, RE_SOCIAL))
 
 def router_fn(state: AgentState):
+    t0 = time.perf_counter()
+    action = "error"
+    try:
+        out = _route(state)
+        action = out["action"]
+        return out
+    finally:
+        AGENT_ROUTE_SECONDS.observe(time.perf_counter() - t0, action)
+
+def _route(state: AgentState):
     q = state["query"].lower()
     ind_present = detect_indicator(state["query"])
     if "cluster" in q: 
-        print("cluster search")
         res = tool_clusters_by_handle()
         return {"action": "clusters", "query": state["query"], "result": res}
     # elif "campaign" in q: 
@@ -32,7 +43,6 @@ def router_fn(state: AgentState):
     #     res = tool_across_campaigns()
     #     return {"action": "across", "query": state["query"], "result": res}
     elif "timeline" in q:
-        print("timeline router")
         value = q.replace("timeline", "").strip()
         res = tool_timeline(value) 
         return {"action": "timeline", "query":state["query"], "result": res}
@@ -43,7 +53,6 @@ def router_fn(state: AgentState):
     # elif "relationship" in q: 
     #     return {"action": "relationships", "indicator": q}
     elif ind_present or "context" in q: 
-        print("indicator look route")
         # grab only the indicator
         # values:list = extract_indicators(q)
         if "context" in q:
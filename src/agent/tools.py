@@ -1,12 +1,8 @@
 from typing import Any
 
-from src.embedding.nlp import Embedder
-from src.storage.graph_db import Graph
-from src.queries import across_campaigns, clusters_by_handle, timeline
-
-# Singleton-ish reuse across tool calls
-_GRAPH = Graph()
-_EMB = Embedder()
+from src.queries import (across_campaigns, clusters_by_handle, shared_indicators,
+                         timeline)
+from src.registry import get_embedder, get_graph
 
 
 def tool_search(query: str, k: int = 10) -> list[dict[str, Any]]:
@@ -14,54 +10,61 @@ def tool_search(query: str, k: int = 10) -> list[dict[str, Any]]:
     Hybrid RAG search over chunks in Neo4j using keyword + embeddings.
     Returns [{id, text, _score}, ...]
     """
-    vec = _EMB.embed([query])[0]
-    return _GRAPH.hybrid_search(query, vec, k=k)
+    vec = get_embedder().embed_query(query)
+    return get_graph().hybrid_search(query, vec, k=k)
 
 
 def tool_context(indicator_value: str) -> list[dict[str, Any]]:
     """
     Context snippets (chunk text + doc id + confidence + ts) for an Indicator.
     """
-    return _GRAPH.context_for_indicator(indicator_value)
+    return get_graph().context_for_indicator(indicator_value)
 
 
 def tool_relationships(indicator: str, hops: int = 1) -> list[dict[str, Any]]:
     """
     Related indicators/documents up to N hops.
     """
-    return _GRAPH.relationships(indicator, hops=hops)
+    return get_graph().relationships(indicator, hops=hops)
 
 
 def tool_network(indicator: str, hops: int = 2) -> dict[str, Any]:
     """
     Small neighborhood network: {nodes: [...], links: [...]}
     """
-    return _GRAPH.network(indicator, hops=hops)
+    return get_graph().network(indicator, hops=hops)
 
 
 def tool_clusters_by_handle() -> list[dict[str, Any]]:
     """
     Social handle co-mention clusters (edge list).
     """
-    return clusters_by_handle(_GRAPH)
+    return clusters_by_handle(get_graph())
 
 
 def tool_across_campaigns() -> list[dict[str, Any]]:
     """
     Indicators that appear across multiple campaigns.
     """
-    return across_campaigns(_GRAPH)
+    return across_campaigns(get_graph())
+
+
+def tool_shared_indicators(campaign_a: str, campaign_b: str) -> list[dict[str, Any]]:
+    """
+    Indicators shared by two campaigns.
+    """
+    return shared_indicators(get_graph(), campaign_a, campaign_b)
 
 
 def tool_timeline(indicator_or_handle: str) -> list[dict[str, Any]]:
     """
     Timeline (ts + evidence) for an indicator/handle.
     """
-    return timeline(_GRAPH, indicator_or_handle)
+    return timeline(get_graph(), indicator_or_handle)
 
 
 def tool_indicator_lookup(typ: str) -> list[str]:
     """
     Lookup distinct indicator values by type (domain, ip, url, email, social:*, phone, ...).
     """
-    return _GRAPH.indicator_lookup(typ)
+    return get_graph().indicator_lookup(typ)
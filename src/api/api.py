@@ -1,30 +1,110 @@
-from fastapi import APIRouter, FastAPI, Query
+import json
+import os
+import time
+from contextlib import asynccontextmanager
 
-from src.embedding.nlp import Embedder
-from src.pipeline import run_pipeline
-from src.queries import (across_campaigns, clusters_by_handle, graph_two_hop,
-                         timeline)
-from src.storage.graph_db import Graph
+from fastapi import APIRouter, FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Match
 
-# Initialize Neo4j + Embeddings
-_graph = Graph()
-_graph.init_schema()
-_embedder = Embedder()
+from src import metrics, registry
+from src.config import settings
+from src.jobs.manager import JobConflict
+from src.models.models import IngestRequest
+from src.queries import (across_campaigns, campaign_overlaps, clusters_by_handle,
+                         graph_two_hop, shared_indicators, timeline)
+from src.registry import (get_async_graph, get_embedder, get_inference_pool,
+                          get_job_manager, get_response_cache)
+from src.storage.graph_db import VectorIndexUnavailable
+from src.storage.traversal import page
 
 # Define router
 router = APIRouter()
 
+
+# Routes never block the event loop: graph reads go through the async driver,
+# embedding and other CPU-bound calls through the bounded inference pool.
+async def _graph():
+    g = get_async_graph()
+    await g.ensure_schema()
+    return g
+
+
+async def _embed_query(q: str) -> list[float]:
+    return await get_inference_pool().run(lambda: get_embedder().embed_query(q))
+
+
 # -- running pipeline --
+def _submit_ingest(req: IngestRequest):
+    root = os.path.realpath(settings.data_dir)
+    data_dir = os.path.realpath(os.path.join(root, req.data_dir or ""))
+    if os.path.commonpath([root, data_dir]) != root or not os.path.isdir(data_dir):
+        raise HTTPException(status_code=400, detail=f"unknown data_dir {req.data_dir!r}")
+    try:
+        return get_job_manager().submit(data_dir=data_dir, force=req.force, workers=req.workers)
+    except JobConflict as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "jobId": e.job.id})
+
+
 @router.get("/start_pipeline")
 async def pipeline():
-    run_pipeline()
-    return  {"Message": "Pipeline ran successfully."}
+    """Kept for old clients: starts a background ingest job and returns at once."""
+    job = _submit_ingest(IngestRequest())
+    return {"Message": "Pipeline started.", "jobId": job.id}
+
+
+# ---------- Ingestion jobs ----------
+@router.post("/jobs/ingest", status_code=202)
+async def start_ingest(req: IngestRequest = None):
+    """
+        Queue an ingestion run over DATA_DIR (or a sub-directory of it).
+        Returns 409 if a run for the same directory is queued or running.
+    """
+    return _submit_ingest(req or IngestRequest()).to_dict()
+
+
+@router.get("/jobs")
+async def list_jobs():
+    return {"jobs": [j.to_dict() for j in get_job_manager().list()]}
+
+
+@router.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Per-document progress, chunks/s throughput and errors of a job."""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job.to_dict()
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued job, or stop a running one before its next document."""
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job.to_dict()
 
 # ---------- Health ----------
 @router.get("/health")
 async def health():
     return {"ok": True}
 
+# ---------- Cache stats ----------
+@router.get("/stats/cache")
+async def cache_stats():
+    """Hit/miss counters of the query-vector, embedding and response caches."""
+    stats = await get_inference_pool().run(lambda: get_embedder().stats())
+    if settings.response_cache_size:
+        stats["responses"] = get_response_cache().stats()
+    return stats
+
+# ---------- Metrics ----------
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus text exposition; everything is formatted here, at scrape time."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # ---------- Search ----------
 @router.get("/search")
 async def search(q: str = Query(...), k: int = 10):
@@ -32,8 +112,9 @@ async def search(q: str = Query(...), k: int = 10):
     performs hybrid search: vector + keyword; rank by combined score
     example queries: What Russian disinformation campaigns target France?
     """
-    vec = _embedder.embed([q])[0]
-    results = _graph.hybrid_search(q, vec, k=k)
+    vec = await _embed_query(q)
+    g = await _graph()
+    results = await g.hybrid_search(q, vec, k=k)
     return {
         "results": [
             {"chunkId": r.get("id"), "text": r.get("text"), "score": r.get("_score")}
@@ -43,14 +124,42 @@ async def search(q: str = Query(...), k: int = 10):
 
 # ---------- Indicators ----------
 @router.get("/indicators/{typ}")
-async def indicators(typ: str):
+async def indicators(
+    typ: str,
+    rank_by: str | None = None,
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1, le=10_000),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
     """
-        Lookup indicators by type.
+        Lookup indicators by type, one keyset page at a time.
 
         Args:
             typ: e.g. 'domain', 'ip', 'phone'
+            rank_by: 'pagerank' or 'degree' to list the most central first
+                (scores from `python -m src.analytics.graph_analytics`)
+            cursor: `next_cursor` of the previous page
+            limit: page size (default INDICATOR_PAGE_SIZE)
+            format: 'ndjson' streams every remaining indicator, one JSON
+                object per line, straight from the Neo4j result
     """
-    return {"results": _graph.indicator_lookup(typ)}
+    g = await _graph()
+    try:
+        if format == "ndjson":
+            rows = g.stream_indicators(typ, cursor=cursor, rank_by=rank_by)
+            first = await anext(rows, None)  # surfaces query/cursor errors before streaming starts
+            return StreamingResponse(_ndjson(first, rows), media_type="application/x-ndjson")
+        return await g.indicator_page(typ, cursor=cursor, limit=limit, rank_by=rank_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def _ndjson(first, rows):
+    if first is None:
+        return
+    yield json.dumps(first) + "\n"
+    async for row in rows:
+        yield json.dumps(row) + "\n"
 
 
 @router.get("/context/{indicator}")
@@ -61,62 +170,121 @@ async def context(indicator: str):
         Args:
             value: indicator value
     """
-    return {"context": _graph.context_for_indicator(indicator)}
+    g = await _graph()
+    return {"context": await g.context_for_indicator(indicator)}
 
 
 # ---------- Relationships & Network ----------
 @router.get("/relationships/{indicator}")
-async def rels(indicator: str, hops: int = 1):
+async def rels(
+    indicator: str,
+    hops: int = Query(1, ge=1, le=settings.traversal_max_hops),
+    types: list[str] | None = Query(None),
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1, le=1000),
+):
     """
-        Explore related indicators up to N hops.
+        Explore related indicators up to N hops, paged.
 
         Args:
             value: indicator value
             hops: traversal depth
+            types: relationship types to follow (default: MENTIONED_IN, RELATED_TO, PART_OF_CAMPAIGN)
+            cursor: `next_cursor` of the previous page
     """
-    return {"related": _graph.relationships(indicator, hops=hops)}
+    g = await _graph()
+    try:
+        related, next_cursor = page((await g.traverse(indicator, hops, types)).related(), cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"related": related, "next_cursor": next_cursor}
 
 
 @router.get("/network/{indicator}")
-async def network(indicator: str, hops: int = 2):
+async def network(
+    indicator: str,
+    hops: int = Query(2, ge=1, le=settings.traversal_max_hops),
+    types: list[str] | None = Query(None),
+    fanout: int | None = Query(None, ge=1),
+    max_nodes: int | None = Query(None, ge=1),
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1, le=1000),
+):
     """
         Return network graph of indicators around a given indicator.
 
         Args:
             value: indicator value
             hops: traversal depth (default: 2)
+            types: relationship types to follow
+            fanout / max_nodes: lowered caps (the configured ones are the ceiling)
+            cursor: `next_cursor` of the previous page
         Returns:
-            dict with 'nodes' and 'links' suitable for visualization
+            dict with distinct 'nodes' and 'links' suitable for visualization,
+            'truncated' when a budget cut the traversal short, and 'next_cursor'
     """
-    return _graph.network(indicator, hops=hops)
+    g = await _graph()
+    try:
+        return await g.network(indicator, hops, types, fanout, max_nodes, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ---------- Campaign overlap ----------
+@router.get("/campaigns/overlaps")
+async def overlaps(campaign: str | None = None, limit: int = Query(100, ge=1, le=1000)):
+    """
+        Campaign pairs ranked by the number of indicators they share.
+
+        Args:
+            campaign: only pairs involving this campaign
+    """
+    g = await _graph()
+    return {"overlaps": await campaign_overlaps(g, campaign, limit)}
+
+
+@router.get("/campaigns/shared")
+async def shared(a: str, b: str, limit: int = Query(500, ge=1, le=10_000)):
+    """
+        Indicators shared by campaigns `a` and `b`.
+    """
+    g = await _graph()
+    return {"a": a, "b": b, "indicators": await shared_indicators(g, a, b, limit)}
 
 
 # ---------- Assignment Test Queries ----------
 @router.get("/test/semantic")
 async def q_semantic():
     q = "What Russian disinformation campaigns target France?"
-    vec = _embedder.embed([q])[0]
-    return {"results": _graph.hybrid_search(q, vec, k=10)}
+    vec = await _embed_query(q)
+    g = await _graph()
+    return {"results": await g.hybrid_search(q, vec, k=10)}
 
 @router.get("/test/lookup/doppelgaenger")
 async def q_lookup():
-    return {"domains": _graph.indicator_lookup("domain")}
+    g = await _graph()
+    page = await g.indicator_page("domain")
+    return {"domains": page["results"], "next_cursor": page["next_cursor"]}
 
 @router.get("/test/twohop")
 async def q_twohop(value: str):
-    return {"twoHop": graph_two_hop(_graph, value)}
+    g = await _graph()
+    return {"twoHop": await graph_two_hop(g, value)}
 
 @router.get("/test/clusters")
 async def q_clusters():
-    return {"clusters": clusters_by_handle(_graph)}
+    g = await _graph()
+    return {"clusters": await clusters_by_handle(g)}
 
 @router.get("/test/across-campaigns")
 async def q_across():
-    return {"indicators": across_campaigns(_graph)}
+    g = await _graph()
+    return {"indicators": await across_campaigns(g)}
 
 @router.get("/test/timeline")
 async def q_timeline(value: str):
-    return {"timeline": timeline(_graph, value)}
+    g = await _graph()
+    return {"timeline": await timeline(g, value)}
 
 # langgraph agent
 from src.agent.langgraph_agent import agent
@@ -124,10 +292,58 @@ from src.agent.langgraph_agent import agent
 @router.get("/agent")
 async def agent_query(q: str):
     state = {"query": q}
-    res = agent.invoke(state)
+    res = await get_inference_pool().run(agent.invoke, state)
     return {"query": q, "answer": res.get("result")}
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Graph driver and models are built lazily; optionally warm them up
+    # in the background so /health answers immediately.
+    if settings.warmup_on_startup:
+        registry.warmup_in_background()
+    yield
+    await registry.ashutdown()
+    registry.shutdown()
+
+
 # Main FastAPI app
-app = FastAPI(title="Threat Intel Pipeline RAG ")
+app = FastAPI(title="Threat Intel Pipeline RAG ", lifespan=lifespan)
 app.include_router(router)
+
+
+@app.exception_handler(VectorIndexUnavailable)
+async def vector_index_unavailable(request, exc: VectorIndexUnavailable):
+    """Any vector search route while compact storage has no local index yet."""
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
+@app.middleware("http")
+async def response_cache(request, call_next):
+    """Serve cacheable GET routes from the graph-version-aware response cache."""
+    if not settings.response_cache_size:
+        return await call_next(request)
+    return await get_response_cache()(request, call_next)
+
+
+def _route_template(request) -> str:
+    """The matched route's path template, so label values stay bounded."""
+    route = request.scope.get("route")
+    if route is None:  # answered before routing, e.g. from the response cache
+        route = next((r for r in request.app.router.routes if r.matches(request.scope)[0] == Match.FULL), None)
+    return getattr(route, "path", "unmatched")
+
+
+@app.middleware("http")
+async def request_metrics(request, call_next):
+    """Latency and status counts per route; registered last, so it times the cache too."""
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = _route_template(request)
+        metrics.HTTP_REQUEST_SECONDS.observe(time.perf_counter() - t0, request.method, route)
+        metrics.HTTP_REQUESTS.inc(request.method, route, str(status))
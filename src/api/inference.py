@@ -0,0 +1,29 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from src.metrics import INFERENCE_IN_FLIGHT
+
+
+class InferencePool:
+    """
+    Bounded executor for CPU-bound work (embedding, agent runs) called from
+    async routes. At most `workers` jobs run and at most `max_pending` are
+    admitted at once; further callers wait without blocking the event loop.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        self._sem = asyncio.Semaphore(max_pending)
+        self.in_flight = 0
+        INFERENCE_IN_FLIGHT.set_function(lambda: self.in_flight)
+
+    async def run(self, fn, *args):
+        async with self._sem:
+            self.in_flight += 1  # only touched on the event loop
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+            finally:
+                self.in_flight -= 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,109 @@
+import hashlib
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Read routes whose answers only change when the graph does
+CACHED_PREFIXES = (
+    "/indicators/", "/context/", "/relationships/", "/network/", "/campaigns/",
+    "/test/clusters", "/test/across-campaigns", "/test/lookup/",
+)
+STREAMED_TYPES = ("application/x-ndjson",)
+
+
+class ResponseCache:
+    """
+    LRU cache of GET response bodies keyed by path and sorted query string,
+    bounded by entry count and by total body bytes. Every entry carries the
+    graph version it was computed at. Nothing is invalidated explicitly:
+    writes bump the version, after which older entries simply miss. The
+    version is read from the graph at most once per `version_ttl_s`, so a
+    cache hit may serve a body up to `version_ttl_s` older than the latest
+    write.
+
+    ETags are derived from (version, key). A client revalidating with
+    If-None-Match gets a 304 without the route running, even when its
+    entry has been evicted; revalidation always re-reads the version, so a
+    304 is never sent for data that has since changed.
+    """
+
+    def __init__(self, graph, max_entries: int = 1024, version_ttl_s: float = 2.0,
+                 max_bytes: int = 64 << 20, prefixes: tuple = CACHED_PREFIXES):
+        self.graph = graph  # AsyncGraph
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version_ttl_s = version_ttl_s
+        self.prefixes = prefixes
+        self._entries: OrderedDict[str, tuple[int, bytes, str]] = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._version_at = 0.0
+        self._stats = {"hits": 0, "misses": 0, "not_modified": 0, "evictions": 0}
+
+    def cacheable(self, request: Request) -> bool:
+        return request.method == "GET" and request.url.path.startswith(self.prefixes)
+
+    @staticmethod
+    def key(request: Request) -> str:
+        return request.url.path + "?" + urlencode(sorted(request.query_params.multi_items()))
+
+    async def version(self, fresh: bool = False) -> int:
+        now = time.monotonic()
+        if fresh or self._version is None or now - self._version_at > self.version_ttl_s:
+            self._version, self._version_at = await self.graph.version(), now
+        return self._version
+
+    @staticmethod
+    def etag(version: int, key: str) -> str:
+        return f'W/"{version}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"'
+
+    async def __call__(self, request: Request, call_next):
+        """Starlette HTTP middleware."""
+        if not self.cacheable(request):
+            return await call_next(request)
+        key = self.key(request)
+        if_none_match = request.headers.get("if-none-match")
+        version = await self.version(fresh=bool(if_none_match))
+        etag = self.etag(version, key)
+        headers = {"ETag": etag, "X-Graph-Version": str(version)}
+        if if_none_match and etag in (t.strip() for t in if_none_match.split(",")):
+            self._stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return Response(entry[1], media_type=entry[2], headers={**headers, "X-Cache": "hit"})
+
+        self._stats["misses"] += 1
+        response = await call_next(request)
+        media_type = response.headers.get("content-type", "application/json")
+        if response.status_code != 200 or media_type.startswith(STREAMED_TYPES):
+            return response  # streams are passed through, never buffered
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        if len(body) <= self.max_bytes:
+            self._put(key, (version, body, media_type))
+        return Response(body, status_code=200, media_type=media_type, headers={**headers, "X-Cache": "miss"})
+
+    def _put(self, key: str, entry: tuple[int, bytes, str]):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old[1])
+        self._entries[key] = entry
+        self._bytes += len(entry[1])
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, body, _) = self._entries.popitem(last=False)
+            self._bytes -= len(body)
+            self._stats["evictions"] += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        self._version = None
+
+    def stats(self) -> dict:
+        return {**self._stats, "entries": len(self._entries), "bytes": self._bytes, "version": self._version}
@@ -13,6 +13,55 @@ class Settings(BaseSettings):
     m_embed_model: str = Field(default="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2", alias="MULTILINGUAL_EMBED_MODEL")
     chunk_size: int = Field(default=500, alias="CHUNK_SIZE")
     chunk_overlap: int = Field(default=50, alias="CHUNK_OVERLAP")
+    write_batch_size: int = Field(default=500, alias="WRITE_BATCH_SIZE")
+    ingest_workers: int = Field(default=1, alias="INGEST_WORKERS")
+    ingest_queue_size: int = Field(default=0, alias="INGEST_QUEUE_SIZE")  # 0 -> 2 * workers
+    stream_ingest: bool = Field(default=False, alias="STREAM_INGEST")
+    stream_batch_size: int = Field(default=64, alias="STREAM_BATCH_SIZE")
+    stream_queue_depth: int = Field(default=2, alias="STREAM_QUEUE_DEPTH")
+    embed_batch_size: int = Field(default=32, alias="EMBED_BATCH_SIZE")
+    query_cache_size: int = Field(default=1024, alias="QUERY_CACHE_SIZE")
+    embed_cache_size: int = Field(default=10_000, alias="EMBED_CACHE_SIZE")
+    embed_cache_path: str = Field(  # empty -> memory only
+        default=os.path.join(os.path.dirname(__file__), "..", ".cache", "embeddings.sqlite"), alias="EMBED_CACHE_PATH"
+    )
+    embed_cache_disk_max: int = Field(default=1_000_000, alias="EMBED_CACHE_DISK_MAX")
+    inference_workers: int = Field(default=2, alias="INFERENCE_WORKERS")
+    inference_max_pending: int = Field(default=64, alias="INFERENCE_MAX_PENDING")
+    job_workers: int = Field(default=1, alias="JOB_WORKERS")
+    hybrid_overfetch: int = Field(default=4, alias="HYBRID_OVERFETCH")  # candidates per side = k * overfetch
+    rrf_k: int = Field(default=60, alias="RRF_K")
+    embed_storage: str = Field(default="float", alias="EMBED_STORAGE")  # float | packed (local index only)
+    vector_index_enabled: bool = Field(default=False, alias="VECTOR_INDEX_ENABLED")
+    vector_index_dir: str = Field(
+        default=os.path.join(os.path.dirname(__file__), "..", ".cache", "vector_index"), alias="VECTOR_INDEX_DIR"
+    )
+    vector_index_nprobe: int = Field(default=8, alias="VECTOR_INDEX_NPROBE")
+    vector_index_min_ivf: int = Field(default=4096, alias="VECTOR_INDEX_MIN_IVF")  # below this, brute force
+    vector_index_rebuild_ratio: float = Field(default=0.2, alias="VECTOR_INDEX_REBUILD_RATIO")
+    vector_index_quantization: str = Field(default="float", alias="VECTOR_INDEX_QUANTIZATION")  # float | float16 | int8
+    vector_index_rescore: int = Field(default=4, alias="VECTOR_INDEX_RESCORE")  # exact rescoring of k * this candidates
+    traversal_max_hops: int = Field(default=3, alias="TRAVERSAL_MAX_HOPS")
+    traversal_fanout: int = Field(default=25, alias="TRAVERSAL_FANOUT")  # neighbors kept per node per hop
+    traversal_scan_limit: int = Field(default=1000, alias="TRAVERSAL_SCAN_LIMIT")  # relationships read per node per hop
+    traversal_max_nodes: int = Field(default=500, alias="TRAVERSAL_MAX_NODES")
+    traversal_timeout_s: float = Field(default=5.0, alias="TRAVERSAL_TIMEOUT_S")
+    traversal_page_size: int = Field(default=200, alias="TRAVERSAL_PAGE_SIZE")
+    # comma-separated type prefixes materialized as CO_MENTIONED; * -> all
+    co_mention_types: str = Field(default="social:", alias="CO_MENTION_TYPES")
+    response_cache_size: int = Field(default=1024, alias="RESPONSE_CACHE_SIZE")  # 0 disables
+    response_cache_max_bytes: int = Field(default=64 << 20, alias="RESPONSE_CACHE_MAX_BYTES")  # total cached body bytes
+    # how stale a cache hit may be after a write
+    response_cache_version_ttl_s: float = Field(default=2.0, alias="RESPONSE_CACHE_VERSION_TTL_S")
+    indicator_page_size: int = Field(default=1000, alias="INDICATOR_PAGE_SIZE")
+    # records per driver round trip when streaming
+    indicator_fetch_size: int = Field(default=2000, alias="INDICATOR_FETCH_SIZE")
+    graph_backend: str = Field(default="neo4j", alias="GRAPH_BACKEND")  # neo4j | embedded
+    embedded_db_path: str = Field(  # empty -> memory only
+        default=os.path.join(os.path.dirname(__file__), "..", ".cache", "graph.sqlite"), alias="EMBEDDED_DB_PATH"
+    )
+    warmup_on_startup: bool = Field(default=False, alias="WARMUP_ON_STARTUP")
+    warmup_models: bool = Field(default=True, alias="WARMUP_MODELS")
     data_dir:str = Field(os.path.join(os.path.dirname(__file__), "..", "data"), alias='DATA_DIR')
 
 settings = Settings()
\ No newline at end of file
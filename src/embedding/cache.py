@@ -0,0 +1,185 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+from src.config import settings
+
+
+def cache_key(model_name: str, text: str) -> str:
+    """sha256 over the model name and the NFC, whitespace-collapsed text."""
+    norm = " ".join(unicodedata.normalize("NFC", text).split())
+    return hashlib.sha256(f"{model_name}\x00{norm}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier vector cache: an in-memory LRU in front of an optional SQLite
+    file holding float32 blobs. Both tiers are bounded; the disk tier evicts
+    least recently used rows once it grows past `disk_max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 10_000, path: str = None, disk_max_entries: int = 1_000_000):
+        self.max_entries = max_entries
+        self.disk_max_entries = disk_max_entries
+        self._mem: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._puts = 0
+        self._stats = {"mem_hits": 0, "disk_hits": 0, "misses": 0, "mem_evictions": 0, "disk_evictions": 0}
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, vec BLOB NOT NULL, atime REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_atime ON embeddings(atime)")
+            self._db.commit()
+
+    @classmethod
+    def from_settings(cls) -> "EmbeddingCache":
+        return cls(
+            max_entries=settings.embed_cache_size,
+            path=settings.embed_cache_path or None,
+            disk_max_entries=settings.embed_cache_disk_max,
+        )
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        found: dict[str, np.ndarray] = {}
+        with self._lock:
+            missing = []
+            for k in keys:
+                v = self._mem.get(k)
+                if v is None:
+                    missing.append(k)
+                else:
+                    self._mem.move_to_end(k)
+                    found[k] = v
+            self._stats["mem_hits"] += len(found)
+
+            if missing and self._db is not None:
+                for i in range(0, len(missing), 500):  # stay under SQLite's variable limit
+                    part = missing[i:i + 500]
+                    rows = self._db.execute(
+                        f"SELECT key, vec FROM embeddings WHERE key IN ({','.join('?' * len(part))})", part
+                    ).fetchall()
+                    for k, blob in rows:
+                        v = np.frombuffer(blob, dtype=np.float32)
+                        found[k] = v
+                        self._remember(k, v)
+                    if rows:
+                        self._db.executemany(
+                            "UPDATE embeddings SET atime=? WHERE key=?", [(time.time(), k) for k, _ in rows]
+                        )
+                self._db.commit()
+                self._stats["disk_hits"] += sum(1 for k in missing if k in found)
+            self._stats["misses"] += sum(1 for k in missing if k not in found)
+        return found
+
+    def put_many(self, items: dict[str, np.ndarray]):
+        if not items:
+            return
+        with self._lock:
+            for k, v in items.items():
+                self._remember(k, np.asarray(v, dtype=np.float32))
+            if self._db is not None:
+                now = time.time()
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings(key, vec, atime) VALUES (?, ?, ?)",
+                    [(k, np.asarray(v, dtype=np.float32).tobytes(), now) for k, v in items.items()],
+                )
+                self._puts += len(items)
+                if self._puts >= 1000:
+                    self._puts = 0
+                    self._evict_disk()
+                self._db.commit()
+
+    def _remember(self, key: str, vec: np.ndarray):
+        self._mem[key] = vec
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+            self._stats["mem_evictions"] += 1
+
+    def _evict_disk(self):
+        (n,) = self._db.execute("SELECT count(*) FROM embeddings").fetchone()
+        extra = n - self.disk_max_entries
+        if extra > 0:
+            self._db.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY atime LIMIT ?)", (extra,)
+            )
+            self._stats["disk_evictions"] += extra
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._stats, mem_entries=len(self._mem))
+        lookups = out["mem_hits"] + out["disk_hits"] + out["misses"]
+        out["hit_rate"] = round((out["mem_hits"] + out["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return out
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class QueryVectorCache:
+    """
+    Bounded LRU of query vectors with single-flight coalescing: concurrent
+    callers asking for the same key wait on one computation instead of each
+    running the model.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+    def get_or_compute(self, key: str, compute) -> np.ndarray:
+        with self._lock:
+            vec = self._data.get(key)
+            if vec is not None:
+                self._data.move_to_end(key)
+                self._stats["hits"] += 1
+                return vec
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._inflight[key] = Future()
+                self._stats["misses"] += 1
+            else:
+                self._stats["coalesced"] += 1
+        if not leader:
+            return fut.result()
+
+        try:
+            vec = np.asarray(compute(), dtype=np.float32)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            self._data[key] = vec
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self._stats["evictions"] += 1
+            self._inflight.pop(key, None)
+        fut.set_result(vec)
+        return vec
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, entries=len(self._data), inflight=len(self._inflight))
@@ -1,24 +1,129 @@
-from langdetect import detect
+import threading
+from functools import lru_cache
+
+import numpy as np
+import regex as re
+from langdetect import DetectorFactory, detect
 from sentence_transformers import SentenceTransformer
 
 from src.config import settings
+from src.embedding.cache import EmbeddingCache, QueryVectorCache, cache_key
+from src.metrics import EMBED_BATCH_SIZE, EMBED_SECONDS
+
+DetectorFactory.seed = 0  # langdetect is random otherwise; routing must be stable for the cache
+
+MULTI_LANGS = {"fr", "de", "ru", "uk", "pl", "it", "es"}
+
+_CYRILLIC = re.compile(r"\p{Cyrillic}")
+_WORD = re.compile(r"[a-z]+")
+_EN_STOPWORDS = frozenset(
+    "the of and to in is that for on with as by are was this be from it at an "
+    "or which has have were their its not but been these they".split()
+)
+
+
+@lru_cache(maxsize=8192)
+def _langdetect(text: str) -> str:
+    try:
+        return detect(text)
+    except Exception:
+        return "unknown"
+
+
+def needs_multilingual(text: str) -> bool:
+    """
+    Cheap script/stopword heuristic first, langdetect only when unsure:
+    Cyrillic -> multilingual; ASCII text dense in English stopwords -> English.
+    """
+    if _CYRILLIC.search(text):
+        return True
+    if text.isascii():
+        words = _WORD.findall(text.lower())
+        if not words:
+            return False
+        if sum(w in _EN_STOPWORDS for w in words) / len(words) >= 0.15:
+            return False
+    return _langdetect(text) in MULTI_LANGS
 
 
 class Embedder:
-    def __init__(self):
-        self.en = SentenceTransformer(settings.embed_model, device='cpu')
-        self.en = SentenceTransformer(settings.m_embed_model, device='cpu')
-        
+    def __init__(self, cache: EmbeddingCache = None):
+        self._models: dict[str, SentenceTransformer] = {}
+        self._lock = threading.Lock()
+        self.cache = cache if cache is not None else EmbeddingCache.from_settings()
+        self.queries = QueryVectorCache(max_entries=settings.query_cache_size)
+
+    def _load(self, name: str) -> SentenceTransformer:
+        """Load a model on first use and keep it for the life of the Embedder."""
+        model = self._models.get(name)
+        if model is None:
+            with self._lock:
+                model = self._models.get(name)
+                if model is None:
+                    model = self._models[name] = SentenceTransformer(name, device='cpu')
+        return model
+
+    def load_models(self):
+        """Eagerly load both models (used by warmup)."""
+        self._load(settings.embed_model)
+        self._load(settings.m_embed_model)
+
+    @property
+    def en(self) -> SentenceTransformer:
+        return self._load(settings.embed_model)
+
+    @property
+    def multi(self) -> SentenceTransformer:
+        return self._load(settings.m_embed_model)
+
+    def model_for(self, text: str) -> str:
+        return settings.m_embed_model if needs_multilingual(text) else settings.embed_model
+
+    def _encode(self, name: str, texts: list[str]) -> list[np.ndarray]:
+        """Encode one model's texts in length-sorted batches, returned in input order."""
+        model = self._load(name)
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out: list[np.ndarray] = [None] * len(texts)
+        bs = settings.embed_batch_size
+        for start in range(0, len(order), bs):
+            idx = order[start:start + bs]
+            EMBED_BATCH_SIZE.observe(len(idx), name)
+            with EMBED_SECONDS.time(name):
+                vecs = model.encode([texts[i] for i in idx], batch_size=bs, normalize_embeddings=True)
+            for i, v in zip(idx, np.asarray(vecs, dtype=np.float32)):
+                out[i] = v
+        return out
+
+    def embed_array(self, texts: list[str]) -> np.ndarray:
+        """
+        Embed texts as a float32 (n, dim) array. Each text is routed to the
+        English or multilingual model on its own; repeats come from the cache.
+        """
+        names = [self.model_for(t) for t in texts]
+        keys = [cache_key(n, t) for n, t in zip(names, texts)]
+        cached = self.cache.get_many(keys)
+
+        # group each distinct missing text by model
+        groups: dict[str, dict[str, str]] = {}
+        for n, k, t in zip(names, keys, texts):
+            if k not in cached:
+                groups.setdefault(n, {})[k] = t
+        for name, todo in groups.items():
+            fresh = dict(zip(todo, self._encode(name, list(todo.values()))))
+            self.cache.put_many(fresh)
+            cached.update(fresh)
+
+        if not keys:
+            return np.empty((0, self.en.get_sentence_embedding_dimension()), dtype=np.float32)
+        return np.stack([cached[k] for k in keys])
+
     def embed(self, texts:list[str]):
-        try:
-            langs = set()
-            for t in texts:
-                try:
-                    langs.add(detect(t))
-                except Exception as e:
-                    raise f"error found {e}"
-            model = self.multi if any(l in {"fr", "de", "ru", "uk", "pl", "it","es"} for l in langs) else self.en
-        except Exception:
-            model = self.en
-        vecs = model.encode(texts, normalize_embeddings=True)
-        return vecs.tolist()
\ No newline at end of file
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, query: str) -> list[float]:
+        """Embed one search query; repeated and concurrent identical queries share one encode."""
+        key = cache_key("query", query)
+        return self.queries.get_or_compute(key, lambda: self.embed_array([query])[0]).tolist()
+
+    def stats(self) -> dict:
+        return {"queries": self.queries.stats(), "embeddings": self.cache.stats()}
@@ -0,0 +1,58 @@
+"""
+Compact embedding encodings for the local vector index. `float16` halves the
+vector; `int8` stores one byte per dimension plus a per-vector scale
+(symmetric, max-abs). Quantized codes are only used to pick candidates;
+final scores come from float32.
+
+On the Chunk itself an embedding is stored either as the list property the
+native chunk_vec index reads (`float`) or as packed float32 bytes
+(`packed`), which only the local index can search.
+"""
+import numpy as np
+
+from src.config import settings
+
+MODES = ("float", "float16", "int8")
+STORAGE_MODES = ("float", "packed")
+
+
+def quantize(vecs: np.ndarray, mode: str) -> tuple[np.ndarray, np.ndarray | None]:
+    """Encode a (n, dim) float32 block; returns (codes, per-row scales or None)."""
+    vecs = np.asarray(vecs, dtype=np.float32)
+    if mode == "float16":
+        return vecs.astype(np.float16), None
+    if mode == "int8":
+        scales = np.abs(vecs).max(axis=-1) / 127
+        scales[scales == 0] = 1
+        codes = np.rint(vecs / scales[..., None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    raise ValueError(f"unknown quantization mode {mode!r}")
+
+
+def dequantize(codes: np.ndarray, scales: np.ndarray | None = None) -> np.ndarray:
+    out = np.asarray(codes, dtype=np.float32)
+    return out * scales[..., None] if scales is not None else out
+
+
+def embedding_props(vec, mode: str = None) -> dict:
+    """
+    Chunk properties for one embedding (see EMBED_STORAGE). Each mode clears
+    the other's property, and `embedding_q` / `embedding_scale` are cleared
+    so chunks written by older versions lose them. The storage mode is part
+    of every chunk id, so re-ingest after a mode change rewrites each chunk.
+    """
+    mode = mode or settings.embed_storage
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"unknown embedding storage mode {mode!r}")
+    vec = np.asarray(vec, dtype=np.float32)
+    empty = {"embedding_q": None, "embedding_scale": None}
+    if mode == "float":
+        return {"embedding": vec.tolist(), "embedding_f32": None, **empty}
+    return {"embedding": None, "embedding_f32": vec.astype("<f4").tobytes(), **empty}
+
+
+def decode_embedding(value) -> np.ndarray:
+    """float32 vector from either the list property or the packed float32 bytes."""
+    if isinstance(value, (bytes, bytearray)):
+        return np.frombuffer(value, dtype="<f4")
+    return np.asarray(value, dtype=np.float32)
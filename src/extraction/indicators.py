@@ -33,26 +33,126 @@ PATTERNS = [
     ("adsense", ADSENSE),
     ] + [(f"social:{k}", v) for k, v in SOCIAL.items()]
 
+_RE_NON_PHONE = re.compile(r"[^+\d]")
+
 NORMALIZERS = {
 "domain": lambda x: x.lower().strip("().,;\n \t"),
 "url": lambda x: x.strip("()\n \t"),
 "ipv4": lambda x: x,
 "email": lambda x: x.lower(),
-"phone": lambda x: re.sub(r"[^+\d]", "", x),
+"phone": lambda x: _RE_NON_PHONE.sub("", x),
 "ga": lambda x: x,
 "adsense": lambda x: x,
 }
 
 for k in SOCIAL.keys():
     NORMALIZERS[f"social:{k}"] = lambda x, _k=k: x.lstrip("@").lower()
-    
+
+# Literals (case-folded) at least one of which must occur in the text for a
+# pattern to possibly match; DIGIT means "the text contains a digit".
+DIGIT = "\\d"
+PREFILTERS = {
+    "url": ("http",),
+    "ipv4": (DIGIT,),
+    "email": ("@",),
+    "domain": (".",),
+    "phone": (DIGIT,),
+    "ga": ("ua-",),
+    "adsense": ("pub-",),
+    "social:twitter": ("twitter.com",),
+    "social:facebook": ("facebook.com",),
+    "social:instagram": ("instagram.com",),
+    "social:youtube": ("youtube.com",),
+    "social:linkedin": ("linkedin.com",),
+    "social:tiktok": ("tiktok.com",),
+    "social:telegram": ("t.me",),
+    "social:reddit": ("reddit.com",),
+    "social:vk": ("vk.com",),
+    "social:truthsocial": ("truthsocial.com",),
+}
+
+_RE_DIGIT = re.compile(r"\d")
+
+
+class IndicatorExtractor:
+    """
+    Precompiled extraction engine. Each pattern is compiled once and only run
+    when its cheap literal prefilter passes, so a chunk without '@' never pays
+    for the email regex. Output matches the one-pass-per-pattern loop: types
+    in PATTERNS order, matches in text order, deduplicated by (type, value).
+    """
+
+    def __init__(self, patterns=PATTERNS, normalizers=NORMALIZERS, prefilters=PREFILTERS):
+        self._engine = [
+            (typ, re.compile(pat, flags=re.IGNORECASE), prefilters.get(typ), normalizers.get(typ, lambda x: x))
+            for typ, pat in patterns
+        ]
+
+    def iter_matches(self, text: str):
+        """Yield (type, value, start, end) for every hit, in PATTERNS then text order."""
+        folded = text.casefold()
+        has_digit = None
+        for typ, rx, literals, norm in self._engine:
+            if literals is not None:
+                ok = False
+                for lit in literals:
+                    if lit == DIGIT:
+                        if has_digit is None:
+                            has_digit = _RE_DIGIT.search(text) is not None
+                        ok = has_digit
+                    else:
+                        ok = lit in folded
+                    if ok:
+                        break
+                if not ok:
+                    continue
+            for m in rx.finditer(text):
+                yield typ, norm(m.group(0)), m.start(), m.end()
+
+    def extract(self, text: str) -> list[dict]:
+        found: dict[tuple, dict] = {}
+        for typ, value, _, _ in self.iter_matches(text):
+            found.setdefault((typ, value), {"type": typ, "value": value, "confidence": 0.9})
+        return list(found.values())
+
+    def extract_for_chunks(self, text: str, chunks: list[dict], found: dict = None) -> dict:
+        """
+        Scan a page/document once and attach each hit to the chunks whose
+        [start, end) span contains it; a hit straddling a chunk boundary goes
+        to the chunk it overlaps most. Rows are keyed by (type, value) in
+        `found`, which can be shared across pages of one document.
+        """
+        found = {} if found is None else found
+        if not chunks:
+            return found
+        for typ, value, start, end in self.iter_matches(text):
+            ids = [c["id"] for c in chunks if c["start"] <= start and end <= c["end"]]
+            if not ids:
+                best = max(chunks, key=lambda c: min(end, c["end"]) - max(start, c["start"]))
+                ids = [best["id"]]
+            row = found.get((typ, value))
+            if row is None:
+                found[(typ, value)] = {"type": typ, "value": value, "confidence": 0.9,
+                                       "contextChunkId": ids[0], "chunkIds": ids}
+            else:
+                row["chunkIds"] += [i for i in ids if i not in row["chunkIds"]]
+        return found
+
+    def extract_many(self, texts: list[str]) -> list[list[dict]]:
+        return [self.extract(t) for t in texts]
+
+
+_EXTRACTOR = IndicatorExtractor()
+
+
 def extract_indicators(text: str) -> list[dict]:
-    found: list[dict] = []
-    for typ, pat in PATTERNS:
-        for m in re.finditer(pat, text, flags=re.IGNORECASE):
-            raw = m.group(0)
-            norm = NORMALIZERS.get(typ, lambda x: x)(raw)
-            found.append({"type": typ, "value": norm, "confidence": 0.9})
-    # deduplicate by (type, value)
-    key = {(x['type'], x['value']): x for x in found}
-    return list(key.values())
\ No newline at end of file
+    return _EXTRACTOR.extract(text)
+
+
+def extract_many(texts: list[str]) -> list[list[dict]]:
+    """Batch API: one result list per input text."""
+    return _EXTRACTOR.extract_many(texts)
+
+
+def extract_for_chunks(text: str, chunks: list[dict], found: dict = None) -> dict:
+    return _EXTRACTOR.extract_for_chunks(text, chunks, found)
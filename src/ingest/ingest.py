@@ -1,3 +1,5 @@
+from typing import Iterator
+
 from langchain_community.document_loaders import PyPDFLoader
 
 
@@ -7,3 +9,8 @@ def ingest_pdf(filepath:str) -> list:
     loader = PyPDFLoader(filepath)
     docs.extend(loader.load())
     return docs
+
+
+def iter_pdf_pages(filepath: str) -> Iterator:
+    """Yield pages one at a time instead of loading the whole PDF."""
+    yield from PyPDFLoader(filepath).lazy_load()
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from src.config import settings
+from src.metrics import INGEST_JOBS
+
+ACTIVE = ("queued", "running")
+
+
+class JobConflict(Exception):
+    """Raised when a queued or running job already writes some of the same documents."""
+
+    def __init__(self, job: "IngestJob", doc_ids: set[str]):
+        shown = ", ".join(sorted(doc_ids)[:5]) + (", ..." if len(doc_ids) > 5 else "")
+        super().__init__(f"job {job.id} ({job.data_dir}) is already {job.status} for documents {shown}")
+        self.job = job
+
+
+@dataclass
+class IngestJob:
+    id: str
+    data_dir: str
+    force: bool = False
+    workers: int = None
+    status: str = "queued"
+    total_docs: int = 0
+    docs: dict = field(default_factory=dict)
+    error: str = None
+    created: float = field(default_factory=time.time)
+    started: float = None
+    finished: float = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    pdfs: tuple = field(default=(), repr=False)  # listed at submit; the job writes exactly these
+    doc_ids: frozenset = field(default_factory=frozenset, repr=False)
+
+    def to_dict(self) -> dict:
+        docs = dict(self.docs)  # the job thread keeps inserting while we report
+        chunks = sum(d.get("chunks", 0) for d in docs.values())
+        end = self.finished or time.time()
+        elapsed = end - self.started if self.started else 0.0
+        return {
+            "id": self.id,
+            "status": self.status,
+            "dataDir": self.data_dir,
+            "force": self.force,
+            "progress": {"done": len(docs), "total": self.total_docs},
+            "chunks": chunks,
+            "chunksPerSec": round(chunks / elapsed, 2) if elapsed else 0.0,
+            "elapsedSec": round(elapsed, 3),
+            "errors": {k: v["error"] for k, v in docs.items() if "error" in v},
+            "error": self.error,
+            "documents": docs,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class JobManager:
+    """
+    Runs ingestion jobs on a small thread pool. Jobs that would write the same
+    Document never overlap: documents are keyed by file name, not directory,
+    so a submission whose PDFs share a doc_id with a queued or running job
+    raises `JobConflict`. Cancellation is cooperative and takes effect
+    between documents.
+    """
+
+    def __init__(self, workers: int = None, max_history: int = 100):
+        self._pool = ThreadPoolExecutor(max_workers=workers or settings.job_workers, thread_name_prefix="ingest-job")
+        self._jobs: dict[str, IngestJob] = {}
+        self._lock = threading.Lock()
+        self.max_history = max_history
+        INGEST_JOBS.set_function(self._status_counts)
+
+    def submit(self, data_dir: str = None, force: bool = False, workers: int = None) -> IngestJob:
+        from src.pipeline import pdf_doc_id
+
+        data_dir = os.path.realpath(data_dir or settings.data_dir)
+        if workers is not None:
+            workers = max(1, min(workers, settings.ingest_workers))
+        pdfs = tuple(sorted(p for p in os.listdir(data_dir) if p.lower().endswith(".pdf")))
+        doc_ids = frozenset(pdf_doc_id(p) for p in pdfs)
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status in ACTIVE and (shared := job.doc_ids & doc_ids):
+                    raise JobConflict(job, shared)
+            job = IngestJob(id=uuid.uuid4().hex[:12], data_dir=data_dir, force=force, workers=workers,
+                            total_docs=len(pdfs), pdfs=pdfs, doc_ids=doc_ids)
+            self._jobs[job.id] = job
+            self._trim()
+        self._pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> IngestJob | None:
+        return self._jobs.get(job_id)
+
+    def list(self) -> list[IngestJob]:
+        return sorted(self._jobs.values(), key=lambda j: j.created, reverse=True)
+
+    def cancel(self, job_id: str) -> IngestJob | None:
+        job = self._jobs.get(job_id)
+        if job is not None and job.status in ACTIVE:
+            job.cancel_event.set()
+            with self._lock:
+                if job.status == "queued":
+                    job.status, job.finished = "cancelled", time.time()
+        return job
+
+    def shutdown(self):
+        for job in self._jobs.values():
+            job.cancel_event.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _status_counts(self) -> dict:
+        counts = {}
+        for job in list(self._jobs.values()):
+            counts[(job.status,)] = counts.get((job.status,), 0) + 1
+        return counts
+
+    def _trim(self):
+        done = [j for j in self.list() if j.status not in ACTIVE]
+        for job in done[self.max_history:]:
+            self._jobs.pop(job.id, None)
+
+    def _run(self, job: IngestJob):
+        from src.pipeline import process_pdfs
+        from src.registry import get_embedder, get_graph, refresh_vector_index
+
+        with self._lock:
+            if job.status != "queued":
+                return
+            job.status, job.started = "running", time.time()
+        try:
+            process_pdfs(
+                graph=get_graph(),
+                pdf_paths=list(job.pdfs),
+                embedder=get_embedder(),
+                workers=job.workers,
+                force=job.force,
+                data_dir=job.data_dir,
+                progress=lambda doc_id, stats: job.docs.__setitem__(doc_id, stats),
+                should_stop=job.cancel_event.is_set,
+            )
+            refresh_vector_index()
+            job.status = "cancelled" if job.cancel_event.is_set() else "succeeded"
+        except Exception as e:
+            job.status, job.error = "failed", f"{type(e).__name__}: {e}"
+        finally:
+            job.finished = time.time()
@@ -0,0 +1,234 @@
+"""
+Process-wide metrics in Prometheus text format, served on /metrics.
+
+Counters, gauges and histograms are plain dicts behind a lock; recording is
+one lookup and an increment, and nothing is formatted until a scrape calls
+`render()`. Gauges can also be backed by a function evaluated at scrape
+time (queue depths), which costs nothing in between.
+"""
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+_REGISTRY: list = []
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labels)
+        self._lock = threading.Lock()
+        self._values: dict = {}
+        _REGISTRY.append(self)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        super().__init__(name, help, labels)
+        self._fn = None
+
+    def set(self, value: float, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def set_function(self, fn):
+        """Read the value(s) at scrape time: `fn()` returns a number, or {label tuple: number}."""
+        self._fn = fn
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = dict(self._values)
+        if self._fn is not None:
+            value = self._fn()
+            items.update(value if isinstance(value, dict) else {(): value})
+        return self._header() + [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in sorted(items.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, ([*v[0]], v[1], v[2])) for k, v in self._values.items())
+        lines = self._header()
+        for key, (counts, total, n) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_num(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_num(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {n}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("hist", "labels", "t0")
+
+    def __init__(self, hist: Histogram, labels: tuple):
+        self.hist, self.labels = hist, labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.t0, *self.labels)
+        return False
+
+
+def render() -> str:
+    lines = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------- metrics ----------
+PIPELINE_STAGE_SECONDS = Histogram(
+    "tip_pipeline_stage_seconds", "Time per document spent in an ingest stage", ("stage",)
+)
+PIPELINE_DOCUMENTS = Counter("tip_pipeline_documents_total", "Documents processed by outcome", ("status",))
+PIPELINE_CHUNKS = Counter("tip_pipeline_chunks_total", "Chunks seen and embedded by ingestion", ("kind",))
+INGEST_QUEUE_DEPTH = Gauge("tip_ingest_queue_depth", "Items waiting in ingestion queues", ("queue",))
+INGEST_JOBS = Gauge("tip_ingest_jobs", "Ingestion jobs by status", ("status",))
+
+EMBED_BATCH_SIZE = Histogram("tip_embed_batch_size", "Texts per model encode call", ("model",), SIZE_BUCKETS)
+EMBED_SECONDS = Histogram("tip_embed_encode_seconds", "Model encode call latency", ("model",))
+
+GRAPH_CALL_SECONDS = Histogram("tip_graph_call_seconds", "Graph backend method latency", ("backend", "method"))
+GRAPH_CALL_ERRORS = Counter("tip_graph_call_errors_total", "Graph backend method failures", ("backend", "method"))
+
+HTTP_REQUEST_SECONDS = Histogram("tip_http_request_seconds", "API request latency", ("method", "route"))
+HTTP_REQUESTS = Counter("tip_http_requests_total", "API requests by status", ("method", "route", "status"))
+INFERENCE_IN_FLIGHT = Gauge("tip_inference_in_flight", "Jobs admitted to the inference pool")
+
+AGENT_ROUTE_SECONDS = Histogram("tip_agent_route_seconds", "Agent router latency per chosen route", ("action",))
+
+
+def observe_stages(timings: dict):
+    for stage, seconds in timings.items():
+        PIPELINE_STAGE_SECONDS.observe(seconds, stage)
+
+
+# ---------- graph instrumentation ----------
+def _wrap(fn, backend: str, name: str):
+    hist, errors = GRAPH_CALL_SECONDS, GRAPH_CALL_ERRORS
+
+    if inspect.isasyncgenfunction(fn):
+        @functools.wraps(fn)
+        async def agen(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                async for item in fn(*args, **kwargs):
+                    yield item
+            except Exception:
+                errors.inc(backend, name)
+                raise
+            finally:
+                hist.observe(time.perf_counter() - t0, backend, name)
+        return agen
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def coro(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            except Exception:
+                errors.inc(backend, name)
+                raise
+            finally:
+                hist.observe(time.perf_counter() - t0, backend, name)
+        return coro
+
+    if inspect.isgeneratorfunction(fn):
+        @functools.wraps(fn)
+        def gen(*args, **kwargs):
+            t0 = time.perf_counter()  # until the caller has drained (or dropped) it
+            try:
+                yield from fn(*args, **kwargs)
+            except Exception:
+                errors.inc(backend, name)
+                raise
+            finally:
+                hist.observe(time.perf_counter() - t0, backend, name)
+        return gen
+
+    @functools.wraps(fn)
+    def call(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            errors.inc(backend, name)
+            raise
+        finally:
+            hist.observe(time.perf_counter() - t0, backend, name)
+    return call
+
+
+def instrument(backend: str):
+    """Class decorator: time every public method of a graph backend."""
+    def decorate(cls):
+        for name, fn in list(vars(cls).items()):
+            if not name.startswith("_") and inspect.isfunction(fn):
+                setattr(cls, name, _wrap(fn, backend, name))
+        return cls
+    return decorate
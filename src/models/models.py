@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class SearchQuery(BaseModel):
@@ -15,4 +15,9 @@ class ContextRequest(BaseModel):
 
 class NetworkRequest(BaseModel):
     indicator: str
-    hops: int = 2
\ No newline at end of file
+    hops: int = 2
+
+class IngestRequest(BaseModel):
+    data_dir: str | None = None  # sub-directory of DATA_DIR; defaults to DATA_DIR itself
+    force: bool = False
+    workers: int | None = Field(None, ge=1)  # capped at INGEST_WORKERS
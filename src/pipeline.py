@@ -1,14 +1,23 @@
+import hashlib
+import multiprocessing
 import os
+import queue
 import re
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
 from tqdm import tqdm
 
 from src.config import settings
 from src.embedding.nlp import Embedder
-from src.extraction.indicators import extract_indicators
-from src.ingest.ingest import ingest_pdf
-from src.preprocessing.chunking import chunk_text
-from src.storage.graph_db import Graph
+from src.extraction.indicators import extract_for_chunks
+from src.ingest.ingest import ingest_pdf, iter_pdf_pages
+from src.metrics import INGEST_QUEUE_DEPTH, PIPELINE_CHUNKS, PIPELINE_DOCUMENTS, observe_stages
+from src.preprocessing.chunking import iter_page_chunks, vector_signature
+from src.storage.backend import GraphBackend, create_graph
+from src.storage.graph_db import co_mention_delta, co_mention_types
 
 
 def clean_campaign_name(filename: str) -> str:
@@ -24,59 +33,390 @@ def clean_campaign_name(filename: str) -> str:
     return base.split()[-1].capitalize()
 
 
-def process_pdf(graph: Graph, filepath:str, doc_id:str, embedder: Embedder, campaign: str = None):
-    # 1. ingest pdf file
-    docs = ingest_pdf(filepath=filepath)
-    
-    # 2. Make it into smaller chunks
-    chunks = chunk_text(docs)
-    
-    # 3. Use nlp to embed chunks (vectorization)
-    vecs = embedder.embed([c["text"] for c in chunks])
-    
-    # 4. insert document to graph db
+def file_fingerprint(filepath: str) -> str:
+    """
+    sha256 of the file bytes plus every setting that changes the chunks or
+    vectors, so re-chunking or switching models forces a re-ingest.
+    """
+    h = hashlib.sha256()
+    h.update(f"{settings.chunk_size}|{settings.chunk_overlap}|{vector_signature()}|".encode())
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _upsert_document(graph: GraphBackend, doc_id: str, filepath: str, campaign: str = None):
     graph.upsert_document({"id": doc_id, "path": filepath})
-    
+
     if campaign:
-        with graph.driver.session() as s:
-            s.run("MERGE (c:Campaign {name:$n})", n=campaign)
-            s.run("MATCH (d:Document {id:$id}),(c:Campaign {name:$n}) MERGE (d)-[:PART_OF_CAMPAIGN]->(c)", id=doc_id, n=campaign)
-    
-    for c, v in tqdm(list(zip(chunks, vecs)), desc=f"Load {doc_id}"):
-        props = {"id": c["id"], "text": c["text"], "embedding": v}
-        graph.add_chunk(doc_id, props)
-        # indicators per chunk
-        inds = extract_indicators(c["text"])
-        # print(inds)
-        for ind in inds:
-            graph.add_indicator(ind, doc_id, context_chunk_id=c["id"])
-            
-    return {"chunks": len(chunks)}
-
-
-def process_pdfs(graph: Graph, pdf_paths, embedder: Embedder):
-    stats = {}
-    for i, pdf in enumerate(pdf_paths):
-        doc_id = os.path.splitext(os.path.basename(pdf))[0]
-        # campaign = campaigns[i] if campaigns and i < len(campaigns) else None
+        graph.link_campaign(doc_id, campaign)
+
+
+def prepare_pdf(filepath: str, doc_id: str) -> dict:
+    """
+    CPU-bound half of the pipeline: parse, chunk and extract indicators.
+    Needs no graph or embedder, so it can run in a worker process.
+    """
+    t0 = time.perf_counter()
+    # 1. ingest pdf file
+    docs = ingest_pdf(filepath=filepath)
+    stages = {"parse": time.perf_counter() - t0, "chunk": 0.0, "extract": 0.0}
+
+    # 2. Make it into smaller chunks, 3. scan each page once for indicators
+    chunks, found = [], {}
+    mark = time.perf_counter()
+    for page, page_chunks in iter_page_chunks(docs, doc_id=doc_id):
+        t1 = time.perf_counter()
+        stages["chunk"] += t1 - mark
+        chunks.extend(page_chunks)
+        extract_for_chunks(page.page_content, page_chunks, found)
+        mark = time.perf_counter()
+        stages["extract"] += mark - t1
+
+    # stage timings travel with the result: worker processes can't record metrics
+    return {
+        "doc_id": doc_id,
+        "path": filepath,
+        "chunks": chunks,
+        "indicators": list(found.values()),
+        "prepare_s": time.perf_counter() - t0,
+        "stages": stages,
+    }
+
+
+def _finish_document(graph: GraphBackend, doc_id: str, ind_rows: list[dict], stale_ids: set[str],
+                     fingerprint: str = None) -> int:
+    """
+    Write the document's indicator rows, then drop chunks that no longer
+    exist. Every current indicator edge now points at a live chunk, so the
+    MENTIONED_IN edges deleted with the stale chunks are exactly those of
+    indicators that left the document. CO_MENTIONED weights are then moved
+    by the difference between the old and new sets of CO_MENTION_TYPES
+    indicators, and the campaign summary of every indicator the document
+    touches is refreshed. Finally the graph version is bumped so cached API
+    responses expire.
+    """
+    types = co_mention_types()
+    before = graph.document_indicators(doc_id)
+    co_before = before if types is None else graph.document_indicators(doc_id, types)
+    graph.add_indicators_bulk(ind_rows, doc_id)
+    if stale_ids:
+        graph.delete_chunks(doc_id, list(stale_ids))
+    after = graph.document_indicators(doc_id)
+    co_after = after if types is None else graph.document_indicators(doc_id, types)
+    graph.update_co_mentions(co_mention_delta(co_before, co_after))
+    if graph.document_campaigns(doc_id):
+        graph.refresh_campaign_summary(sorted(before | after))
+    graph.bump_version()
+    if fingerprint:
+        graph.upsert_document({"id": doc_id, "fingerprint": fingerprint})
+    return len(stale_ids)
+
+
+def write_prepared(graph: GraphBackend, embedder: Embedder, prepared: dict, campaign: str = None,
+                   fingerprint: str = None) -> dict:
+    """
+    Embed a prepared document and write it to the graph. Chunks already stored
+    under the same content-addressed id are neither re-embedded nor rewritten.
+    """
+    t0 = time.perf_counter()
+    doc_id, chunks = prepared["doc_id"], prepared["chunks"]
+    existing = graph.chunk_ids(doc_id)
+    new = [c for c in chunks if c["id"] not in existing]
+
+    # 4. Use nlp to embed new chunks (vectorization)
+    t1 = time.perf_counter()
+    vecs = embedder.embed_array([c["text"] for c in new]) if new else []
+    embed_s = time.perf_counter() - t1
+
+    # 5. insert document to graph db
+    _upsert_document(graph, doc_id, prepared["path"], campaign)
+
+    # 6. write chunk + indicator rows in batched transactions, drop stale chunks
+    chunk_rows = [
+        {"id": c["id"], "text": c["text"], "embedding": v}
+        for c, v in zip(new, vecs)
+    ]
+    graph.add_chunks_bulk(doc_id, chunk_rows)
+    stale = existing - {c["id"] for c in chunks}
+    removed = _finish_document(graph, doc_id, prepared["indicators"], stale, fingerprint)
+
+    write_s = time.perf_counter() - t0
+    stages = {**prepared.get("stages", {}), "embed": embed_s, "write": write_s - embed_s}
+    _observe(stages, len(chunks), len(new))
+    return {
+        "chunks": len(chunks),
+        "embedded": len(new),
+        "removed": removed,
+        "indicators": len(prepared["indicators"]),
+        "prepare_s": round(prepared["prepare_s"], 3),
+        "write_s": round(write_s, 3),
+        "stages": {k: round(v, 3) for k, v in stages.items()},
+    }
+
+
+def process_pdf_streaming(graph: GraphBackend, filepath: str, doc_id: str, embedder: Embedder,
+                          campaign: str = None, batch_size: int = None, fingerprint: str = None):
+    """
+    Streaming variant of `process_pdf`: pages are read, chunked, embedded and
+    written in micro-batches. A writer thread drains a bounded queue, so peak
+    memory is roughly `batch_size * (STREAM_QUEUE_DEPTH + 2)` chunks and the
+    reader blocks whenever the writer falls behind. Indicator rows (one per
+    distinct indicator) are kept until the end and written last.
+    """
+    t0 = time.perf_counter()
+    batch_size = batch_size or settings.stream_batch_size
+    _upsert_document(graph, doc_id, filepath, campaign)
+    existing = graph.chunk_ids(doc_id)
+    seen: set[str] = set()
+    found: dict[tuple, dict] = {}
+
+    q = queue.Queue(maxsize=settings.stream_queue_depth)
+    stats = {"chunks": 0, "embedded": 0}
+    stages = dict.fromkeys(("parse", "chunk", "extract", "embed", "write"), 0.0)
+    errors = []
+
+    def writer():
+        while (chunk_rows := q.get()) is not None:
+            INGEST_QUEUE_DEPTH.set(q.qsize(), "stream")
+            if errors:
+                continue  # keep draining so the producer never blocks forever
+            t1 = time.perf_counter()
+            try:
+                graph.add_chunks_bulk(doc_id, chunk_rows)
+            except Exception as e:
+                errors.append(e)
+                continue
+            stages["write"] += time.perf_counter() - t1
+            stats["embedded"] += len(chunk_rows)
+
+    def flush(new):
+        t1 = time.perf_counter()
+        vecs = embedder.embed_array([c["text"] for c in new])
+        stages["embed"] += time.perf_counter() - t1
+        q.put([  # blocks when the writer is behind
+            {"id": c["id"], "text": c["text"], "embedding": v}
+            for c, v in zip(new, vecs)
+        ])
+        INGEST_QUEUE_DEPTH.set(q.qsize(), "stream")
+
+    def parse(pages):
+        it = iter(pages)
+        while True:
+            t1 = time.perf_counter()
+            page = next(it, None)
+            stages["parse"] += time.perf_counter() - t1
+            if page is None:
+                return
+            yield page
+
+    t = threading.Thread(target=writer, name=f"writer-{doc_id}", daemon=True)
+    t.start()
+    try:
+        pending = []
+        mark, parsed = time.perf_counter(), 0.0
+        for page, chunks in tqdm(iter_page_chunks(parse(iter_pdf_pages(filepath)), doc_id=doc_id), desc=f"Stream {doc_id}"):
+            # time spent fetching this page, less the part spent parsing it
+            t1 = time.perf_counter()
+            stages["chunk"] += t1 - mark - (stages["parse"] - parsed)
+            parsed = stages["parse"]
+            if errors:
+                break
+            stats["chunks"] += len(chunks)
+            extract_for_chunks(page.page_content, chunks, found)
+            stages["extract"] += time.perf_counter() - t1
+            seen.update(c["id"] for c in chunks)
+            pending.extend(c for c in chunks if c["id"] not in existing)
+            while len(pending) >= batch_size:
+                flush(pending[:batch_size])
+                pending = pending[batch_size:]
+            mark = time.perf_counter()
+        if pending and not errors:
+            flush(pending)
+    finally:
+        q.put(None)
+        t.join()
+    if errors:
+        raise errors[0]
+
+    stats["indicators"] = len(found)
+    t1 = time.perf_counter()
+    stats["removed"] = _finish_document(graph, doc_id, list(found.values()), existing - seen, fingerprint)
+    stages["write"] += time.perf_counter() - t1
+    stats["total_s"] = round(time.perf_counter() - t0, 3)
+    stats["stages"] = {k: round(v, 3) for k, v in stages.items()}
+    _observe(stages, stats["chunks"], stats["embedded"])
+    return stats
+
+
+def _observe(stages: dict, chunks: int, embedded: int):
+    observe_stages(stages)
+    PIPELINE_CHUNKS.inc("seen", amount=chunks)
+    PIPELINE_CHUNKS.inc("embedded", amount=embedded)
+
+
+def _done(progress, doc_id: str, doc_stats: dict):
+    status = "skipped" if doc_stats.get("skipped") else "error" if "error" in doc_stats else "ok"
+    PIPELINE_DOCUMENTS.inc(status)
+    if progress:
+        progress(doc_id, doc_stats)
+
+
+def _ingest(graph: GraphBackend, filepath: str, doc_id: str, embedder: Embedder,
+            campaign: str = None, fingerprint: str = None):
+    if settings.stream_ingest:
+        return process_pdf_streaming(graph, filepath, doc_id, embedder, campaign=campaign, fingerprint=fingerprint)
+    prepared = prepare_pdf(filepath=filepath, doc_id=doc_id)
+    return write_prepared(graph, embedder, prepared, campaign=campaign, fingerprint=fingerprint)
+
+
+def process_pdf(graph: GraphBackend, filepath:str, doc_id:str, embedder: Embedder, campaign: str = None,
+                force: bool = False):
+    """Ingest one PDF; unchanged files (same fingerprint) are skipped unless `force`."""
+    fingerprint = file_fingerprint(filepath)
+    if not force and graph.document_fingerprints([doc_id]).get(doc_id) == fingerprint:
+        return {"skipped": True}
+    return _ingest(graph, filepath, doc_id, embedder, campaign=campaign, fingerprint=fingerprint)
+
+
+def pdf_doc_id(pdf: str) -> str:
+    """Document id of a PDF: its file name without extension, whatever its directory."""
+    return os.path.splitext(os.path.basename(pdf))[0]
+
+
+def _pdf_jobs(pdf_paths, data_dir: str = None) -> list[tuple[str, str, str]]:
+    """(doc_id, path, campaign) for every PDF in `pdf_paths`."""
+    jobs = []
+    for pdf in pdf_paths:
         if pdf.lower().endswith(".pdf"):
-            path = os.path.join(settings.data_dir, pdf)
-            campaign = clean_campaign_name(pdf)
-            stats[doc_id] = process_pdf(graph=graph, filepath=path, doc_id=doc_id, embedder=embedder, campaign=campaign)
-  
-    
-def run_pipeline():
+            doc_id = pdf_doc_id(pdf)
+            path = os.path.join(data_dir or settings.data_dir, pdf)
+            jobs.append((doc_id, path, clean_campaign_name(pdf)))
+    return jobs
+
+
+def _process_pdfs_parallel(graph: GraphBackend, jobs, embedder: Embedder, workers: int, queue_size: int,
+                           progress=None, should_stop=None):
+    """
+    Workers parse/chunk/extract; this process is the single writer that owns
+    the embedder and the graph driver. At most `queue_size` documents are
+    in flight, so a slow writer stops new documents from being parsed.
+    """
+    stats = {}
+    pending = {}
+    todo = iter(jobs)
+
+    def submit_next(pool) -> bool:
+        if should_stop and should_stop():
+            return False
+        for doc_id, path, campaign, fingerprint in todo:
+            pending[pool.submit(prepare_pdf, path, doc_id)] = (doc_id, campaign, fingerprint)
+            return True
+        return False
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        while len(pending) < queue_size and submit_next(pool):
+            pass
+        INGEST_QUEUE_DEPTH.set(len(pending), "prepare")
+        with tqdm(total=len(jobs), desc="Load documents") as bar:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    doc_id, campaign, fingerprint = pending.pop(fut)
+                    try:
+                        stats[doc_id] = write_prepared(graph, embedder, fut.result(), campaign=campaign,
+                                                       fingerprint=fingerprint)
+                    except Exception as e:
+                        stats[doc_id] = {"error": f"{type(e).__name__}: {e}"}
+                    _done(progress, doc_id, stats[doc_id])
+                    submit_next(pool)
+                    INGEST_QUEUE_DEPTH.set(len(pending), "prepare")
+                    bar.update(1)
+    return stats
+
+
+def process_pdfs(graph: GraphBackend, pdf_paths, embedder: Embedder, workers: int = None, force: bool = False,
+                 data_dir: str = None, progress=None, should_stop=None):
+    """
+    Ingest every PDF in `pdf_paths` and return per-document stats. A failing
+    document is recorded as {"error": ...} and the run continues.
+    `progress(doc_id, stats)` is called as each document finishes;
+    `should_stop()` is polled before each new document starts.
+    """
+    jobs = _pdf_jobs(pdf_paths, data_dir=data_dir)
+    known = {} if force else graph.document_fingerprints([doc_id for doc_id, _, _ in jobs])
+
+    # skip documents whose fingerprint is unchanged since the last run
+    stats, todo = {}, []
+    for doc_id, path, campaign in jobs:
+        fingerprint = file_fingerprint(path)
+        if known.get(doc_id) == fingerprint:
+            stats[doc_id] = {"skipped": True}
+            _done(progress, doc_id, stats[doc_id])
+        else:
+            todo.append((doc_id, path, campaign, fingerprint))
+
+    workers = workers or settings.ingest_workers
+    if workers > 1 and len(todo) > 1:
+        queue_size = settings.ingest_queue_size or 2 * workers
+        stats.update(_process_pdfs_parallel(graph, todo, embedder, workers, queue_size,
+                                            progress=progress, should_stop=should_stop))
+        return stats
+
+    for doc_id, path, campaign, fingerprint in tqdm(todo, desc="Load documents"):
+        if should_stop and should_stop():
+            break
+        try:
+            stats[doc_id] = _ingest(graph, path, doc_id, embedder, campaign=campaign, fingerprint=fingerprint)
+        except Exception as e:
+            stats[doc_id] = {"error": f"{type(e).__name__}: {e}"}
+        _done(progress, doc_id, stats[doc_id])
+    return stats
+
+
+def run_pipeline(workers: int = None, force: bool = False):
     print("---- Pipeline Started -------")
-    
+
     # 1. processing pdfs
     pdf_paths = os.listdir(settings.data_dir)
-    g = Graph()
+    g = create_graph()
     g.init_schema()
     emb = Embedder()
-    process_pdfs(pdf_paths=pdf_paths, graph=g, embedder=emb)
+    try:
+        stats = process_pdfs(pdf_paths=pdf_paths, graph=g, embedder=emb, workers=workers, force=force)
+        if settings.graph_backend == "neo4j" and (settings.vector_index_enabled or settings.embed_storage != "float"):
+            from src.storage.vector_index import LocalVectorIndex
+
+            stats["vector_index"] = LocalVectorIndex().refresh(g)
+        return stats
+    finally:
+        g.close()
+
+
+def rebuild_co_mentions():
+    """Recompute CO_MENTIONED from scratch (normally maintained at ingest)."""
+    g = create_graph()
+    try:
+        return g.rebuild_co_mentions()
+    finally:
+        g.close()
+
+
+def rebuild_campaign_summary():
+    """Recompute IN_CAMPAIGN / OVERLAPS from scratch (normally maintained at ingest)."""
+    g = create_graph()
+    try:
+        return g.rebuild_campaign_summary()
+    finally:
+        g.close()
 
 
 if __name__== "__main__":
-    run_pipeline()
-    
-    
\ No newline at end of file
+    if sys.argv[1:] == ["rebuild-co-mentions"]:
+        print(f"CO_MENTIONED edges: {rebuild_co_mentions()}")
+    elif sys.argv[1:] == ["rebuild-campaign-summary"]:
+        print(f"indicators with campaigns: {rebuild_campaign_summary()}")
+    else:
+        run_pipeline()
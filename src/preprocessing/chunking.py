@@ -1,22 +1,71 @@
+import hashlib
+from typing import Any, Iterable, Iterator
+
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 from src.config import settings
 
 
-def chunk_text(docs: list) -> list[dict]:
-    """Chunk PDF into overlapping windows with LangChain splitter."""
-    splitter = RecursiveCharacterTextSplitter(
+def _splitter() -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
         chunk_size=settings.chunk_size,
         chunk_overlap=settings.chunk_overlap,
         separators=["\n\n", "\n", " ", ""],  # coarse-to-fine split
+        add_start_index=True,
     )
-    chunks = splitter.split_documents(docs)
-
-    results = []
-    for idx, c in enumerate(chunks):
-        results.append({
-            "id": f"chunk-{idx}",
-            "text": c.page_content.strip(),
-            "metadata": c.metadata,
-        })
-    return results
\ No newline at end of file
+
+
+def vector_signature() -> str:
+    """Every setting that changes a chunk's stored vector."""
+    return f"{settings.embed_model}|{settings.m_embed_model}|{settings.embed_storage}"
+
+
+def chunk_id(doc_id: str, text: str, dup: int = 0) -> str:
+    """
+    Content-addressed chunk id: the same text in the same document, embedded
+    under the same `vector_signature`, always gets the same id. Switching
+    models or EMBED_STORAGE therefore gives every chunk a new id, so
+    re-ingest rewrites it and drops the old one. `dup` numbers repeated texts (headers, footers)
+    in a document.
+    """
+    h = hashlib.sha1(f"{doc_id}\x00{vector_signature()}\x00{text}".encode("utf-8")).hexdigest()[:20]
+    base = f"{doc_id}:{h}" if doc_id else h
+    return f"{base}-{dup}" if dup else base
+
+
+def iter_page_chunks(docs: Iterable, doc_id: str = "") -> Iterator[tuple[Any, list[dict]]]:
+    """
+    Lazily chunk pages one at a time, yielding (page, chunks). Each chunk
+    records its page ordinal and the [start, end) span of its text inside
+    `page.page_content`.
+    """
+    splitter = _splitter()
+    seen: dict[str, int] = {}
+    for page_no, doc in enumerate(docs):
+        chunks = []
+        for c in splitter.split_documents([doc]):
+            raw = c.page_content
+            text = raw.strip()
+            start = c.metadata.get("start_index", 0) + (len(raw) - len(raw.lstrip()))
+            dup = seen.get(text, 0)
+            seen[text] = dup + 1
+            chunks.append({
+                "id": chunk_id(doc_id, text, dup),
+                "text": text,
+                "page": page_no,
+                "start": start,
+                "end": start + len(text),
+                "metadata": c.metadata,
+            })
+        yield doc, chunks
+
+
+def iter_chunks(docs: Iterable, doc_id: str = "") -> Iterator[dict]:
+    """Lazily chunk pages one at a time; ids match `chunk_text`."""
+    for _, chunks in iter_page_chunks(docs, doc_id=doc_id):
+        yield from chunks
+
+
+def chunk_text(docs: list, doc_id: str = "") -> list[dict]:
+    """Chunk PDF into overlapping windows with LangChain splitter."""
+    return list(iter_chunks(docs, doc_id=doc_id))
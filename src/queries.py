@@ -1,41 +1,86 @@
 # src/queries.py
-from src.storage.graph_db import Graph
+# Each helper works with both `Graph` (returns rows) and `AsyncGraph`
+# (returns an awaitable), since both expose the same `fetch`. Backends
+# without Cypher (src.storage.embedded_db) implement a helper as a method
+# of the same name, which is called instead.
+from functools import wraps
 
+from src.storage.backend import GraphBackend
 
-def graph_two_hop(graph: Graph, value: str):
+
+def _native(fn):
+    @wraps(fn)
+    def helper(graph: GraphBackend, *args, **kwargs):
+        method = getattr(graph, fn.__name__, None)
+        return method(*args, **kwargs) if method is not None else fn(graph, *args, **kwargs)
+    return helper
+
+
+def graph_two_hop(graph: GraphBackend, value: str):
     """Find all indicators within 2 hops of a given indicator value."""
     return graph.relationships(value, hops=2)
 
 
-def clusters_by_handle(graph: Graph):
+@_native
+def clusters_by_handle(graph: GraphBackend):
     """
     Group social:* indicators by co-mentions in documents.
     Acts as a simple community proxy for social accounts mentioned together.
+    Reads the CO_MENTIONED edges maintained at ingest (one row per pair),
+    so CO_MENTION_TYPES must include `social:`. The weight predicate lets
+    the co_mentioned_weight index drive the scan.
     """
     q = (
-        "MATCH (i:Indicator)-[:MENTIONED_IN]->(d:Document)<-[:MENTIONED_IN]-(j:Indicator)\n"
-        "WHERE i.type STARTS WITH 'social:' AND j.type STARTS WITH 'social:' AND i<>j\n"
-        "RETURN i.value AS a, j.value AS b, count(*) AS w ORDER BY w DESC LIMIT 100"
+        "MATCH (i:Indicator)-[r:CO_MENTIONED]->(j:Indicator)\n"
+        "WHERE r.weight > 0 AND i.type STARTS WITH 'social:' AND j.type STARTS WITH 'social:'\n"
+        "RETURN i.value AS a, j.value AS b, r.weight AS w ORDER BY w DESC LIMIT 100"
     )
-    with graph.driver.session() as s:
-        return [dict(r) for r in s.run(q)]
+    return graph.fetch(q)
 
 
-def across_campaigns(graph: Graph):
+@_native
+def across_campaigns(graph: GraphBackend):
     """
     Find indicators that appear in more than one campaign.
+    Reads the campaign summary maintained at ingest.
     """
     q = (
-        "MATCH (i:Indicator)-[:MENTIONED_IN]->(d:Document)-[:PART_OF_CAMPAIGN]->(c:Campaign)\n"
-        "WITH i, collect(DISTINCT c.name) AS camps\n"
-        "WHERE size(camps) > 1\n"
-        "RETURN i.value AS indicator, camps"
+        "MATCH (i:Indicator) WHERE i.campaignCount > 1\n"
+        "RETURN i.value AS indicator, i.campaigns AS camps"
+    )
+    return graph.fetch(q)
+
+
+@_native
+def shared_indicators(graph: GraphBackend, a: str, b: str, limit: int = 500):
+    """Indicators mentioned by both campaign `a` and campaign `b`."""
+    q = (
+        "MATCH (:Campaign {name:$a})<-[:IN_CAMPAIGN]-(i:Indicator)-[:IN_CAMPAIGN]->(:Campaign {name:$b})\n"
+        "RETURN i.value AS value, i.type AS type, i.campaignCount AS campaignCount\n"
+        "ORDER BY campaignCount DESC, value LIMIT $limit"
+    )
+    return graph.fetch(q, a=a, b=b, limit=limit)
+
+
+@_native
+def campaign_overlaps(graph: GraphBackend, campaign: str = None, limit: int = 100):
+    """Campaign pairs ranked by the number of indicators they share."""
+    if campaign is None:
+        # o.count > 0 lets the planner read pairs off the overlaps_count index
+        q = (
+            "MATCH (a:Campaign)-[o:OVERLAPS]->(b:Campaign) WHERE o.count > 0\n"
+            "RETURN a.name AS a, b.name AS b, o.count AS shared ORDER BY shared DESC LIMIT $limit"
+        )
+        return graph.fetch(q, limit=limit)
+    q = (
+        "MATCH (:Campaign {name:$c})-[o:OVERLAPS]-(:Campaign)\n"
+        "RETURN startNode(o).name AS a, endNode(o).name AS b, o.count AS shared ORDER BY shared DESC LIMIT $limit"
     )
-    with graph.driver.session() as s:
-        return [dict(r) for r in s.run(q)]
+    return graph.fetch(q, c=campaign, limit=limit)
 
 
-def timeline(graph: Graph, value: str):
+@_native
+def timeline(graph: GraphBackend, value: str):
     """
     Build a timeline of when an indicator was mentioned (by document timestamp).
     """
@@ -43,5 +88,4 @@ def timeline(graph: Graph, value: str):
         "MATCH (i:Indicator {value:$v})-[r:MENTIONED_IN]->(d:Document)\n"
         "RETURN d.id AS documentId, r.ts AS ts ORDER BY ts"
     )
-    with graph.driver.session() as s:
-        return [dict(r) for r in s.run(q, v=value)]
+    return graph.fetch(q, v=value)
@@ -0,0 +1,165 @@
+"""
+Process-wide, lazily built shared resources. The API, the agent tools and
+background jobs all get the same Graph driver pool and the same Embedder;
+nothing is constructed until first use.
+"""
+import threading
+import time
+
+from src.config import settings
+
+_lock = threading.RLock()
+_instances: dict = {}
+
+
+def _get(name: str, factory):
+    inst = _instances.get(name)
+    if inst is None:
+        with _lock:
+            inst = _instances.get(name)
+            if inst is None:
+                inst = _instances[name] = factory()
+    return inst
+
+
+def _build_graph():
+    from src.storage.backend import create_graph
+
+    g = create_graph(local_index=get_vector_index())
+    g.init_schema()
+    return g
+
+
+def _build_embedder():
+    # imported here so that importing the API does not pull in torch
+    from src.embedding.nlp import Embedder
+
+    return Embedder()
+
+
+def get_graph():
+    """Shared graph backend (GRAPH_BACKEND; schema initialised once)."""
+    return _get("graph", _build_graph)
+
+
+def get_embedder():
+    """Shared Embedder; its models load on first use."""
+    return _get("embedder", _build_embedder)
+
+
+def get_async_graph():
+    """Shared AsyncGraph for the API; call `await g.ensure_schema()` before use."""
+    def build():
+        if settings.graph_backend == "embedded":
+            from src.storage.embedded_db import AsyncEmbeddedGraph
+
+            return AsyncEmbeddedGraph(get_graph())  # one SQLite store shared with the sync side
+        from src.storage.async_graph_db import AsyncGraph
+
+        return AsyncGraph(local_index=get_vector_index())
+
+    return _get("async_graph", build)
+
+
+def get_vector_index():
+    """Shared LocalVectorIndex when VECTOR_INDEX_ENABLED (implied by compact EMBED_STORAGE), else None."""
+    if settings.graph_backend != "neo4j":
+        return None  # the embedded backend searches in-process already
+    if not settings.vector_index_enabled and settings.embed_storage == "float":
+        return None
+
+    def build():
+        from src.storage.vector_index import LocalVectorIndex
+
+        index = LocalVectorIndex()
+        index.load()  # stays unloaded (native index used) until first build
+        return index
+
+    return _get("vector_index", build)
+
+
+def refresh_vector_index() -> dict | None:
+    """Bring the local vector tier up to date after an ingest."""
+    index = get_vector_index()
+    return index.refresh(get_graph()) if index is not None else None
+
+
+def get_response_cache():
+    """Shared API response cache, keyed on the graph version."""
+    def build():
+        from src.api.response_cache import ResponseCache
+
+        return ResponseCache(
+            get_async_graph(), settings.response_cache_size, settings.response_cache_version_ttl_s,
+            max_bytes=settings.response_cache_max_bytes,
+        )
+
+    return _get("response_cache", build)
+
+
+def get_inference_pool():
+    """Shared bounded executor for CPU-bound calls made from async code."""
+    def build():
+        from src.api.inference import InferencePool
+
+        return InferencePool(settings.inference_workers, settings.inference_max_pending)
+
+    return _get("inference", build)
+
+
+def get_job_manager():
+    """Shared background ingestion job manager."""
+    def build():
+        from src.jobs.manager import JobManager
+
+        return JobManager()
+
+    return _get("jobs", build)
+
+
+def warmup(models: bool = True) -> dict:
+    """Build everything up front and return per-step timings in seconds."""
+    timings = {}
+    t0 = time.perf_counter()
+    graph = get_graph()
+    if hasattr(graph, "driver"):
+        graph.driver.verify_connectivity()
+    timings["graph"] = round(time.perf_counter() - t0, 3)
+    if models:
+        t0 = time.perf_counter()
+        get_embedder().load_models()
+        timings["embedder"] = round(time.perf_counter() - t0, 3)
+    return timings
+
+
+def warmup_in_background() -> threading.Thread:
+    t = threading.Thread(target=warmup, kwargs={"models": settings.warmup_models}, name="warmup", daemon=True)
+    t.start()
+    return t
+
+
+async def ashutdown():
+    """Async part of shutdown: close the AsyncGraph driver."""
+    with _lock:
+        agraph = _instances.pop("async_graph", None)
+        _instances.pop("response_cache", None)
+    if agraph is not None:
+        await agraph.close()
+
+
+def shutdown():
+    """Close whatever was built; the next get_* call rebuilds it."""
+    with _lock:
+        graph = _instances.pop("graph", None)
+        embedder = _instances.pop("embedder", None)
+        pool = _instances.pop("inference", None)
+        jobs = _instances.pop("jobs", None)
+        _instances.pop("vector_index", None)
+    if jobs is not None:
+        jobs.shutdown()
+    if pool is not None:
+        pool.shutdown()
+    if graph is not None:
+        graph.close()
+    if embedder is not None:
+        embedder.cache.close()
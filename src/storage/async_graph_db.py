@@ -0,0 +1,126 @@
+import asyncio
+
+from neo4j import AsyncGraphDatabase, Query
+
+from src.config import settings
+from src.metrics import instrument
+from src.storage.graph_db import (CHUNKS_BY_IDS_Q, CONTEXT_Q, GRAPH_VERSION_Q,
+                                  VECTOR_SEARCH_Q, decode_keyset, hybrid_query,
+                                  hydrate, indicator_lookup_query, indicator_page,
+                                  lucene_query, uses_local_index)
+from src.storage.traversal import (DEFAULT_REL_TYPES, EXPAND_Q, SEED_Q, Traversal,
+                                   check_params)
+
+
+@instrument("neo4j-async")
+class AsyncGraph:
+    """
+    Read-side counterpart of `Graph` on the async Neo4j driver, for the API.
+    Runs the same Cypher; writes stay on the sync `Graph` used by the pipeline.
+    """
+
+    def __init__(self, local_index=None):
+        self.driver = AsyncGraphDatabase.driver(
+            settings.neo4j_uri,
+            auth=(settings.neo4j_user, settings.neo4j_password)
+        )
+        self.local_index = local_index
+        self._schema_ready = False
+
+    async def close(self):
+        await self.driver.close()
+
+    async def init_schema(self):
+        from src.storage.migrations import amigrate
+
+        await amigrate(self.driver)
+        self._schema_ready = True
+
+    async def ensure_schema(self):
+        if not self._schema_ready:
+            await self.init_schema()
+
+    async def version(self) -> int:
+        rows = await self.fetch(GRAPH_VERSION_Q)
+        return rows[0]["version"] if rows else 0
+
+    # ---------- Search ----------
+    async def _search(self, q: str, **params) -> list[dict]:
+        async with self.driver.session() as s:
+            result = await s.run(q, **params)
+            return [dict(r["chunk"], _score=r["score"]) async for r in result]
+
+    # The local index may reload its files and scans them in-process, so it
+    # runs in a worker thread instead of on the event loop.
+    def _local_hits(self, query_vec: list[float], k: int):
+        return self.local_index.search(query_vec, k) if uses_local_index(self.local_index) else None
+
+    async def vector_search(self, query_vec: list[float], k: int = 10):
+        hits = await asyncio.to_thread(self._local_hits, query_vec, k)
+        if hits is not None:
+            rows = await self.fetch(CHUNKS_BY_IDS_Q, ids=[h[0] for h in hits])
+            return hydrate(hits, [r["chunk"] for r in rows])
+        return await self._search(VECTOR_SEARCH_Q, k=k, vec=query_vec)
+
+    async def hybrid_search(self, text: str, query_vec: list[float], k: int = 10):
+        if not lucene_query(text):
+            return await self.vector_search(query_vec, k)
+        q, params = await asyncio.to_thread(hybrid_query, text, query_vec, k, self.local_index)
+        return await self._search(q, **params)
+
+    # ---------- Indicator Queries ----------
+    async def fetch(self, q: str, **params) -> list[dict]:
+        """Run a read query and return its records as dicts."""
+        async with self.driver.session() as s:
+            result = await s.run(q, **params)
+            return [dict(r) async for r in result]
+
+    async def indicator_lookup(self, typ: str, rank_by: str = None, limit: int = None):
+        return await self.fetch(indicator_lookup_query(rank_by, limit=limit is not None), typ=typ, limit=limit)
+
+    async def indicator_page(self, typ: str, cursor: str = None, limit: int = None, rank_by: str = None) -> dict:
+        limit = limit or settings.indicator_page_size
+        after = decode_keyset(cursor, rank_by)
+        q = indicator_lookup_query(rank_by, after=bool(after))
+        return indicator_page(await self.fetch(q, typ=typ, limit=limit + 1, **after), rank_by, limit)
+
+    async def stream_indicators(self, typ: str, cursor: str = None, rank_by: str = None):
+        """Async generator over indicators of a type, fetched lazily in driver-sized batches."""
+        after = decode_keyset(cursor, rank_by)
+        q = indicator_lookup_query(rank_by, after=bool(after), limit=False)
+        async with self.driver.session(fetch_size=settings.indicator_fetch_size) as s:
+            result = await s.run(q, typ=typ, **after)
+            async for r in result:
+                yield dict(r)
+
+    async def context_for_indicator(self, value: str):
+        return await self.fetch(CONTEXT_Q, v=value)
+
+    # ---------- Traversal ----------
+    async def traverse(self, value: str, hops: int = 1, types=None, fanout: int = None,
+                       max_nodes: int = None) -> Traversal:
+        fanout, max_nodes = check_params(hops, fanout, max_nodes)
+        t = Traversal(max_nodes)
+        timeout = settings.traversal_timeout_s
+        async with self.driver.session() as s:
+            seed = await (await s.run(Query(SEED_Q, timeout=timeout), v=value)).single()
+            if seed is None:
+                return t
+            t.seed(seed.data())
+            hop = 0
+            while hop < hops and not t.done:
+                hop += 1
+                params = t.expand_params(types or DEFAULT_REL_TYPES, fanout)
+                t.add_hop(await (await s.run(Query(EXPAND_Q, timeout=timeout), **params)).data(), hop)
+            t.finish(hop, hops)
+            if t.frontier:
+                params = t.expand_params(types or DEFAULT_REL_TYPES, 0)
+                t.close(await (await s.run(Query(EXPAND_Q, timeout=timeout), **params)).data())
+        return t
+
+    async def relationships(self, value: str, hops: int = 1, types=None):
+        return (await self.traverse(value, hops, types)).related()
+
+    async def network(self, value: str, hops: int = 1, types=None, fanout: int = None, max_nodes: int = None,
+                      cursor: str = None, limit: int = None):
+        return (await self.traverse(value, hops, types, fanout, max_nodes)).network_page(cursor, limit)
@@ -0,0 +1,97 @@
+"""
+Storage backend protocol. The pipeline, the agent tools, src.queries and the
+local vector tier only use the methods below, so any class providing them
+can stand in for the Neo4j `Graph`. Select one with GRAPH_BACKEND:
+
+    neo4j     src.storage.graph_db.Graph (default)
+    embedded  src.storage.embedded_db.EmbeddedGraph, SQLite + NumPy in-process
+"""
+from typing import Any, Iterable, Iterator, Protocol
+
+from src.config import settings
+from src.storage.traversal import Traversal
+
+BACKENDS = ("neo4j", "embedded")
+
+
+class GraphBackend(Protocol):
+    def close(self): ...
+
+    def init_schema(self): ...
+
+    # ---------- Version ----------
+    def version(self) -> int: ...
+
+    def bump_version(self) -> int: ...
+
+    # ---------- Documents and chunks ----------
+    def upsert_document(self, doc: dict[str, Any]): ...
+
+    def document_fingerprints(self, doc_ids: list[str]) -> dict[str, str]: ...
+
+    def link_campaign(self, doc_id: str, campaign: str): ...
+
+    def add_chunk(self, doc_id: str, chunk: dict[str, Any]): ...
+
+    def add_chunks_bulk(self, doc_id: str, chunks: Iterable[dict[str, Any]], batch_size: int = None) -> int: ...
+
+    def chunk_ids(self, doc_id: str) -> set[str]: ...
+
+    def delete_chunks(self, doc_id: str, chunk_ids: list[str]) -> list[str]: ...
+
+    def all_chunk_ids(self) -> set[str]: ...
+
+    def iter_chunk_embeddings(self, ids: list[str] = None) -> Iterator: ...
+
+    # ---------- Indicators ----------
+    def add_indicator(self, ind: dict[str, Any], doc_id: str, context_chunk_id: str = None): ...
+
+    def add_indicators_bulk(self, inds: Iterable[dict[str, Any]], doc_id: str, batch_size: int = None) -> int: ...
+
+    def document_indicators(self, doc_id: str, types: tuple[str, ...] = None) -> set[str]: ...
+
+    def update_co_mentions(self, delta: list[list], batch_size: int = None) -> int: ...
+
+    def rebuild_co_mentions(self) -> int: ...
+
+    def document_campaigns(self, doc_id: str) -> list[str]: ...
+
+    def refresh_campaign_summary(self, values: Iterable[str], batch_size: int = None) -> int: ...
+
+    def rebuild_campaign_summary(self) -> int: ...
+
+    def relate(self, a_value: str, b_value: str, rel: str = "RELATED_TO"): ...
+
+    # ---------- Reads ----------
+    def vector_search(self, query_vec: list[float], k: int = 10) -> list[dict]: ...
+
+    def hybrid_search(self, text: str, query_vec: list[float], k: int = 10) -> list[dict]: ...
+
+    def indicator_lookup(self, typ: str, rank_by: str = None, limit: int = None) -> list[dict]: ...
+
+    def indicator_page(self, typ: str, cursor: str = None, limit: int = None, rank_by: str = None) -> dict: ...
+
+    def iter_indicators(self, typ: str, cursor: str = None, rank_by: str = None) -> Iterator[dict]: ...
+
+    def context_for_indicator(self, value: str) -> list[dict]: ...
+
+    def traverse(self, value: str, hops: int = 1, types=None, fanout: int = None,
+                 max_nodes: int = None) -> Traversal: ...
+
+    def relationships(self, value: str, hops: int = 1, types=None) -> list[dict]: ...
+
+    def network(self, value: str, hops: int = 1, types=None, fanout: int = None, max_nodes: int = None,
+                cursor: str = None, limit: int = None) -> dict: ...
+
+
+def create_graph(local_index=None) -> GraphBackend:
+    """The configured backend; `local_index` only applies to Neo4j."""
+    if settings.graph_backend == "neo4j":
+        from src.storage.graph_db import Graph
+
+        return Graph(local_index=local_index)
+    if settings.graph_backend == "embedded":
+        from src.storage.embedded_db import EmbeddedGraph
+
+        return EmbeddedGraph()
+    raise ValueError(f"GRAPH_BACKEND must be one of {BACKENDS}, got {settings.graph_backend!r}")
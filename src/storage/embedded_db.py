@@ -0,0 +1,667 @@
+"""
+Embedded graph backend: the GraphBackend surface on SQLite + NumPy, for CI
+benchmarks and single-analyst deployments where a Neo4j server is overkill.
+
+The data model mirrors Neo4j (same labels, keys, relationship types and
+properties), with property maps stored as JSON:
+
+    nodes(nid, label, key, props)     key = Document.id, Chunk.id, Indicator.value, Campaign.name
+    rels(rid, type, src, dst, props)  at most one relationship per (src, type, dst)
+
+Chunk embeddings are kept as float32 blobs and searched brute force from an
+in-memory matrix; chunk text is indexed with FTS5 for the keyword side of
+hybrid search. One connection is shared by all threads behind a lock.
+There is no Cypher, so there is no `fetch`: the src.queries helpers are
+methods of the same name here.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from itertools import islice
+from typing import Any, Iterable
+
+import numpy as np
+
+from src.config import settings
+from src.metrics import instrument
+from src.storage.graph_db import (RANKINGS, _batched, campaign_overlap_delta, co_mention_types,
+                                  decode_keyset, hydrate, indicator_page)
+from src.storage.traversal import DEFAULT_REL_TYPES, Traversal, check_params
+
+KEY_PROPS = {"Document": "id", "Chunk": "id", "Indicator": "value", "Campaign": "name", "ThreatActor": "name"}
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS nodes ("
+    " nid INTEGER PRIMARY KEY, label TEXT NOT NULL, key TEXT NOT NULL, props TEXT NOT NULL,"
+    " UNIQUE (label, key))",
+    "CREATE INDEX IF NOT EXISTS nodes_type ON nodes (label, json_extract(props, '$.type'), key)",
+    "CREATE TABLE IF NOT EXISTS rels ("
+    " rid INTEGER PRIMARY KEY, type TEXT NOT NULL, src INTEGER NOT NULL, dst INTEGER NOT NULL,"
+    " props TEXT NOT NULL, UNIQUE (src, type, dst))",
+    "CREATE INDEX IF NOT EXISTS rels_dst ON rels (dst, type)",
+    "CREATE INDEX IF NOT EXISTS rels_type ON rels (type)",
+    "CREATE TABLE IF NOT EXISTS embeddings (nid INTEGER PRIMARY KEY, vec BLOB NOT NULL)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS chunk_text USING fts5(text)",  # rowid = chunk nid
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+)
+
+_FTS_MAX_TERMS = 32
+_IN_LIMIT = 500  # ids per IN (...) clause, below SQLite's variable limit
+
+
+def fts_query(text: str) -> str:
+    """FTS5 counterpart of graph_db.lucene_query: quoted tokens, OR-ed."""
+    terms = []
+    for tok in text.split()[:_FTS_MAX_TERMS]:
+        if any(ch.isalnum() for ch in tok):
+            terms.append('"' + tok.replace('"', '""') + '"')
+    return " OR ".join(terms)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _placeholders(values) -> str:
+    return ",".join("?" * len(values))
+
+
+@instrument("embedded")
+class EmbeddedGraph:
+    def __init__(self, path: str = None, local_index=None):
+        path = settings.embedded_db_path if path is None else path
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.RLock()
+        self._matrix = None  # (chunk ids, normalized float32 matrix), rebuilt after chunk writes
+        # unused: search here is always in-process; accepted for parity with Graph
+        self.local_index = local_index
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def init_schema(self):
+        with self._lock, self._db:
+            for q in SCHEMA:
+                self._db.execute(q)
+
+    # ---------- Storage primitives ----------
+    def _nid(self, label: str, key: str) -> int | None:
+        row = self._db.execute("SELECT nid FROM nodes WHERE label=? AND key=?", (label, key)).fetchone()
+        return row[0] if row else None
+
+    def _merge_node(self, label: str, key: str, props: dict = None, keep: tuple = ()) -> int:
+        """MERGE + SET +=: None removes a property; `keep` properties are only set when absent."""
+        row = self._db.execute("SELECT nid, props FROM nodes WHERE label=? AND key=?", (label, key)).fetchone()
+        current = json.loads(row[1]) if row else {KEY_PROPS[label]: key}
+        for k, v in (props or {}).items():
+            if k in keep and current.get(k) is not None:
+                continue
+            if v is None:
+                current.pop(k, None)
+            else:
+                current[k] = v
+        if row is None:
+            return self._db.execute(
+                "INSERT INTO nodes (label, key, props) VALUES (?, ?, ?)", (label, key, json.dumps(current))
+            ).lastrowid
+        if props:
+            self._db.execute("UPDATE nodes SET props=? WHERE nid=?", (json.dumps(current), row[0]))
+        return row[0]
+
+    def _merge_rel(self, typ: str, src: int, dst: int, props: dict = None):
+        self._db.execute(
+            "INSERT INTO rels (type, src, dst, props) VALUES (?, ?, ?, json_patch('{}', ?))\n"
+            "ON CONFLICT (src, type, dst) DO UPDATE SET props = json_patch(props, excluded.props)",
+            (typ, src, dst, json.dumps(props or {})),
+        )
+
+    def _add_weight(self, typ: str, label: str, delta: list[list], prop: str):
+        """Apply [a, b, +/-n] to `prop` of (a)-[typ]->(b); relationships that drop to zero are removed."""
+        for a, b, w in delta:
+            src, dst = self._nid(label, a), self._nid(label, b)
+            if src is None or dst is None:
+                continue
+            row = self._db.execute(
+                f"SELECT rid, json_extract(props, '$.{prop}') FROM rels WHERE src=? AND type=? AND dst=?",
+                (src, typ, dst),
+            ).fetchone()
+            weight = (row[1] if row else 0) + w
+            if weight <= 0:
+                if row:
+                    self._db.execute("DELETE FROM rels WHERE rid=?", (row[0],))
+            elif row:
+                self._db.execute(f"UPDATE rels SET props=json_set(props, '$.{prop}', ?) WHERE rid=?", (weight, row[0]))
+            else:
+                self._merge_rel(typ, src, dst, {prop: weight})
+
+    def _detach_delete(self, nids: list[int]):
+        for i in range(0, len(nids), _IN_LIMIT):
+            part = nids[i:i + _IN_LIMIT]
+            ph = _placeholders(part)
+            self._db.execute(f"DELETE FROM rels WHERE src IN ({ph}) OR dst IN ({ph})", part + part)
+            self._db.execute(f"DELETE FROM embeddings WHERE nid IN ({ph})", part)
+            self._db.execute(f"DELETE FROM chunk_text WHERE rowid IN ({ph})", part)
+            self._db.execute(f"DELETE FROM nodes WHERE nid IN ({ph})", part)
+
+    def _rows(self, q: str, params=()) -> list[dict]:
+        with self._lock:
+            cur = self._db.execute(q, params)
+            cols = [c[0] for c in cur.description]
+            return [dict(zip(cols, r)) for r in cur]
+
+    # ---------- Version ----------
+    def version(self) -> int:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key='graph'").fetchone()
+        return row[0] if row else 0
+
+    def bump_version(self) -> int:
+        with self._lock, self._db:
+            return self._db.execute(
+                "INSERT INTO meta (key, value) VALUES ('graph', 1)\n"
+                "ON CONFLICT (key) DO UPDATE SET value = value + 1 RETURNING value"
+            ).fetchone()[0]
+
+    # ---------- Document ----------
+    def upsert_document(self, doc: dict[str, Any]):
+        with self._lock, self._db:
+            self._merge_node("Document", doc["id"], doc)
+
+    def document_fingerprints(self, doc_ids: list[str]) -> dict[str, str]:
+        doc_ids, found = list(doc_ids), {}
+        for i in range(0, len(doc_ids), _IN_LIMIT):
+            part = doc_ids[i:i + _IN_LIMIT]
+            rows = self._rows(
+                f"SELECT key, json_extract(props, '$.fingerprint') AS fp FROM nodes\n"
+                f"WHERE label='Document' AND key IN ({_placeholders(part)}) AND fp IS NOT NULL",
+                part,
+            )
+            found.update((r["key"], r["fp"]) for r in rows)
+        return found
+
+    def link_campaign(self, doc_id: str, campaign: str):
+        with self._lock, self._db:
+            doc = self._nid("Document", doc_id)
+            camp = self._merge_node("Campaign", campaign)
+            if doc is not None:
+                self._merge_rel("PART_OF_CAMPAIGN", doc, camp)
+
+    # ---------- Chunk ----------
+    def _write_chunk(self, doc: int, chunk: dict[str, Any]):
+        props = {k: v for k, v in chunk.items() if k != "embedding"}
+        nid = self._merge_node("Chunk", chunk["id"], props)
+        if chunk.get("embedding") is not None:
+            vec = np.asarray(chunk["embedding"], dtype=np.float32).tobytes()
+            self._db.execute("INSERT OR REPLACE INTO embeddings (nid, vec) VALUES (?, ?)", (nid, vec))
+        if "text" in chunk:
+            self._db.execute("DELETE FROM chunk_text WHERE rowid=?", (nid,))
+            self._db.execute("INSERT INTO chunk_text (rowid, text) VALUES (?, ?)", (nid, chunk["text"] or ""))
+        self._merge_rel("PART_OF", nid, doc)
+
+    def add_chunk(self, doc_id: str, chunk: dict[str, Any]):
+        self.add_chunks_bulk(doc_id, [chunk])
+
+    def add_chunks_bulk(self, doc_id: str, chunks: Iterable[dict[str, Any]], batch_size: int = None):
+        """Write chunks one transaction per batch; nothing is written for an unknown document."""
+        written = 0
+        for batch in _batched(chunks, batch_size or settings.write_batch_size):
+            with self._lock, self._db:
+                doc = self._nid("Document", doc_id)
+                if doc is None:
+                    return written
+                for chunk in batch:
+                    self._write_chunk(doc, chunk)
+                self._matrix = None
+            written += len(batch)
+        return written
+
+    def chunk_ids(self, doc_id: str) -> set[str]:
+        rows = self._rows(
+            "SELECT c.key FROM nodes d JOIN rels r ON r.dst = d.nid AND r.type = 'PART_OF'\n"
+            "JOIN nodes c ON c.nid = r.src WHERE d.label = 'Document' AND d.key = ?",
+            (doc_id,),
+        )
+        return {r["key"] for r in rows}
+
+    def delete_chunks(self, doc_id: str, chunk_ids: list[str]) -> list[str]:
+        """
+        Remove chunks of a document together with the MENTIONED_IN edges that
+        point at them. Returns the indicator values whose edge was removed.
+        """
+        ids = set(chunk_ids)
+        with self._lock, self._db:
+            doc = self._nid("Document", doc_id)
+            if doc is None:
+                return []
+            mentions = self._db.execute(
+                "SELECT r.rid, i.key, json_extract(r.props, '$.contextChunkId') FROM rels r\n"
+                "JOIN nodes i ON i.nid = r.src WHERE r.dst = ? AND r.type = 'MENTIONED_IN'",
+                (doc,),
+            ).fetchall()
+            dropped = [(rid, value) for rid, value, cid in mentions if cid in ids]
+            self._db.executemany("DELETE FROM rels WHERE rid=?", [(rid,) for rid, _ in dropped])
+            chunks = self._db.execute(
+                "SELECT c.nid, c.key FROM rels r JOIN nodes c ON c.nid = r.src\n"
+                "WHERE r.dst = ? AND r.type = 'PART_OF'",
+                (doc,),
+            ).fetchall()
+            self._detach_delete([nid for nid, key in chunks if key in ids])
+            self._matrix = None
+        return sorted({value for _, value in dropped})
+
+    def all_chunk_ids(self) -> set[str]:
+        return {r["key"] for r in self._rows("SELECT key FROM nodes WHERE label='Chunk'")}
+
+    def iter_chunk_embeddings(self, ids: list[str] = None):
+        """Stream (chunk id, embedding) pairs, optionally only for `ids`."""
+        q = "SELECT n.key, e.vec FROM embeddings e JOIN nodes n ON n.nid = e.nid"
+        if ids is None:
+            batches = [None]
+        else:
+            ids = list(ids)
+            batches = [ids[i:i + _IN_LIMIT] for i in range(0, len(ids), _IN_LIMIT)]
+        for part in batches:
+            where = "" if part is None else f" WHERE n.label='Chunk' AND n.key IN ({_placeholders(part)})"
+            with self._lock:
+                rows = self._db.execute(q + where, part or ()).fetchall()
+            for key, blob in rows:
+                yield key, np.frombuffer(blob, dtype=np.float32)
+
+    # ---------- Indicator ----------
+    def _mention(self, doc: int, row: dict):
+        ind = self._merge_node(
+            "Indicator", row["value"],
+            {"type": row["type"], "firstSeen": row.get("firstSeen"), "lastSeen": row.get("lastSeen")},
+            keep=("firstSeen",),
+        )
+        props = {"confidence": row.get("confidence", 0.9), "contextChunkId": row.get("contextChunkId"), "ts": _now_ms()}
+        if "chunkIds" in row:
+            props["chunkIds"] = row["chunkIds"]
+        self._merge_rel("MENTIONED_IN", ind, doc, props)
+
+    def add_indicator(self, ind: dict[str, Any], doc_id: str, context_chunk_id: str = None):
+        with self._lock, self._db:
+            doc = self._nid("Document", doc_id)
+            if doc is not None:
+                self._mention(doc, {k: v for k, v in ind.items() if k != "chunkIds"} | {"contextChunkId": context_chunk_id})
+
+    def add_indicators_bulk(self, inds: Iterable[dict[str, Any]], doc_id: str, batch_size: int = None):
+        """
+        Bulk version of `add_indicator`. Each row carries the indicator fields
+        plus optional `contextChunkId` and `chunkIds` (every chunk mentioning it).
+        """
+        written = 0
+        rows = ({**ind, "chunkIds": ind.get("chunkIds")} for ind in inds)
+        for batch in _batched(rows, batch_size or settings.write_batch_size):
+            with self._lock, self._db:
+                doc = self._nid("Document", doc_id)
+                if doc is None:
+                    return written
+                for row in batch:
+                    self._mention(doc, row)
+            written += len(batch)
+        return written
+
+    def document_indicators(self, doc_id: str, types: tuple[str, ...] = None) -> set[str]:
+        rows = self._rows(
+            "SELECT DISTINCT i.key, json_extract(i.props, '$.type') AS type FROM nodes d\n"
+            "JOIN rels r ON r.dst = d.nid AND r.type = 'MENTIONED_IN'\n"
+            "JOIN nodes i ON i.nid = r.src WHERE d.label = 'Document' AND d.key = ?",
+            (doc_id,),
+        )
+        return {r["key"] for r in rows if types is None or (r["type"] or "").startswith(tuple(types))}
+
+    # ---------- Co-mentions ----------
+    def update_co_mentions(self, delta: list[list], batch_size: int = None) -> int:
+        """Apply [a, b, +/-n] weight changes; edges that drop to zero are removed."""
+        for batch in _batched(delta, batch_size or settings.write_batch_size):
+            with self._lock, self._db:
+                self._add_weight("CO_MENTIONED", "Indicator", batch, "weight")
+        return len(delta)
+
+    def rebuild_co_mentions(self) -> int:
+        """Recompute every CO_MENTIONED edge from the MENTIONED_IN edges."""
+        types = co_mention_types()
+        typed, params = "", []
+        if types is not None:
+            match = " OR ".join(["instr(json_extract({}.props, '$.type'), ?) = 1"] * len(types)) or "0"
+            typed = f" AND ({match.format('na')}) AND ({match.format('nb')})"
+            params = [*types, *types]
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM rels WHERE type='CO_MENTIONED'")
+            self._db.execute(
+                "INSERT INTO rels (type, src, dst, props)\n"
+                "SELECT 'CO_MENTIONED', a.src, b.src, json_object('weight', count(*))\n"
+                "FROM rels a JOIN rels b ON b.dst = a.dst AND b.type = 'MENTIONED_IN'\n"
+                "JOIN nodes na ON na.nid = a.src JOIN nodes nb ON nb.nid = b.src\n"
+                f"WHERE a.type = 'MENTIONED_IN' AND na.key < nb.key{typed} GROUP BY a.src, b.src",
+                params,
+            )
+            n = self._db.execute("SELECT count(*) FROM rels WHERE type='CO_MENTIONED'").fetchone()[0]
+        self.bump_version()
+        return n
+
+    # ---------- Campaign summary ----------
+    # Same model as Graph: IN_CAMPAIGN edges mirrored in i.campaigns /
+    # i.campaignCount, and OVERLAPS {count} between campaigns (a.name < b.name).
+    def document_campaigns(self, doc_id: str) -> list[str]:
+        rows = self._rows(
+            "SELECT c.key FROM nodes d JOIN rels r ON r.src = d.nid AND r.type = 'PART_OF_CAMPAIGN'\n"
+            "JOIN nodes c ON c.nid = r.dst WHERE d.label = 'Document' AND d.key = ?",
+            (doc_id,),
+        )
+        return [r["key"] for r in rows]
+
+    def refresh_campaign_summary(self, values: Iterable[str], batch_size: int = None) -> int:
+        """Recompute the campaign summary of the given indicators; returns how many changed."""
+        changed = 0
+        for batch in _batched(values, batch_size or settings.write_batch_size):
+            with self._lock, self._db:
+                old, new, nids = {}, {}, {}
+                for value in batch:
+                    nid = self._nid("Indicator", value)
+                    if nid is None:
+                        continue
+                    before = {k for (k,) in self._db.execute(
+                        "SELECT c.key FROM rels r JOIN nodes c ON c.nid = r.dst WHERE r.src = ? AND r.type = 'IN_CAMPAIGN'",
+                        (nid,),
+                    )}
+                    after = {k for (k,) in self._db.execute(
+                        "SELECT DISTINCT c.key FROM rels m\n"
+                        "JOIN rels p ON p.src = m.dst AND p.type = 'PART_OF_CAMPAIGN' JOIN nodes c ON c.nid = p.dst\n"
+                        "WHERE m.src = ? AND m.type = 'MENTIONED_IN'",
+                        (nid,),
+                    )}
+                    if before != after:
+                        old[value], new[value], nids[value] = before, after, nid
+                for value, campaigns in new.items():
+                    nid = nids[value]
+                    self._merge_node("Indicator", value, {"campaigns": sorted(campaigns), "campaignCount": len(campaigns)})
+                    self._db.execute("DELETE FROM rels WHERE src=? AND type='IN_CAMPAIGN'", (nid,))
+                    for name in campaigns:
+                        self._merge_rel("IN_CAMPAIGN", nid, self._nid("Campaign", name))
+                self._add_weight("OVERLAPS", "Campaign", campaign_overlap_delta(old, new), "count")
+            changed += len(new)
+        return changed
+
+    def rebuild_campaign_summary(self) -> int:
+        """Drop and recompute the whole campaign summary."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM rels WHERE type IN ('IN_CAMPAIGN', 'OVERLAPS')")
+            self._db.execute(
+                "UPDATE nodes SET props = json_remove(props, '$.campaigns', '$.campaignCount')\n"
+                "WHERE label = 'Indicator' AND json_extract(props, '$.campaigns') IS NOT NULL"
+            )
+            values = [k for (k,) in self._db.execute("SELECT key FROM nodes WHERE label='Indicator'")]
+        changed = self.refresh_campaign_summary(values)
+        self.bump_version()
+        return changed
+
+    # ---------- Relationships ----------
+    def relate(self, a_value: str, b_value: str, rel: str = "RELATED_TO"):
+        with self._lock, self._db:
+            a, b = self._nid("Indicator", a_value), self._nid("Indicator", b_value)
+            if a is None or b is None:
+                return
+            self._merge_rel(rel, a, b)
+        self.bump_version()
+
+    # ---------- Search ----------
+    def _vectors(self) -> tuple[list[str], np.ndarray]:
+        with self._lock:
+            if self._matrix is None:
+                rows = self._db.execute(
+                    "SELECT n.key, e.vec FROM embeddings e JOIN nodes n ON n.nid = e.nid"
+                ).fetchall()
+                ids = [key for key, _ in rows]
+                mat = np.stack([np.frombuffer(blob, dtype=np.float32) for _, blob in rows]) if rows else None
+                if mat is not None:
+                    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+                    mat = mat / np.where(norms == 0, 1, norms)
+                self._matrix = (ids, mat)
+            return self._matrix
+
+    def _vector_hits(self, query_vec: list[float], k: int) -> list[tuple[str, float]]:
+        ids, mat = self._vectors()
+        if not ids or k <= 0:
+            return []
+        q = np.asarray(query_vec, dtype=np.float32)
+        scores = mat @ (q / (np.linalg.norm(q) or 1.0))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(ids) else np.arange(len(ids))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        # same scale as the Neo4j cosine vector index: (1 + cos) / 2
+        return [(ids[i], float((1 + scores[i]) / 2)) for i in top]
+
+    def _chunks(self, ids: list[str]) -> list[dict]:
+        if not ids:
+            return []
+        rows = self._rows(
+            f"SELECT props FROM nodes WHERE label='Chunk' AND key IN ({_placeholders(ids)})", ids
+        )
+        return [json.loads(r["props"]) for r in rows]
+
+    def vector_search(self, query_vec: list[float], k: int = 10):
+        hits = self._vector_hits(query_vec, k)
+        return hydrate(hits, self._chunks([cid for cid, _ in hits]))
+
+    def hybrid_search(self, text: str, query_vec: list[float], k: int = 10):
+        """Vector and FTS5 candidates merged with reciprocal rank fusion, as in Graph."""
+        ftq = fts_query(text)
+        if not ftq:
+            return self.vector_search(query_vec, k)
+        kc = k * settings.hybrid_overfetch
+        keyword = [r["key"] for r in self._rows(
+            "SELECT n.key FROM chunk_text JOIN nodes n ON n.nid = chunk_text.rowid\n"
+            "WHERE chunk_text MATCH ? ORDER BY rank LIMIT ?",
+            (ftq, kc),
+        )]
+        scores = {}
+        for ranked in ([cid for cid, _ in self._vector_hits(query_vec, kc)], keyword):
+            for rank, cid in enumerate(ranked, start=1):
+                scores[cid] = scores.get(cid, 0.0) + 1.0 / (settings.rrf_k + rank)
+        hits = sorted(scores.items(), key=lambda kv: -kv[1])[:k]
+        return hydrate(hits, self._chunks([cid for cid, _ in hits]))
+
+    # ---------- Indicator Queries ----------
+    @staticmethod
+    def _lookup_sql(rank_by: str = None, after: bool = False) -> str:
+        """SQL twin of graph_db.indicator_lookup_query, always with a LIMIT."""
+        if rank_by is None:
+            ret, where, order = "", " AND key > :after_value" if after else "", "key"
+        elif rank_by in RANKINGS:
+            score = f"json_extract(props, '$.{RANKINGS[rank_by]}')"
+            ret = (
+                f", {score} AS score, json_extract(props, '$.community') AS community, "
+                "json_extract(props, '$.component') AS component"
+            )
+            where = f" AND {score} IS NOT NULL"
+            if after:
+                where += f" AND {score} <= :after_score AND ({score} < :after_score OR key > :after_value)"
+            order = f"{score} DESC, key"
+        else:
+            raise ValueError(f"rank_by must be one of {sorted(RANKINGS)}")
+        return (
+            f"SELECT key AS value, json_extract(props, '$.type') AS type{ret} FROM nodes\n"
+            f"WHERE label = 'Indicator' AND json_extract(props, '$.type') = :typ{where}\n"
+            f"ORDER BY {order} LIMIT :limit"
+        )
+
+    def indicator_lookup(self, typ: str, rank_by: str = None, limit: int = None):
+        return self._rows(self._lookup_sql(rank_by), {"typ": typ, "limit": -1 if limit is None else limit})
+
+    def indicator_page(self, typ: str, cursor: str = None, limit: int = None, rank_by: str = None) -> dict:
+        limit = limit or settings.indicator_page_size
+        after = decode_keyset(cursor, rank_by)
+        rows = self._rows(self._lookup_sql(rank_by, after=bool(after)), {"typ": typ, "limit": limit + 1, **after})
+        return indicator_page(rows, rank_by, limit)
+
+    def iter_indicators(self, typ: str, cursor: str = None, rank_by: str = None):
+        """Stream indicators of a type, one keyset page of INDICATOR_FETCH_SIZE at a time."""
+        while True:
+            page = self.indicator_page(typ, cursor, settings.indicator_fetch_size, rank_by)
+            yield from page["results"]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return
+
+    def context_for_indicator(self, value: str):
+        return self._rows(
+            "SELECT d.key AS documentId, json_extract(c.props, '$.text') AS chunkText,\n"
+            "       json_extract(r.props, '$.confidence') AS confidence, json_extract(r.props, '$.ts') AS ts\n"
+            "FROM nodes i JOIN rels r ON r.src = i.nid AND r.type = 'MENTIONED_IN' JOIN nodes d ON d.nid = r.dst\n"
+            "LEFT JOIN nodes c ON c.label = 'Chunk' AND c.key = json_extract(r.props, '$.contextChunkId')\n"
+            "WHERE i.label = 'Indicator' AND i.key = ?",
+            (value,),
+        )
+
+    # ---------- Traversal ----------
+    def _degree(self, nid: int) -> int:
+        return self._db.execute(
+            "SELECT (SELECT count(*) FROM rels WHERE src = :n) + (SELECT count(*) FROM rels WHERE dst = :n)",
+            {"n": nid},
+        ).fetchone()[0]
+
+    def _node_row(self, nid: int, label: str, key: str) -> dict:
+        return {"nid": str(nid), "labels": [label], "value": key, "degree": self._degree(nid)}
+
+    def _expand(self, frontier: list[str], seen: list[str], types: list[str], fanout: int, scan: int) -> list[dict]:
+        """
+        EXPAND_Q in Python: per frontier node, scan <= `scan` edges, keep the
+        `fanout` best-connected unseen neighbors plus every edge to a seen node.
+        """
+        seen, rows = set(seen), []
+        for sid in map(int, frontier):
+            cur = self._db.execute(
+                "SELECT r.rid, r.type, r.src, r.dst, m.nid, m.label, m.key FROM rels r\n"
+                "JOIN nodes m ON m.nid = CASE WHEN r.src = ? THEN r.dst ELSE r.src END\n"
+                f"WHERE (r.src = ? OR r.dst = ?) AND r.type IN ({_placeholders(types)})",
+                [sid, sid, sid, *types],
+            )
+            scanned = list(islice(cur, scan))
+            known = [(0, r) for r in scanned if str(r[4]) in seen]
+            picked = [(self._degree(r[4]), r) for r in scanned if str(r[4]) not in seen]
+            picked.sort(key=lambda p: (-p[0], p[1][4]))
+            for degree, (rid, typ, src, dst, nid, label, key) in known + picked[:fanout]:
+                rows.append({
+                    "nid": str(nid), "labels": [label], "value": key, "degree": degree,
+                    "rid": str(rid), "type": typ, "source": str(src), "target": str(dst),
+                })
+        return rows
+
+    def traverse(self, value: str, hops: int = 1, types=None, fanout: int = None, max_nodes: int = None) -> Traversal:
+        """Bounded traversal around an indicator (see src.storage.traversal)."""
+        fanout, max_nodes = check_params(hops, fanout, max_nodes)
+        t = Traversal(max_nodes)
+        with self._lock:
+            seed = self._nid("Indicator", value)
+            if seed is None:
+                return t
+            t.seed(self._node_row(seed, "Indicator", value))
+            hop = 0
+            while hop < hops and not t.done:
+                hop += 1
+                t.add_hop(self._expand(**t.expand_params(types or DEFAULT_REL_TYPES, fanout)), hop)
+            t.finish(hop, hops)
+            if t.frontier:
+                t.close(self._expand(**t.expand_params(types or DEFAULT_REL_TYPES, 0)))
+        return t
+
+    def relationships(self, value: str, hops: int = 1, types=None):
+        return self.traverse(value, hops, types).related()
+
+    def network(self, value: str, hops: int = 1, types=None, fanout: int = None, max_nodes: int = None,
+                cursor: str = None, limit: int = None):
+        return self.traverse(value, hops, types, fanout, max_nodes).network_page(cursor, limit)
+
+    # ---------- src.queries helpers ----------
+    def clusters_by_handle(self):
+        return self._rows(
+            "SELECT i.key AS a, j.key AS b, json_extract(r.props, '$.weight') AS w\n"
+            "FROM rels r JOIN nodes i ON i.nid = r.src JOIN nodes j ON j.nid = r.dst\n"
+            "WHERE r.type = 'CO_MENTIONED' AND json_extract(r.props, '$.weight') > 0\n"
+            "  AND json_extract(i.props, '$.type') LIKE 'social:%' AND json_extract(j.props, '$.type') LIKE 'social:%'\n"
+            "ORDER BY w DESC LIMIT 100"
+        )
+
+    def across_campaigns(self):
+        rows = self._rows(
+            "SELECT key AS indicator, json_extract(props, '$.campaigns') AS camps FROM nodes\n"
+            "WHERE label = 'Indicator' AND json_extract(props, '$.campaignCount') > 1"
+        )
+        return [dict(r, camps=json.loads(r["camps"])) for r in rows]
+
+    def shared_indicators(self, a: str, b: str, limit: int = 500):
+        return self._rows(
+            "SELECT i.key AS value, json_extract(i.props, '$.type') AS type,\n"
+            "       json_extract(i.props, '$.campaignCount') AS campaignCount\n"
+            "FROM nodes ca JOIN rels ra ON ra.dst = ca.nid AND ra.type = 'IN_CAMPAIGN'\n"
+            "JOIN rels rb ON rb.src = ra.src AND rb.type = 'IN_CAMPAIGN'\n"
+            "JOIN nodes cb ON cb.nid = rb.dst AND cb.label = 'Campaign' AND cb.key = :b\n"
+            "JOIN nodes i ON i.nid = ra.src\n"
+            "WHERE ca.label = 'Campaign' AND ca.key = :a\n"
+            "ORDER BY campaignCount DESC, value LIMIT :limit",
+            {"a": a, "b": b, "limit": limit},
+        )
+
+    def campaign_overlaps(self, campaign: str = None, limit: int = 100):
+        return self._rows(
+            "SELECT a.key AS a, b.key AS b, json_extract(o.props, '$.count') AS shared\n"
+            "FROM rels o JOIN nodes a ON a.nid = o.src JOIN nodes b ON b.nid = o.dst\n"
+            "WHERE o.type = 'OVERLAPS' AND (:c IS NULL OR :c IN (a.key, b.key))\n"
+            "ORDER BY shared DESC LIMIT :limit",
+            {"c": campaign, "limit": limit},
+        )
+
+    def timeline(self, value: str):
+        return self._rows(
+            "SELECT d.key AS documentId, json_extract(r.props, '$.ts') AS ts\n"
+            "FROM nodes i JOIN rels r ON r.src = i.nid AND r.type = 'MENTIONED_IN' JOIN nodes d ON d.nid = r.dst\n"
+            "WHERE i.label = 'Indicator' AND i.key = ? ORDER BY ts",
+            (value,),
+        )
+
+
+class AsyncEmbeddedGraph:
+    """
+    AsyncGraph surface over a shared EmbeddedGraph for the API: every call
+    runs in a worker thread so SQLite and NumPy work never blocks the loop.
+    The wrapped graph is owned (and closed) by whoever built it.
+    """
+
+    def __init__(self, graph: EmbeddedGraph):
+        self.graph = graph
+
+    async def close(self):
+        pass
+
+    async def ensure_schema(self):
+        pass  # the sync graph initialised it
+
+    async def stream_indicators(self, typ: str, cursor: str = None, rank_by: str = None):
+        while True:
+            page = await asyncio.to_thread(
+                self.graph.indicator_page, typ, cursor, settings.indicator_fetch_size, rank_by
+            )
+            for row in page["results"]:
+                yield row
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return
+
+    def __getattr__(self, name):
+        fn = getattr(self.graph, name)
+
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(fn, *args, **kwargs)
+
+        return call
@@ -1,41 +1,313 @@
-from typing import Any
+import base64
+import json
+from collections import Counter
+from itertools import islice
+from typing import Any, Iterable
 
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, Query
 
 from src.config import settings
+from src.embedding.quantize import decode_embedding, embedding_props
+from src.metrics import instrument
+from src.storage.traversal import (DEFAULT_REL_TYPES, EXPAND_Q, SEED_Q, Traversal,
+                                   check_params)
 
 EMBED_DIM = 384  # all-MiniLM-L6-v2
 
-SCHEMA_QUERIES = [
-    # Constraints
-    "CREATE CONSTRAINT doc_id IF NOT EXISTS FOR (d:Document) REQUIRE d.id IS UNIQUE",
-    "CREATE CONSTRAINT chunk_id IF NOT EXISTS FOR (c:Chunk) REQUIRE c.id IS UNIQUE",
-    "CREATE CONSTRAINT ind_id IF NOT EXISTS FOR (i:Indicator) REQUIRE i.value IS UNIQUE",
-    "CREATE CONSTRAINT camp_id IF NOT EXISTS FOR (c:Campaign) REQUIRE c.name IS UNIQUE",
-    "CREATE CONSTRAINT actor_id IF NOT EXISTS FOR (a:ThreatActor) REQUIRE a.name IS UNIQUE",
+# Constraints and indexes live in src.storage.migrations.
 
-    # Vector indexes (native)
-    f"CREATE VECTOR INDEX chunk_vec IF NOT EXISTS "
-    f"FOR (c:Chunk) ON (c.embedding) "
-    f"OPTIONS {{indexConfig: {{`vector.dimensions`: {EMBED_DIM}, "
-    f"`vector.similarity_function`: 'cosine'}}}}",
-]
 
+# ---------- Read queries (shared with AsyncGraph) ----------
+VECTOR_SEARCH_Q = (
+    "CALL db.index.vector.queryNodes('chunk_vec', $k, $vec) YIELD node, score\n"
+    "RETURN node as chunk, score ORDER BY score DESC"
+)
 
+# Hybrid: vector candidates from chunk_vec and keyword candidates from the
+# chunk_text full-text index, merged with reciprocal rank fusion
+# (score = sum of 1 / (rrf_k + rank) over the lists a chunk appears in).
+HYBRID_SEARCH_Q = (
+    "CALL {\n"
+    "  CALL db.index.vector.queryNodes('chunk_vec', $kc, $vec) YIELD node, score\n"
+    "  WITH node ORDER BY score DESC\n"
+    "  WITH collect(node) AS nodes\n"
+    "  UNWIND range(0, size(nodes) - 1) AS i\n"
+    "  RETURN nodes[i] AS node, i + 1 AS rank\n"
+    "  UNION ALL\n"
+    "  CALL db.index.fulltext.queryNodes('chunk_text', $ftq, {limit: $kc}) YIELD node, score\n"
+    "  WITH node ORDER BY score DESC\n"
+    "  WITH collect(node) AS nodes\n"
+    "  UNWIND range(0, size(nodes) - 1) AS i\n"
+    "  RETURN nodes[i] AS node, i + 1 AS rank\n"
+    "}\n"
+    "WITH node, sum(1.0 / ($rrf_k + rank)) AS score\n"
+    "RETURN node {.*, embedding: null, embedding_q: null, embedding_scale: null, embedding_f32: null} AS chunk, score ORDER BY score DESC LIMIT $k"
+)
+
+_LUCENE_MAX_TERMS = 32
+
+
+def lucene_query(text: str) -> str:
+    """
+    Turn free text into a safe full-text query: every whitespace token is
+    quoted (so IOC-like tokens such as domains or URLs match as phrases and
+    Lucene operators in user input are inert) and terms are OR-ed.
+    """
+    terms = []
+    for tok in text.split()[:_LUCENE_MAX_TERMS]:
+        tok = tok.replace("\\", "\\\\").replace('"', '\\"')
+        terms.append(f'"{tok}"')
+    return " ".join(terms)
+
+
+# Same fusion, but the vector candidates come ranked from the local index
+# (src.storage.vector_index) as $vids instead of from chunk_vec.
+HYBRID_LOCAL_Q = HYBRID_SEARCH_Q.replace(
+    "  CALL db.index.vector.queryNodes('chunk_vec', $kc, $vec) YIELD node, score\n"
+    "  WITH node ORDER BY score DESC\n"
+    "  WITH collect(node) AS nodes\n"
+    "  UNWIND range(0, size(nodes) - 1) AS i\n"
+    "  RETURN nodes[i] AS node, i + 1 AS rank\n",
+    "  UNWIND range(0, size($vids) - 1) AS i\n"
+    "  MATCH (node:Chunk {id: $vids[i]})\n"
+    "  RETURN node, i + 1 AS rank\n",
+)
+
+CHUNKS_BY_IDS_Q = (
+    "UNWIND $ids AS cid MATCH (c:Chunk {id: cid})\n"
+    "RETURN c {.*, embedding: null, embedding_q: null, embedding_scale: null, embedding_f32: null} AS chunk"
+)
+
+
+def hybrid_query(text: str, query_vec: list[float], k: int, local_index=None) -> tuple[str, dict]:
+    """
+    Cypher + parameters for hybrid search. Callers fall back to vector_search
+    when `text` has no terms. The vector side runs in-process when the
+    local index is in use.
+    """
+    kc = k * settings.hybrid_overfetch
+    ftq = lucene_query(text)
+    if uses_local_index(local_index):
+        vids = [cid for cid, _ in local_index.search(query_vec, kc)]
+        return HYBRID_LOCAL_Q, {"k": k, "kc": kc, "vids": vids, "ftq": ftq, "rrf_k": settings.rrf_k}
+    return HYBRID_SEARCH_Q, {"k": k, "kc": kc, "vec": query_vec, "ftq": ftq, "rrf_k": settings.rrf_k}
+
+
+def hydrate(hits: list[tuple[str, float]], rows: list[dict]) -> list[dict]:
+    """Attach local-index scores to chunk rows, keeping the hit order."""
+    by_id = {r["id"]: r for r in rows}
+    return [dict(by_id[cid], _score=score) for cid, score in hits if cid in by_id]
+
+
+# Scores written by src.analytics.graph_analytics, by ranking name
+RANKINGS = {"pagerank": "pagerank", "degree": "degreeCentrality"}
+
+
+def indicator_lookup_query(rank_by: str = None, after: bool = False, limit: bool = True) -> str:
+    """
+    Lookup by type in a stable order: by value, or by a precomputed score
+    (ties by value). Ranked results only cover indicators scored by the
+    last analytics run. With `after`, rows continue past the keyset
+    `$after_value` (and `$after_score`), which the (type, value) and
+    (type, score) indexes serve without skipping over earlier rows. The
+    ranked predicate leads with `score <= $after_score` so it is a range
+    seek; the OR only filters the ties at the boundary score.
+    """
+    if rank_by is None:
+        where = " WHERE i.value > $after_value" if after else ""
+        ret, order = "i.value AS value, i.type AS type", "i.value"
+    elif rank_by in RANKINGS:
+        prop = RANKINGS[rank_by]
+        where = f" WHERE i.{prop} IS NOT NULL"
+        if after:
+            where += f" AND i.{prop} <= $after_score AND (i.{prop} < $after_score OR i.value > $after_value)"
+        ret = (
+            f"i.value AS value, i.type AS type, i.{prop} AS score, "
+            "i.community AS community, i.component AS component"
+        )
+        order = f"i.{prop} DESC, i.value"
+    else:
+        raise ValueError(f"rank_by must be one of {sorted(RANKINGS)}")
+    return (
+        f"MATCH (i:Indicator {{type:$typ}}){where}\n"
+        f"RETURN {ret}\n"
+        f"ORDER BY {order}" + (" LIMIT $limit" if limit else "")
+    )
+
+
+def encode_keyset(rank_by: str | None, row: dict) -> str:
+    key = [row["value"]] if rank_by is None else [row["score"], row["value"]]
+    return base64.urlsafe_b64encode(json.dumps({"r": rank_by, "k": key}).encode()).decode()
+
+
+def decode_keyset(cursor: str | None, rank_by: str | None) -> dict:
+    """Query parameters continuing after `cursor`; empty for the first page."""
+    if not cursor:
+        return {}
+    try:
+        token = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        key = token["k"]
+        if not isinstance(key, list) or len(key) != (1 if rank_by is None else 2):
+            raise ValueError
+    except (ValueError, KeyError, TypeError):
+        raise ValueError(f"invalid cursor {cursor!r}")
+    if token.get("r") != rank_by:
+        raise ValueError("cursor belongs to a different rank_by")
+    return {"after_value": key[0]} if rank_by is None else {"after_score": key[0], "after_value": key[1]}
+
+
+def indicator_page(rows: list[dict], rank_by: str | None, limit: int) -> dict:
+    """Trim a limit + 1 fetch to a page and derive the next cursor."""
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return {"results": rows, "next_cursor": encode_keyset(rank_by, rows[-1]) if more else None}
+
+
+# Monotonic counter bumped by every write path; read-side caches key on it.
+GRAPH_VERSION_Q = "MATCH (m:GraphMeta {key:'graph'}) RETURN m.version AS version"
+BUMP_VERSION_Q = (
+    "MERGE (m:GraphMeta {key:'graph'}) "
+    "SET m.version = coalesce(m.version, 0) + 1, m.updated = timestamp() RETURN m.version AS version"
+)
+
+CONTEXT_Q = (
+    "MATCH (i:Indicator {value:$v})-[r:MENTIONED_IN]->(d:Document)\n"
+    "OPTIONAL MATCH (c:Chunk {id:r.contextChunkId})\n"
+    "RETURN d.id AS documentId, c.text AS chunkText, "
+    "r.confidence AS confidence, r.ts AS ts"
+)
+
+# Campaign summary (see Graph.refresh_campaign_summary); the read write-locks
+# each indicator before reading its old and new campaign sets.
+CAMPAIGN_SUMMARY_READ_Q = (
+    "UNWIND $values AS v MATCH (i:Indicator {value:v})\n"
+    "SET i._lock = true REMOVE i._lock\n"
+    "WITH v, i\n"
+    "CALL { WITH i OPTIONAL MATCH (i)-[:IN_CAMPAIGN]->(c:Campaign) RETURN collect(c.name) AS old }\n"
+    "CALL {\n"
+    "  WITH i OPTIONAL MATCH (i)-[:MENTIONED_IN]->(:Document)-[:PART_OF_CAMPAIGN]->(c:Campaign)\n"
+    "  RETURN collect(DISTINCT c.name) AS new\n"
+    "}\n"
+    "RETURN v, old, new"
+)
+CAMPAIGN_SUMMARY_WRITE_Q = (
+    "UNWIND $rows AS row MATCH (i:Indicator {value:row.value})\n"
+    "SET i.campaigns = row.campaigns, i.campaignCount = size(row.campaigns)\n"
+    "WITH i, row\n"
+    "CALL { WITH i, row\n"
+    "  MATCH (i)-[m:IN_CAMPAIGN]->(c:Campaign) WHERE NOT c.name IN row.campaigns DELETE m }\n"
+    "CALL { WITH i, row\n"
+    "  UNWIND row.campaigns AS name MATCH (c:Campaign {name:name}) MERGE (i)-[:IN_CAMPAIGN]->(c) }"
+)
+CAMPAIGN_OVERLAP_Q = (
+    "UNWIND $rows AS row\n"
+    "MATCH (a:Campaign {name:row[0]}), (b:Campaign {name:row[1]})\n"
+    "MERGE (a)-[o:OVERLAPS]->(b)\n"
+    "ON CREATE SET o.count = 0\n"
+    "SET o.count = o.count + row[2]\n"
+    "WITH o WHERE o.count <= 0 DELETE o"
+)
+
+
+def _batched(rows: Iterable[dict], size: int):
+    """Yield lists of at most `size` rows."""
+    it = iter(rows)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def _to_params(row: dict) -> dict:
+    """Serialize embeddings into the configured storage (see EMBED_STORAGE) only when they are sent."""
+    emb = row.get("embedding")
+    if emb is None:
+        return row
+    return {**row, **embedding_props(emb)}
+
+
+class VectorIndexUnavailable(RuntimeError):
+    """Compact embedding storage is configured but no local vector index has been built."""
+
+
+def uses_local_index(local_index) -> bool:
+    """
+    Whether vector search goes through the local tier. Compact embedding
+    storage leaves chunk_vec empty, so there it is the only option. An index
+    built or refreshed by another process is picked up here.
+    """
+    if local_index is not None and local_index.reload_if_changed():
+        return True
+    if settings.embed_storage != "float":
+        raise VectorIndexUnavailable(
+            f"EMBED_STORAGE={settings.embed_storage} needs the local vector index; "
+            "build it with `python -m src.storage.vector_index build`"
+        )
+    return False
+
+
+def _pairs_touching(members: set[str], changed: set[str]):
+    """Canonical (a < b) pairs within `members` that involve a `changed` value."""
+    for x in changed:
+        for y in members:
+            if y != x and (y not in changed or x < y):
+                yield (x, y) if x < y else (y, x)
+
+
+def co_mention_types() -> tuple[str, ...] | None:
+    """
+    Indicator type prefixes that get CO_MENTIONED edges (CO_MENTION_TYPES), or
+    None for every type. Pairs grow quadratically with a document's
+    indicators, so only the types a reader needs are materialized.
+    """
+    prefixes = tuple(p.strip() for p in settings.co_mention_types.split(",") if p.strip())
+    return None if "*" in prefixes else prefixes
+
+
+def co_mention_delta(old: set[str], new: set[str]) -> list[list]:
+    """
+    Weight changes for CO_MENTIONED when a document's indicator set goes from
+    `old` to `new`: +1 for pairs that now share it, -1 for pairs that no longer do.
+    """
+    delta = [[a, b, 1] for a, b in _pairs_touching(new, new - old)]
+    delta += [[a, b, -1] for a, b in _pairs_touching(old, old - new)]
+    return delta
+
+
+def campaign_overlap_delta(old: dict[str, set], new: dict[str, set]) -> list[list]:
+    """Summed OVERLAPS count changes when indicators' campaign sets go from `old` to `new`."""
+    totals = Counter()
+    for value in new:
+        for a, b, w in co_mention_delta(old.get(value, set()), new[value]):
+            totals[(a, b)] += w
+    return [[a, b, w] for (a, b), w in totals.items() if w]
+
+
+@instrument("neo4j")
 class Graph:
-    def __init__(self):
+    def __init__(self, local_index=None):
         self.driver = GraphDatabase.driver(
             settings.neo4j_uri,
             auth=(settings.neo4j_user, settings.neo4j_password)
         )
+        # optional src.storage.vector_index.LocalVectorIndex for in-process ANN
+        self.local_index = local_index
 
     def close(self):
         self.driver.close()
 
     def init_schema(self):
+        from src.storage.migrations import migrate
+
+        migrate(self.driver)
+
+    # ---------- Version ----------
+    def version(self) -> int:
+        with self.driver.session() as s:
+            r = s.run(GRAPH_VERSION_Q).single()
+            return r["version"] if r else 0
+
+    def bump_version(self) -> int:
         with self.driver.session() as s:
-            for q in SCHEMA_QUERIES:
-                s.run(q)
+            return s.execute_write(lambda tx: tx.run(BUMP_VERSION_Q).single()["version"])
 
     # ---------- Document ----------
     def upsert_document(self, doc: dict[str, Any]):
@@ -43,6 +315,22 @@ class Graph:
         with self.driver.session() as s:
             s.run(q, id=doc["id"], props=doc)
 
+    def document_fingerprints(self, doc_ids: list[str]) -> dict[str, str]:
+        q = (
+            "MATCH (d:Document) WHERE d.id IN $ids AND d.fingerprint IS NOT NULL\n"
+            "RETURN d.id AS id, d.fingerprint AS fingerprint"
+        )
+        with self.driver.session() as s:
+            return {r["id"]: r["fingerprint"] for r in s.run(q, ids=list(doc_ids))}
+
+    def link_campaign(self, doc_id: str, campaign: str):
+        q = (
+            "MERGE (c:Campaign {name:$n}) WITH c\n"
+            "MATCH (d:Document {id:$id}) MERGE (d)-[:PART_OF_CAMPAIGN]->(c)"
+        )
+        with self.driver.session() as s:
+            s.run(q, id=doc_id, n=campaign)
+
     # ---------- Chunk ----------
     def add_chunk(self, doc_id: str, chunk: dict[str, Any]):
         q = (
@@ -51,7 +339,65 @@ class Graph:
             "MERGE (c)-[:PART_OF]->(d)"
         )
         with self.driver.session() as s:
-            s.run(q, doc_id=doc_id, id=chunk["id"], props=chunk)
+            s.run(q, doc_id=doc_id, id=chunk["id"], props=_to_params(chunk))
+
+    def add_chunks_bulk(self, doc_id: str, chunks: Iterable[dict[str, Any]], batch_size: int = None):
+        """Write chunks with one UNWIND query per batch, each in its own write transaction."""
+        q = (
+            "MATCH (d:Document {id:$doc_id})\n"
+            "UNWIND $rows AS row\n"
+            "MERGE (c:Chunk {id:row.id}) SET c += row\n"
+            "MERGE (c)-[:PART_OF]->(d)"
+        )
+        written = 0
+        with self.driver.session() as s:
+            for batch in _batched(map(_to_params, chunks), batch_size or settings.write_batch_size):
+                s.execute_write(lambda tx, rows=batch: tx.run(q, doc_id=doc_id, rows=rows).consume())
+                written += len(batch)
+        return written
+
+    def chunk_ids(self, doc_id: str) -> set[str]:
+        q = "MATCH (c:Chunk)-[:PART_OF]->(:Document {id:$doc_id}) RETURN c.id AS id"
+        with self.driver.session() as s:
+            return {r["id"] for r in s.run(q, doc_id=doc_id)}
+
+    def delete_chunks(self, doc_id: str, chunk_ids: list[str]) -> list[str]:
+        """
+        Remove chunks of a document together with the MENTIONED_IN edges that
+        point at them. Returns the indicator values whose edge was removed.
+        """
+        q_edges = (
+            "MATCH (i:Indicator)-[r:MENTIONED_IN]->(:Document {id:$doc_id})\n"
+            "WHERE r.contextChunkId IN $ids\n"
+            "DELETE r RETURN DISTINCT i.value AS value"
+        )
+        q_chunks = (
+            "MATCH (c:Chunk)-[:PART_OF]->(:Document {id:$doc_id})\n"
+            "WHERE c.id IN $ids DETACH DELETE c"
+        )
+
+        def work(tx):
+            values = [r["value"] for r in tx.run(q_edges, doc_id=doc_id, ids=chunk_ids)]
+            tx.run(q_chunks, doc_id=doc_id, ids=chunk_ids).consume()
+            return values
+
+        with self.driver.session() as s:
+            return s.execute_write(work)
+
+    def all_chunk_ids(self) -> set[str]:
+        with self.driver.session() as s:
+            return {r["id"] for r in s.run("MATCH (c:Chunk) RETURN c.id AS id")}
+
+    def iter_chunk_embeddings(self, ids: list[str] = None):
+        """Stream (chunk id, embedding) pairs, optionally only for `ids`."""
+        match = "MATCH (c:Chunk)" if ids is None else "UNWIND $ids AS cid MATCH (c:Chunk {id: cid})"
+        q = (
+            f"{match} WITH c, coalesce(c.embedding, c.embedding_f32) AS embedding\n"
+            "WHERE embedding IS NOT NULL RETURN c.id AS id, embedding"
+        )
+        with self.driver.session() as s:
+            for r in s.run(q, ids=ids):
+                yield r["id"], decode_embedding(r["embedding"])
 
     # ---------- Indicator ----------
     def add_indicator(self, ind: dict[str, Any], doc_id: str, context_chunk_id: str = None):
@@ -77,6 +423,153 @@ class Graph:
                 context_chunk_id=context_chunk_id,
             )
 
+    def add_indicators_bulk(self, inds: Iterable[dict[str, Any]], doc_id: str, batch_size: int = None):
+        """
+        Bulk version of `add_indicator`. Each row carries the indicator fields
+        plus optional `contextChunkId` and `chunkIds` (every chunk mentioning it).
+        """
+        q = (
+            "MATCH (d:Document {id:$doc_id})\n"
+            "UNWIND $rows AS row\n"
+            "MERGE (i:Indicator {value:row.value}) "
+            "SET i.type=row.type, "
+            "    i.firstSeen=coalesce(i.firstSeen,row.firstSeen), "
+            "    i.lastSeen=row.lastSeen\n"
+            "MERGE (i)-[r:MENTIONED_IN {confidence:row.confidence}]->(d)\n"
+            "SET r.contextChunkId=row.contextChunkId, r.chunkIds=row.chunkIds, r.ts=timestamp()"
+        )
+        rows = (
+            {
+                "value": ind["value"],
+                "type": ind["type"],
+                "firstSeen": ind.get("firstSeen"),
+                "lastSeen": ind.get("lastSeen"),
+                "confidence": ind.get("confidence", 0.9),
+                "contextChunkId": ind.get("contextChunkId"),
+                "chunkIds": ind.get("chunkIds"),
+            }
+            for ind in inds
+        )
+        written = 0
+        with self.driver.session() as s:
+            for batch in _batched(rows, batch_size or settings.write_batch_size):
+                s.execute_write(lambda tx, rows=batch: tx.run(q, doc_id=doc_id, rows=rows).consume())
+                written += len(batch)
+        return written
+
+    def document_indicators(self, doc_id: str, types: tuple[str, ...] = None) -> set[str]:
+        """Values of the indicators a document mentions, optionally only those whose type starts with one of `types`."""
+        q = (
+            "MATCH (i:Indicator)-[:MENTIONED_IN]->(:Document {id:$doc_id})\n"
+            + ("WHERE any(p IN $types WHERE i.type STARTS WITH p)\n" if types is not None else "")
+            + "RETURN DISTINCT i.value AS value"
+        )
+        with self.driver.session() as s:
+            return {r["value"] for r in s.run(q, doc_id=doc_id, types=list(types or ()))}
+
+    # ---------- Co-mentions ----------
+    # (a)-[:CO_MENTIONED {weight}]->(b) with a.value < b.value; weight is the
+    # number of documents mentioning both. Only indicators whose type matches
+    # co_mention_types() get these edges.
+    def update_co_mentions(self, delta: list[list], batch_size: int = None) -> int:
+        """Apply [a, b, +/-n] weight changes; edges that drop to zero are removed."""
+        q = (
+            "UNWIND $rows AS row\n"
+            "MATCH (a:Indicator {value:row[0]}), (b:Indicator {value:row[1]})\n"
+            "MERGE (a)-[r:CO_MENTIONED]->(b)\n"
+            "ON CREATE SET r.weight = 0\n"
+            "SET r.weight = r.weight + row[2]\n"
+            "WITH r WHERE r.weight <= 0 DELETE r"
+        )
+        with self.driver.session() as s:
+            for batch in _batched(delta, batch_size or settings.write_batch_size):
+                s.execute_write(lambda tx, rows=batch: tx.run(q, rows=rows).consume())
+        return len(delta)
+
+    def rebuild_co_mentions(self):
+        """Recompute every CO_MENTIONED edge from the MENTIONED_IN edges, one document per transaction."""
+        types = co_mention_types()
+        typed = (
+            "  AND any(p IN $types WHERE a.type STARTS WITH p) AND any(p IN $types WHERE b.type STARTS WITH p)\n"
+            if types is not None else ""
+        )
+        with self.driver.session() as s:
+            s.run(
+                "MATCH ()-[r:CO_MENTIONED]->() "
+                "CALL { WITH r DELETE r } IN TRANSACTIONS OF 10000 ROWS"
+            ).consume()
+            s.run(
+                "MATCH (d:Document)\n"
+                "CALL {\n"
+                "  WITH d\n"
+                "  MATCH (a:Indicator)-[:MENTIONED_IN]->(d)<-[:MENTIONED_IN]-(b:Indicator)\n"
+                "  WHERE a.value < b.value\n"
+                + typed
+                + "  WITH DISTINCT a, b\n"
+                "  MERGE (a)-[r:CO_MENTIONED]->(b)\n"
+                "  ON CREATE SET r.weight = 0\n"
+                "  SET r.weight = r.weight + 1\n"
+                "} IN TRANSACTIONS OF 1 ROWS",
+                types=list(types or ()),
+            ).consume()
+            n = s.run("MATCH ()-[r:CO_MENTIONED]->() RETURN count(r) AS n").single()["n"]
+        self.bump_version()
+        return n
+
+    # ---------- Campaign summary ----------
+    # (i:Indicator)-[:IN_CAMPAIGN]->(c:Campaign) for every campaign whose documents
+    # mention i, mirrored in i.campaigns / i.campaignCount, and
+    # (a:Campaign)-[:OVERLAPS {count}]->(b:Campaign), a.name < b.name, counting
+    # the indicators the two campaigns share.
+    def document_campaigns(self, doc_id: str) -> list[str]:
+        q = "MATCH (:Document {id:$doc_id})-[:PART_OF_CAMPAIGN]->(c:Campaign) RETURN c.name AS name"
+        with self.driver.session() as s:
+            return [r["name"] for r in s.run(q, doc_id=doc_id)]
+
+    def refresh_campaign_summary(self, values: Iterable[str], batch_size: int = None) -> int:
+        """
+        Recompute the campaign summary of the given indicators; returns how many
+        changed. Each batch reads the old and new campaign sets and writes the
+        delta in one write transaction, after write-locking its indicators, so
+        concurrent ingests touching the same indicator serialize instead of
+        both applying an OVERLAPS delta computed from the same old state.
+        """
+        def work(tx, batch) -> int:
+            old, new = {}, {}
+            for r in tx.run(CAMPAIGN_SUMMARY_READ_Q, values=batch):
+                if set(r["old"]) != set(r["new"]):
+                    old[r["v"]], new[r["v"]] = set(r["old"]), set(r["new"])
+            if not new:
+                return 0
+            rows = [{"value": v, "campaigns": sorted(c)} for v, c in new.items()]
+            tx.run(CAMPAIGN_SUMMARY_WRITE_Q, rows=rows).consume()
+            if overlap := campaign_overlap_delta(old, new):
+                tx.run(CAMPAIGN_OVERLAP_Q, rows=overlap).consume()
+            return len(new)
+
+        changed = 0
+        with self.driver.session() as s:
+            # sorted, so concurrent transactions take the indicator locks in the same order
+            for batch in _batched(sorted(values), batch_size or settings.write_batch_size):
+                changed += s.execute_write(work, batch)
+        return changed
+
+    def rebuild_campaign_summary(self) -> int:
+        """Drop and recompute the whole campaign summary."""
+        with self.driver.session() as s:
+            s.run(
+                "MATCH ()-[r:IN_CAMPAIGN|OVERLAPS]->() "
+                "CALL { WITH r DELETE r } IN TRANSACTIONS OF 10000 ROWS"
+            ).consume()
+            s.run(
+                "MATCH (i:Indicator) WHERE i.campaigns IS NOT NULL "
+                "CALL { WITH i REMOVE i.campaigns, i.campaignCount } IN TRANSACTIONS OF 10000 ROWS"
+            ).consume()
+            values = [r["value"] for r in s.run("MATCH (i:Indicator) RETURN i.value AS value")]
+        changed = self.refresh_campaign_summary(values)
+        self.bump_version()
+        return changed
+
     # ---------- Relationships ----------
     def relate(self, a_value: str, b_value: str, rel: str = "RELATED_TO"):
         q = (
@@ -84,77 +577,82 @@ class Graph:
             f"MERGE (a)-[:{rel}]->(b)"
         )
         with self.driver.session() as s:
-            s.run(q, a=a_value, b=b_value)
+            s.run(q, a=a_value, b=b_value).consume()
+        self.bump_version()
 
     # ---------- Search ----------
     def vector_search(self, query_vec: list[float], k: int = 10):
-        q = (
-            "CALL db.index.vector.queryNodes('chunk_vec', $k, $vec) YIELD node, score\n"
-            "RETURN node as chunk, score ORDER BY score DESC"
-        )
+        if uses_local_index(self.local_index):
+            hits = self.local_index.search(query_vec, k)
+            return hydrate(hits, [r["chunk"] for r in self.fetch(CHUNKS_BY_IDS_Q, ids=[h[0] for h in hits])])
         with self.driver.session() as s:
             return [
                 dict(record["chunk"], _score=record["score"])
-                for record in s.run(q, k=k, vec=query_vec)
+                for record in s.run(VECTOR_SEARCH_Q, k=k, vec=query_vec)
             ]
 
     def hybrid_search(self, text: str, query_vec: list[float], k: int = 10):
-        # Simple hybrid: vector + keyword; rank by combined score
-        q = (
-            "CALL db.index.vector.queryNodes('chunk_vec', $k, $vec) YIELD node, score\n"
-            "WITH node, score\n"
-            "WHERE toLower(node.text) CONTAINS toLower($text) OR score >= 0\n"
-            "RETURN node as chunk, score ORDER BY score DESC LIMIT $k"
-        )
+        if not lucene_query(text):
+            return self.vector_search(query_vec, k)
+        q, params = hybrid_query(text, query_vec, k, self.local_index)
         with self.driver.session() as s:
             return [
                 dict(record["chunk"], _score=record["score"])
-                for record in s.run(q, text=text, vec=query_vec, k=k)
+                for record in s.run(q, **params)
             ]
 
     # ---------- Indicator Queries ----------
-    def indicator_lookup(self, typ: str):
-        q = "MATCH (i:Indicator {type:$typ}) RETURN i.value AS value, i.type AS type"
+    def fetch(self, q: str, **params) -> list[dict]:
+        """Run a read query and return its records as dicts."""
         with self.driver.session() as s:
-            return [dict(r) for r in s.run(q, typ=typ)]
+            return [dict(r) for r in s.run(q, **params)]
+
+    def indicator_lookup(self, typ: str, rank_by: str = None, limit: int = None):
+        """Every indicator of a type (or the first `limit`); prefer indicator_page / iter_indicators for big types."""
+        return self.fetch(indicator_lookup_query(rank_by, limit=limit is not None), typ=typ, limit=limit)
+
+    def indicator_page(self, typ: str, cursor: str = None, limit: int = None, rank_by: str = None) -> dict:
+        limit = limit or settings.indicator_page_size
+        after = decode_keyset(cursor, rank_by)
+        q = indicator_lookup_query(rank_by, after=bool(after))
+        return indicator_page(self.fetch(q, typ=typ, limit=limit + 1, **after), rank_by, limit)
+
+    def iter_indicators(self, typ: str, cursor: str = None, rank_by: str = None):
+        """Stream indicators of a type; records are pulled from the server as they are consumed."""
+        after = decode_keyset(cursor, rank_by)
+        q = indicator_lookup_query(rank_by, after=bool(after), limit=False)
+        with self.driver.session(fetch_size=settings.indicator_fetch_size) as s:
+            for r in s.run(q, typ=typ, **after):
+                yield dict(r)
 
     def context_for_indicator(self, value: str):
-        q = (
-            "MATCH (i:Indicator {value:$v})-[r:MENTIONED_IN]->(d:Document)\n"
-            "OPTIONAL MATCH (c:Chunk {id:r.contextChunkId})\n"
-            "RETURN d.id AS documentId, c.text AS chunkText, "
-            "r.confidence AS confidence, r.ts AS ts"
-        )
-        with self.driver.session() as s:
-            return [dict(r) for r in s.run(q, v=value)]
+        return self.fetch(CONTEXT_Q, v=value)
 
-    def relationships(self, value: str, hops: int = 1):
-        q = (
-            f"MATCH (i:Indicator {{value:$v}})-[*1..{hops}]-(j:Indicator) "
-            "RETURN DISTINCT j.value AS value, labels(j) AS labels"
-        )
+    # ---------- Traversal ----------
+    def traverse(self, value: str, hops: int = 1, types=None, fanout: int = None, max_nodes: int = None) -> Traversal:
+        """Bounded traversal around an indicator (see src.storage.traversal)."""
+        fanout, max_nodes = check_params(hops, fanout, max_nodes)
+        t = Traversal(max_nodes)
+        timeout = settings.traversal_timeout_s
         with self.driver.session() as s:
-            return [dict(r) for r in s.run(q, v=value)]
+            seed = s.run(Query(SEED_Q, timeout=timeout), v=value).single()
+            if seed is None:
+                return t
+            t.seed(seed.data())
+            hop = 0
+            while hop < hops and not t.done:
+                hop += 1
+                params = t.expand_params(types or DEFAULT_REL_TYPES, fanout)
+                t.add_hop(s.run(Query(EXPAND_Q, timeout=timeout), **params).data(), hop)
+            t.finish(hop, hops)
+            if t.frontier:
+                params = t.expand_params(types or DEFAULT_REL_TYPES, 0)
+                t.close(s.run(Query(EXPAND_Q, timeout=timeout), **params).data())
+        return t
 
-    def network(self, value: str, hops: int = 1):
-        q = (
-            f"MATCH p=(i:Indicator {{value:$v}})-[*1..{hops}]-(j:Indicator) "
-            "RETURN p LIMIT 500"
-        )
-        with self.driver.session() as s:
-            paths = s.run(q, v=value).value()
-            nodes, links = {}, []
-            for p in paths:
-                for n in p.nodes:
-                    nodes[n.element_id] = {
-                        "id": n.element_id,
-                        "value": n.get("value", n.get("id")),
-                        "label": list(n.labels)[0],
-                    }
-                for r in p.relationships:
-                    links.append({
-                        "source": r.start_node.element_id,
-                        "target": r.end_node.element_id,
-                        "type": r.type,
-                    })
-            return {"nodes": list(nodes.values()), "links": links}
+    def relationships(self, value: str, hops: int = 1, types=None):
+        return self.traverse(value, hops, types).related()
+
+    def network(self, value: str, hops: int = 1, types=None, fanout: int = None, max_nodes: int = None,
+                cursor: str = None, limit: int = None):
+        return self.traverse(value, hops, types, fanout, max_nodes).network_page(cursor, limit)
@@ -0,0 +1,140 @@
+"""
+Versioned schema migrations. Applied versions are recorded as
+(:SchemaMigration {version, name, appliedAt}) nodes; `migrate` applies the
+pending ones in order and waits for new indexes to come online.
+
+    python -m src.storage.migrations            # apply pending migrations
+    python -m src.storage.migrations status
+    python -m src.storage.migrations check-plans  # EXPLAIN every query, exit 1 on regressions
+"""
+import sys
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: tuple[str, ...]
+
+
+MIGRATIONS = (
+    # The schema init_schema created before any performance work. Frozen: later
+    # schema changes go in a new migration, never here.
+    Migration(1, "baseline", (
+        "CREATE CONSTRAINT doc_id IF NOT EXISTS FOR (d:Document) REQUIRE d.id IS UNIQUE",
+        "CREATE CONSTRAINT chunk_id IF NOT EXISTS FOR (c:Chunk) REQUIRE c.id IS UNIQUE",
+        "CREATE CONSTRAINT ind_id IF NOT EXISTS FOR (i:Indicator) REQUIRE i.value IS UNIQUE",
+        "CREATE CONSTRAINT camp_id IF NOT EXISTS FOR (c:Campaign) REQUIRE c.name IS UNIQUE",
+        "CREATE CONSTRAINT actor_id IF NOT EXISTS FOR (a:ThreatActor) REQUIRE a.name IS UNIQUE",
+        # 384 = all-MiniLM-L6-v2
+        "CREATE VECTOR INDEX chunk_vec IF NOT EXISTS FOR (c:Chunk) ON (c.embedding) "
+        "OPTIONS {indexConfig: {`vector.dimensions`: 384, `vector.similarity_function`: 'cosine'}}",
+    )),
+    Migration(2, "access path indexes", (
+        # indicator_lookup / clusters_by_handle: equality and STARTS WITH on type
+        "CREATE INDEX ind_type IF NOT EXISTS FOR (i:Indicator) ON (i.type)",
+        # campaign_overlaps ranks OVERLAPS edges by count
+        "CREATE INDEX overlaps_count IF NOT EXISTS FOR ()-[o:OVERLAPS]-() ON (o.count)",
+    )),
+    # Indexes init_schema also created before migrations existed. Databases
+    # that recorded them as part of an earlier, larger version 1 re-run these
+    # as no-ops (IF NOT EXISTS) and then record them.
+    Migration(3, "graph version", (
+        # GraphMeta holds the version counter read-side caches key on
+        "CREATE CONSTRAINT meta_key IF NOT EXISTS FOR (m:GraphMeta) REQUIRE m.key IS UNIQUE",
+    )),
+    Migration(4, "hybrid search", (
+        # keyword side of hybrid search
+        "CREATE FULLTEXT INDEX chunk_text IF NOT EXISTS FOR (c:Chunk) ON EACH [c.text]",
+    )),
+    Migration(5, "indicator listings", (
+        # keyset by value, or ranked (scores from src.analytics.graph_analytics)
+        "CREATE INDEX ind_type_value IF NOT EXISTS FOR (i:Indicator) ON (i.type, i.value)",
+        "CREATE INDEX ind_type_pagerank IF NOT EXISTS FOR (i:Indicator) ON (i.type, i.pagerank)",
+        "CREATE INDEX ind_type_degree IF NOT EXISTS FOR (i:Indicator) ON (i.type, i.degreeCentrality)",
+    )),
+    Migration(6, "campaign summary", (
+        "CREATE INDEX ind_campaign_count IF NOT EXISTS FOR (i:Indicator) ON (i.campaignCount)",
+    )),
+    Migration(7, "co-mention weights", (
+        # materialized co-mentions, read ordered by weight
+        "CREATE INDEX co_mentioned_weight IF NOT EXISTS FOR ()-[r:CO_MENTIONED]-() ON (r.weight)",
+    )),
+)
+
+BOOTSTRAP_Q = "CREATE CONSTRAINT schema_migration IF NOT EXISTS FOR (m:SchemaMigration) REQUIRE m.version IS UNIQUE"
+APPLIED_Q = "MATCH (m:SchemaMigration) RETURN m.version AS version"
+RECORD_Q = "MERGE (m:SchemaMigration {version:$version}) SET m.name = $name, m.appliedAt = timestamp()"
+AWAIT_Q = "CALL db.awaitIndexes($timeout)"
+INDEX_WAIT_S = 300
+
+
+def pending(applied: set[int]) -> list[Migration]:
+    return [m for m in MIGRATIONS if m.version not in applied]
+
+
+def latest() -> int:
+    return MIGRATIONS[-1].version
+
+
+def migrate(driver) -> list[int]:
+    """Apply pending migrations; returns the versions applied."""
+    done = []
+    with driver.session() as s:
+        s.run(BOOTSTRAP_Q).consume()
+        applied = {r["version"] for r in s.run(APPLIED_Q)}
+        for m in pending(applied):
+            for q in m.statements:
+                s.run(q).consume()
+            s.run(AWAIT_Q, timeout=INDEX_WAIT_S).consume()
+            s.run(RECORD_Q, version=m.version, name=m.name).consume()
+            done.append(m.version)
+    return done
+
+
+async def amigrate(driver) -> list[int]:
+    """`migrate` for the async driver."""
+    done = []
+    async with driver.session() as s:
+        await (await s.run(BOOTSTRAP_Q)).consume()
+        applied = {r["version"] async for r in await s.run(APPLIED_Q)}
+        for m in pending(applied):
+            for q in m.statements:
+                await (await s.run(q)).consume()
+            await (await s.run(AWAIT_Q, timeout=INDEX_WAIT_S)).consume()
+            await (await s.run(RECORD_Q, version=m.version, name=m.name)).consume()
+            done.append(m.version)
+    return done
+
+
+def status(driver) -> dict:
+    with driver.session() as s:
+        applied = sorted(r["version"] for r in s.run(APPLIED_Q))
+    return {"applied": applied, "pending": [m.version for m in pending(set(applied))], "latest": latest()}
+
+
+def main(argv: list[str]) -> int:
+    from src.storage.graph_db import Graph
+
+    cmd = argv[1] if len(argv) > 1 else "migrate"
+    g = Graph()
+    try:
+        if cmd == "status":
+            print(status(g.driver))
+        elif cmd == "check-plans":
+            from src.storage.plan_check import check_plans, format_report
+
+            migrate(g.driver)
+            report = check_plans(g)
+            print(format_report(report))
+            return 1 if any(r["violations"] for r in report) else 0
+        else:
+            print(f"applied: {migrate(g.driver)}")
+        return 0
+    finally:
+        g.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
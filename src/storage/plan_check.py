@@ -0,0 +1,202 @@
+"""
+Query-plan regression check. Every Graph method and src.queries helper is
+run against a recording driver that captures its Cypher without executing
+it. Each captured query is then EXPLAINed on the real database, and the
+check fails on plans that scan a whole label, all nodes or a whole
+relationship type, or that build a cartesian product of anything other
+than index seeks. The recorder returns empty results, so queries a method
+only issues after a non-empty read are probed directly as well.
+
+Bulk exports and rebuilds read every node by design, so their probes
+allow scans.
+"""
+import inspect
+
+from neo4j import Query
+
+from src import queries
+from src.storage.graph_db import (CAMPAIGN_OVERLAP_Q, CAMPAIGN_SUMMARY_WRITE_Q,
+                                  CHUNKS_BY_IDS_Q, EMBED_DIM)
+from src.storage.traversal import DEFAULT_REL_TYPES, EXPAND_Q
+
+SCAN_OPERATORS = {
+    "NodeByLabelScan", "AllNodesScan",
+    "DirectedRelationshipTypeScan", "UndirectedRelationshipTypeScan",
+    "DirectedAllRelationshipsScan", "UndirectedAllRelationshipsScan",
+}
+
+
+# ---------- recording driver ----------
+class _Result:
+    def __iter__(self):
+        return iter(())
+
+    def single(self):
+        return None
+
+    def data(self):
+        return []
+
+    def value(self):
+        return []
+
+    def consume(self):
+        return None
+
+
+class _Recorder:
+    """Stands in for driver, session and transaction; records (query, params)."""
+
+    def __init__(self):
+        self.captured: list[tuple[str, dict]] = []
+
+    def session(self, **kw):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, q, parameters=None, **params):
+        text = q.text if isinstance(q, Query) else q
+        self.captured.append((text, {**(parameters or {}), **params}))
+        return _Result()
+
+    def execute_write(self, fn, *args, **kw):
+        return fn(self, *args, **kw)
+
+    execute_read = execute_write
+
+
+def capture(graph, fn) -> list[tuple[str, dict]]:
+    """Cypher issued by `fn(graph)`; errors from the fake empty results are ignored."""
+    real, rec = graph.driver, _Recorder()
+    graph.driver = rec
+    try:
+        out = fn(graph)
+        if inspect.isgenerator(out):
+            list(out)
+    except Exception:
+        pass
+    finally:
+        graph.driver = real
+    return rec.captured
+
+
+# ---------- probes ----------
+_VEC = [0.0] * EMBED_DIM
+_CHUNK = {"id": "probe:0", "text": "probe", "embedding": _VEC}
+_IND = {"type": "domain", "value": "probe.example", "contextChunkId": "probe:0", "chunkIds": ["probe:0"]}
+
+# (name, fn(graph), scans allowed)
+PROBES = [
+    ("version", lambda g: g.version(), False),
+    ("bump_version", lambda g: g.bump_version(), False),
+    ("upsert_document", lambda g: g.upsert_document({"id": "probe"}), False),
+    ("document_fingerprints", lambda g: g.document_fingerprints(["probe"]), False),
+    ("link_campaign", lambda g: g.link_campaign("probe", "probe campaign"), False),
+    ("add_chunk", lambda g: g.add_chunk("probe", _CHUNK), False),
+    ("add_chunks_bulk", lambda g: g.add_chunks_bulk("probe", [_CHUNK]), False),
+    ("chunk_ids", lambda g: g.chunk_ids("probe"), False),
+    ("delete_chunks", lambda g: g.delete_chunks("probe", ["probe:0"]), False),
+    ("all_chunk_ids", lambda g: g.all_chunk_ids(), True),
+    ("iter_chunk_embeddings", lambda g: g.iter_chunk_embeddings(), True),
+    ("iter_chunk_embeddings(ids)", lambda g: g.iter_chunk_embeddings(ids=["probe:0"]), False),
+    ("add_indicator", lambda g: g.add_indicator(_IND, "probe", "probe:0"), False),
+    ("add_indicators_bulk", lambda g: g.add_indicators_bulk([_IND], "probe"), False),
+    ("document_indicators", lambda g: g.document_indicators("probe"), False),
+    ("document_indicators_typed", lambda g: g.document_indicators("probe", ("social:",)), False),
+    ("document_campaigns", lambda g: g.document_campaigns("probe"), False),
+    ("update_co_mentions", lambda g: g.update_co_mentions([["a.example", "b.example", 1]]), False),
+    ("rebuild_co_mentions", lambda g: g.rebuild_co_mentions(), True),
+    ("refresh_campaign_summary", lambda g: g.refresh_campaign_summary(["probe.example"]), False),
+    ("refresh_campaign_summary write", lambda g: g.fetch(
+        CAMPAIGN_SUMMARY_WRITE_Q, rows=[{"value": "probe.example", "campaigns": ["A"]}]
+    ), False),
+    ("refresh_campaign_summary overlap", lambda g: g.fetch(CAMPAIGN_OVERLAP_Q, rows=[["A", "B", 1]]), False),
+    ("rebuild_campaign_summary", lambda g: g.rebuild_campaign_summary(), True),
+    ("relate", lambda g: g.relate("a.example", "b.example"), False),
+    ("vector_search", lambda g: g.vector_search(_VEC, 5), False),
+    ("vector_search hydrate", lambda g: g.fetch(CHUNKS_BY_IDS_Q, ids=["probe:0"]), False),
+    ("hybrid_search", lambda g: g.hybrid_search("apt28 domain", _VEC, 5), False),
+    ("indicator_lookup", lambda g: g.indicator_lookup("domain"), False),
+    ("indicator_lookup(pagerank)", lambda g: g.indicator_lookup("domain", rank_by="pagerank", limit=10), False),
+    ("indicator_page", lambda g: g.indicator_page("domain"), False),
+    ("iter_indicators", lambda g: g.iter_indicators("domain"), False),
+    ("context_for_indicator", lambda g: g.context_for_indicator("probe.example"), False),
+    ("traverse", lambda g: g.traverse("probe.example", hops=2), False),
+    ("traverse expand", lambda g: g.fetch(
+        EXPAND_Q, frontier=["4:x:0"], seen=[], types=list(DEFAULT_REL_TYPES), fanout=5, scan=100
+    ), False),
+] + [
+    (f"queries.{name}", fn, False) for name, fn in (
+        ("graph_two_hop", lambda g: queries.graph_two_hop(g, "probe.example")),
+        ("clusters_by_handle", queries.clusters_by_handle),
+        ("across_campaigns", queries.across_campaigns),
+        ("shared_indicators", lambda g: queries.shared_indicators(g, "A", "B")),
+        ("campaign_overlaps", queries.campaign_overlaps),
+        ("campaign_overlaps(campaign)", lambda g: queries.campaign_overlaps(g, "A")),
+        ("timeline", lambda g: queries.timeline(g, "probe.example")),
+    )
+]
+
+
+# ---------- plan analysis ----------
+def _op(plan: dict) -> str:
+    return plan["operatorType"].split("@")[0]
+
+
+def _leaves(plan: dict):
+    children = plan.get("children") or []
+    if not children:
+        yield plan
+    for c in children:
+        yield from _leaves(c)
+
+
+def violations(plan: dict, allow_scan: bool = False) -> list[str]:
+    found = []
+    op = _op(plan)
+    if op in SCAN_OPERATORS and not allow_scan:
+        found.append(f"{op} {plan.get('identifiers', [])}")
+    if op == "CartesianProduct":
+        leaves = [_op(leaf) for leaf in _leaves(plan)]
+        if not all("Seek" in leaf or leaf == "Argument" for leaf in leaves):
+            found.append(f"CartesianProduct over {leaves}")
+    for child in plan.get("children") or []:
+        found.extend(violations(child, allow_scan))
+    return found
+
+
+def explain(driver, q: str, params: dict) -> dict:
+    with driver.session() as s:
+        return s.run("EXPLAIN " + q, params).consume().plan
+
+
+def check_plans(graph, probes=None) -> list[dict]:
+    """EXPLAIN every probed query; one report row per distinct query."""
+    report, seen = [], set()
+    for name, fn, allow_scan in probes or PROBES:
+        for q, params in capture(graph, fn):
+            if q in seen:
+                continue
+            seen.add(q)
+            try:
+                found = violations(explain(graph.driver, q, params), allow_scan)
+            except Exception as e:
+                found = [f"EXPLAIN failed: {type(e).__name__}: {e}"]
+            report.append({"probe": name, "query": q, "violations": found})
+    return report
+
+
+def format_report(report: list[dict]) -> str:
+    lines = []
+    for r in report:
+        status = "FAIL" if r["violations"] else "ok"
+        lines.append(f"[{status}] {r['probe']}: {' '.join(r['query'].split())[:100]}")
+        lines.extend(f"    - {v}" for v in r["violations"])
+    bad = sum(1 for r in report if r["violations"])
+    lines.append(f"{len(report)} queries, {bad} with plan regressions")
+    return "\n".join(lines)
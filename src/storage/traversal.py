@@ -0,0 +1,169 @@
+"""
+Bounded neighborhood traversal around a seed indicator, shared by Graph and
+AsyncGraph. Expansion runs hop by hop. Every frontier node scans at most
+`scan` relationships of the allowed types. Of those, the `fanout` unseen
+neighbors with the highest degree are kept; edges to nodes already collected
+are always kept, so links between known nodes are not lost. The traversal
+stops once `max_nodes` distinct nodes have been collected, and one last
+links-only pass over the unexpanded frontier closes the edge set. Work per
+hop is therefore bounded by |frontier| * scan, however connected the seed is.
+
+Ordering is deterministic (hop, then degree, then element id), so cursor
+pages over the same parameters are stable. Traversals are not cached: every
+cursor page re-runs the whole (bounded) traversal and slices the result.
+"""
+import base64
+import json
+from dataclasses import dataclass, field
+
+from src.config import settings
+
+# Chunk PART_OF edges are left out: they only lead to text, never to other indicators.
+DEFAULT_REL_TYPES = ("MENTIONED_IN", "RELATED_TO", "PART_OF_CAMPAIGN")
+
+SEED_Q = (
+    "MATCH (n:Indicator {value:$v})\n"
+    "RETURN elementId(n) AS nid, labels(n) AS labels, "
+    "coalesce(n.value, n.id, n.name) AS value, COUNT { (n)--() } AS degree"
+)
+
+EXPAND_Q = (
+    "UNWIND $frontier AS sid\n"
+    "MATCH (s) WHERE elementId(s) = sid\n"
+    "CALL {\n"
+    "  WITH s\n"
+    "  MATCH (s)-[r]-(m)\n"
+    "  WHERE type(r) IN $types\n"
+    "  RETURN r, m LIMIT $scan\n"
+    "}\n"
+    "WITH s, r, m, elementId(m) IN $seen AS known\n"
+    "WITH s, r, m, known, CASE WHEN known THEN 0 ELSE COUNT { (m)--() } END AS degree\n"
+    "ORDER BY degree DESC, elementId(m)\n"
+    "WITH s, collect({r: r, m: m, degree: degree, known: known}) AS scanned\n"
+    "WITH s, [x IN scanned WHERE x.known] + [x IN scanned WHERE NOT x.known][..$fanout] AS picked\n"
+    "UNWIND picked AS p\n"
+    "WITH p.r AS r, p.m AS m, p.degree AS degree\n"
+    "RETURN elementId(m) AS nid, labels(m) AS labels, coalesce(m.value, m.id, m.name) AS value, degree,\n"
+    "       elementId(r) AS rid, type(r) AS type,\n"
+    "       elementId(startNode(r)) AS source, elementId(endNode(r)) AS target"
+)
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"o": offset}).encode()).decode()
+
+
+def decode_cursor(cursor: str | None) -> int:
+    if not cursor:
+        return 0
+    try:
+        return max(0, int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["o"]))
+    except (ValueError, KeyError, TypeError):
+        raise ValueError(f"invalid cursor {cursor!r}")
+
+
+def check_params(hops: int, fanout: int = None, max_nodes: int = None) -> tuple[int, int]:
+    """Validate caller-supplied limits against the configured ceilings."""
+    if not 1 <= hops <= settings.traversal_max_hops:
+        raise ValueError(f"hops must be between 1 and {settings.traversal_max_hops}")
+    fanout = min(fanout or settings.traversal_fanout, settings.traversal_fanout)
+    max_nodes = min(max_nodes or settings.traversal_max_nodes, settings.traversal_max_nodes)
+    return max(1, fanout), max(1, max_nodes)
+
+
+@dataclass
+class Traversal:
+    """Accumulates the distinct node and edge set of one bounded traversal."""
+    max_nodes: int
+    nodes: dict = field(default_factory=dict)   # element id -> node dict, in discovery order
+    links: dict = field(default_factory=dict)   # element id -> link dict
+    frontier: list = field(default_factory=list)
+    truncated: bool = False
+
+    def seed(self, row: dict):
+        self._add_node(row, hop=0)
+        self.frontier = [row["nid"]]
+
+    @property
+    def done(self) -> bool:
+        return not self.frontier or len(self.nodes) >= self.max_nodes
+
+    def expand_params(self, types, fanout: int) -> dict:
+        return {
+            "frontier": self.frontier, "seen": list(self.nodes), "types": list(types),
+            "fanout": fanout, "scan": settings.traversal_scan_limit,
+        }
+
+    def add_hop(self, rows: list[dict], hop: int):
+        """Merge one expansion; the newly discovered nodes become the next frontier."""
+        frontier = []
+        for row in rows:
+            if row["nid"] not in self.nodes:
+                if len(self.nodes) >= self.max_nodes:
+                    self.truncated = True
+                    continue
+                self._add_node(row, hop)
+                frontier.append(row["nid"])
+            self._add_link(row)
+        self.frontier = frontier
+
+    def close(self, rows: list[dict]):
+        """
+        Merge a links-only expansion (fanout 0) of the frontier left unexpanded,
+        so edges between nodes found in the last hop are part of the result too.
+        """
+        for row in rows:
+            self._add_link(row)
+        self.frontier = []
+
+    def _add_link(self, row: dict):
+        if row["source"] in self.nodes and row["target"] in self.nodes:
+            self.links.setdefault(row["rid"], {
+                "id": row["rid"], "source": row["source"], "target": row["target"], "type": row["type"],
+            })
+
+    def _add_node(self, row: dict, hop: int):
+        labels = row["labels"]
+        self.nodes[row["nid"]] = {
+            "id": row["nid"], "value": row["value"], "label": labels[0] if labels else None,
+            "labels": labels, "hop": hop, "degree": row["degree"],
+        }
+
+    def finish(self, hops_done: int, hops: int):
+        # frontier left unexpanded because of the hop limit is not truncation
+        if self.frontier and hops_done < hops:
+            self.truncated = True
+
+    # ---------- results ----------
+    def related(self) -> list[dict]:
+        """Indicators reached from the seed (the seed itself excluded)."""
+        return [
+            {"value": n["value"], "labels": n["labels"], "hop": n["hop"]}
+            for n in self.nodes.values() if n["hop"] > 0 and "Indicator" in n["labels"]
+        ]
+
+    def network_page(self, cursor: str = None, limit: int = None) -> dict:
+        """
+        One page of nodes plus the links whose later endpoint is on it, so
+        every link is delivered exactly once and only after both its nodes.
+        The cursor is an offset into this traversal, which callers re-run per page.
+        """
+        offset, limit = decode_cursor(cursor), limit or settings.traversal_page_size
+        order = {nid: i for i, nid in enumerate(self.nodes)}
+        nodes = list(self.nodes.values())[offset:offset + limit]
+        end = offset + len(nodes)
+        links = [
+            link for link in self.links.values()
+            if offset <= max(order[link["source"]], order[link["target"]]) < end
+        ]
+        return {
+            "nodes": nodes, "links": links, "truncated": self.truncated,
+            "next_cursor": encode_cursor(end) if end < len(self.nodes) else None,
+        }
+
+
+def page(items: list, cursor: str = None, limit: int = None) -> tuple[list, str | None]:
+    offset, limit = decode_cursor(cursor), limit or settings.traversal_page_size
+    chunk = items[offset:offset + limit]
+    end = offset + len(chunk)
+    return chunk, encode_cursor(end) if end < len(items) else None
@@ -0,0 +1,319 @@
+"""
+Optional in-process vector tier: Chunk embeddings exported from Neo4j into a
+memory-mapped float32 matrix plus an id table, with an IVF (inverted file)
+index over it. Search runs locally; only the final top-k ids are hydrated
+from Neo4j.
+
+With VECTOR_INDEX_QUANTIZATION=float16|int8 a compact copy of the matrix is
+scanned for candidates and only the best k * VECTOR_INDEX_RESCORE rows of
+the float32 matrix are read for exact rescoring, so the hot working set is
+2-4x smaller.
+
+    python -m src.storage.vector_index build     # full export + IVF training
+    python -m src.storage.vector_index refresh   # append new / drop deleted chunks
+"""
+import json
+import os
+import sys
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.config import settings
+from src.embedding.quantize import dequantize, quantize
+from src.storage.graph_db import EMBED_DIM
+
+_BLOCK = 65_536
+
+
+@dataclass
+class _State:
+    vectors: np.ndarray          # (n, dim) float32 memmap
+    ids: list[str]
+    alive: np.ndarray            # (n,) bool; False = chunk deleted since build
+    centroids: np.ndarray | None  # (nlist, dim) or None for brute force
+    order: np.ndarray | None     # row ids grouped by list
+    offsets: np.ndarray | None   # (nlist + 1,) list boundaries into `order`
+    n_base: int                  # rows covered by the IVF lists; the rest is a brute-force tail
+    quant: str = "float"
+    codes: np.ndarray | None = None   # (n, dim) float16/int8 memmap for candidate scoring
+    scales: np.ndarray | None = None  # (n,) int8 scales
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.where(norms == 0, 1, norms)
+
+
+def train_ivf(vectors: np.ndarray, nlist: int, iters: int = 10, seed: int = 0):
+    """Spherical k-means on a sample; returns (centroids, order, offsets)."""
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    sample = np.asarray(vectors[np.sort(rng.choice(n, min(n, nlist * 64), replace=False))], dtype=np.float32)
+    cent = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(sample @ cent.T, axis=1)
+        sums = np.zeros_like(cent)
+        np.add.at(sums, assign, sample)
+        filled = np.bincount(assign, minlength=nlist) > 0
+        cent[filled] = _normalize(sums[filled])
+
+    assign = np.empty(n, dtype=np.int32)
+    for start in range(0, n, _BLOCK):
+        block = np.asarray(vectors[start:start + _BLOCK], dtype=np.float32)
+        assign[start:start + len(block)] = np.argmax(block @ cent.T, axis=1)
+    order = np.argsort(assign, kind="stable").astype(np.int64)
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))]).astype(np.int64)
+    return cent, order, offsets
+
+
+class LocalVectorIndex:
+    def __init__(self, path: str = None):
+        self.path = path or settings.vector_index_dir
+        self._state: _State | None = None
+        self._stamp = None  # mtimes of the files behind _state
+        self._lock = threading.Lock()  # serializes build/refresh; searches read a snapshot
+
+    # ---------- files ----------
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    @property
+    def loaded(self) -> bool:
+        return self._state is not None
+
+    def __len__(self) -> int:
+        s = self._state
+        return int(s.alive.sum()) if s else 0
+
+    def _files_stamp(self):
+        try:
+            return tuple(os.stat(self._file(n)).st_mtime_ns for n in ("meta.json", "ids.json", "alive.npy"))
+        except FileNotFoundError:
+            return None
+
+    def reload_if_changed(self) -> bool:
+        """
+        Re-map the files if another process (the CLI, another worker) built or
+        refreshed the index since they were loaded; returns `loaded`. A
+        half-written refresh fails to load and is retried on the next call.
+        """
+        stamp = self._files_stamp()
+        if stamp is not None and stamp != self._stamp and self._lock.acquire(blocking=False):
+            try:
+                self.load()
+            except (OSError, ValueError, KeyError):
+                pass
+            finally:
+                self._lock.release()
+        return self.loaded
+
+    def load(self) -> bool:
+        """Map the files on disk; returns False when no index has been built yet."""
+        stamp = self._files_stamp()
+        if not os.path.exists(self._file("meta.json")):
+            return False
+        with open(self._file("meta.json")) as f:
+            meta = json.load(f)
+        with open(self._file("ids.json")) as f:
+            ids = json.load(f)
+        n, dim = len(ids), meta["dim"]
+        vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r", shape=(n, dim)) if n else \
+            np.empty((0, dim), dtype=np.float32)
+        alive = np.load(self._file("alive.npy"))
+        centroids = order = offsets = None
+        if os.path.exists(self._file("ivf.npz")):
+            ivf = np.load(self._file("ivf.npz"))
+            centroids, order, offsets = ivf["centroids"], ivf["order"], ivf["offsets"]
+        quant = meta.get("quant", "float")
+        codes = scales = None
+        if quant != "float":
+            dtype = np.float16 if quant == "float16" else np.int8
+            codes = np.memmap(self._file("codes.bin"), dtype=dtype, mode="r", shape=(n, dim)) if n else \
+                np.empty((0, dim), dtype=dtype)
+            if quant == "int8":
+                scales = np.load(self._file("scales.npy"))
+        if len(alive) != n or (scales is not None and len(scales) != n):
+            raise ValueError(f"vector index files in {self.path} disagree on the row count")
+        self._state = _State(vectors, ids, alive, centroids, order, offsets, meta["n_base"], quant, codes, scales)
+        self._stamp = stamp
+        return True
+
+    def _write_meta(self, dim: int, n_base: int, quant: str):
+        tmp = self._file("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"dim": dim, "n_base": n_base, "quant": quant}, f)
+        os.replace(tmp, self._file("meta.json"))
+
+    def _write_ids(self, ids: list[str], alive: np.ndarray):
+        with open(self._file("ids.json.tmp"), "w") as f:
+            json.dump(ids, f)
+        np.save(self._file("alive.tmp.npy"), alive)
+        os.replace(self._file("ids.json.tmp"), self._file("ids.json"))
+        os.replace(self._file("alive.tmp.npy"), self._file("alive.npy"))
+
+    def _truncate(self, name: str, size: int):
+        with open(self._file(name), "r+b") as f:
+            f.truncate(size)
+
+    def _save_scales(self, scales: np.ndarray):
+        np.save(self._file("scales.tmp.npy"), scales)
+        os.replace(self._file("scales.tmp.npy"), self._file("scales.npy"))
+
+    def _append_codes(self, vectors: np.ndarray, quant: str, name: str = "codes.bin",
+                      mode: str = "ab") -> np.ndarray | None:
+        """Quantize `vectors` block-wise into `name`; returns the int8 scales, if any."""
+        scales = []
+        with open(self._file(name), mode) as f:
+            for start in range(0, len(vectors), _BLOCK):
+                codes, sc = quantize(vectors[start:start + _BLOCK], quant)
+                f.write(codes.tobytes())
+                if sc is not None:
+                    scales.append(sc)
+        return np.concatenate(scales) if scales else None
+
+    # ---------- build / refresh ----------
+    def build(self, graph) -> dict:
+        """Export every chunk embedding from the graph and train the IVF lists."""
+        with self._lock:
+            return self._build(graph)
+
+    def _build(self, graph) -> dict:
+        os.makedirs(self.path, exist_ok=True)
+        ids, dim = [], None
+        tmp = self._file("vectors.f32.tmp")
+        with open(tmp, "wb") as f:
+            for cid, emb in graph.iter_chunk_embeddings():
+                vec = _normalize(np.asarray(emb, dtype=np.float32))
+                dim = dim or len(vec)
+                f.write(vec.tobytes())
+                ids.append(cid)
+        dim = dim or EMBED_DIM
+        n = len(ids)
+        if n >= settings.vector_index_min_ivf:
+            vectors = np.memmap(tmp, dtype=np.float32, mode="r", shape=(n, dim))
+            nlist = max(1, int(np.sqrt(n)))
+            centroids, order, offsets = train_ivf(vectors, nlist)
+            del vectors
+            np.savez(self._file("ivf.tmp.npz"), centroids=centroids, order=order, offsets=offsets)
+            os.replace(self._file("ivf.tmp.npz"), self._file("ivf.npz"))
+        elif os.path.exists(self._file("ivf.npz")):
+            os.remove(self._file("ivf.npz"))
+        quant = settings.vector_index_quantization
+        if quant != "float":
+            vectors = np.memmap(tmp, dtype=np.float32, mode="r", shape=(n, dim)) if n else \
+                np.empty((0, dim), dtype=np.float32)
+            # written aside and swapped in: readers may still map the old codes.bin
+            scales = self._append_codes(vectors, quant, name="codes.tmp", mode="wb")
+            del vectors
+            if quant == "int8":
+                self._save_scales(scales if scales is not None else np.empty(0, np.float32))
+            os.replace(self._file("codes.tmp"), self._file("codes.bin"))
+        os.replace(tmp, self._file("vectors.f32"))
+        self._write_ids(ids, np.ones(n, dtype=bool))
+        self._write_meta(dim, n, quant)
+        self.load()
+        return {"chunks": n, "dim": dim, "ivf": n >= settings.vector_index_min_ivf, "quant": quant}
+
+    def refresh(self, graph) -> dict:
+        """
+        Incremental refresh after an ingest: new chunks are appended to the
+        brute-force tail, deleted ones are masked out. Rebuilds from scratch
+        once the tail or the deletions outgrow `VECTOR_INDEX_REBUILD_RATIO`.
+        The diff and the append run under one lock, so concurrent refreshes
+        never append the same chunk twice.
+        """
+        with self._lock:
+            if self._files_stamp() != self._stamp:
+                self._state = None  # changed on disk since we mapped it
+            if not self.loaded and not self.load():
+                return self._build(graph)
+            state = self._state
+            db_ids = graph.all_chunk_ids()
+            known = {cid: i for i, cid in enumerate(state.ids)}
+            live = {cid for cid, i in known.items() if state.alive[i]}
+            new = sorted(db_ids - live)
+            gone = live - db_ids
+
+            n_base = max(state.n_base, 1)
+            tail = len(state.ids) - state.n_base + len(new)
+            dead = int((~state.alive).sum()) + len(gone)
+            if (tail + dead) / n_base > settings.vector_index_rebuild_ratio \
+                    or state.quant != settings.vector_index_quantization:
+                return self._build(graph)
+
+            ids, alive = list(state.ids), state.alive.copy()
+            for cid in gone:
+                alive[known[cid]] = False
+            # rows past len(ids) are left over from a refresh that failed before
+            # ids.json was written; drop them so row i stays ids[i]
+            n, dim = len(state.ids), state.vectors.shape[1]
+            self._truncate("vectors.f32", n * dim * 4)
+            if state.codes is not None:
+                self._truncate("codes.bin", n * dim * state.codes.itemsize)
+            rows = []
+            with open(self._file("vectors.f32"), "ab") as f:
+                for cid, emb in graph.iter_chunk_embeddings(ids=new):
+                    vec = _normalize(np.asarray(emb, dtype=np.float32))
+                    f.write(vec.tobytes())
+                    rows.append(vec)
+                    ids.append(cid)
+            added = len(rows)
+            if state.quant != "float" and rows:
+                scales = self._append_codes(np.stack(rows), state.quant)
+                if scales is not None:
+                    self._save_scales(np.concatenate([state.scales, scales]))
+            alive = np.concatenate([alive, np.ones(added, dtype=bool)])
+            self._write_ids(ids, alive)
+            self.load()
+        return {"added": added, "removed": len(gone), "chunks": len(self)}
+
+    # ---------- search ----------
+    def search(self, query_vec, k: int = 10, nprobe: int = None, rescore: int = None) -> list[tuple[str, float]]:
+        """
+        Top-k (chunk id, score) pairs, best first. Scores are exact float32
+        cosines mapped to (1 + cos) / 2, the scale of the chunk_vec index.
+        """
+        s = self._state
+        if s is None or not len(s.ids):
+            return []
+        q = _normalize(np.asarray(query_vec, dtype=np.float32))
+        if s.centroids is None:
+            cand = np.arange(len(s.ids))
+        else:
+            nprobe = min(nprobe or settings.vector_index_nprobe, len(s.centroids))
+            probe = np.argpartition(-(s.centroids @ q), nprobe - 1)[:nprobe]
+            cand = np.concatenate(
+                [s.order[s.offsets[j]:s.offsets[j + 1]] for j in probe]
+                + [np.arange(s.n_base, len(s.ids))]
+            )
+            cand.sort()  # sequential reads from the memmap
+        cand = cand[s.alive[cand]]
+        if not len(cand):
+            return []
+        if s.codes is not None:
+            m = min(len(cand), k * (rescore or settings.vector_index_rescore))
+            approx = dequantize(s.codes[cand], s.scales[cand] if s.scales is not None else None) @ q
+            cand = np.sort(cand[np.argpartition(-approx, m - 1)[:m]])
+        scores = s.vectors[cand] @ q
+        k = min(k, len(cand))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(s.ids[cand[i]], (1 + float(scores[i])) / 2) for i in top]
+
+
+def main(argv: list[str]):
+    from src.storage.graph_db import Graph
+
+    cmd = argv[1] if len(argv) > 1 else "refresh"
+    g = Graph()
+    try:
+        index = LocalVectorIndex()
+        print(index.build(g) if cmd == "build" else index.refresh(g))
+    finally:
+        g.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
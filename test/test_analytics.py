@@ -0,0 +1,22 @@
+import numpy as np
+from scipy.sparse.csgraph import connected_components
+
+from src.analytics.graph_analytics import degree_centrality, label_propagation, pagerank, to_adjacency
+
+# two triangles joined by the edge 2-3, plus an isolated node 6
+ROWS, COLS = np.array([0, 0, 1, 3, 3, 4, 2]), np.array([1, 2, 2, 4, 5, 5, 3])
+
+
+def test_pagerank_is_a_distribution_favouring_bridges():
+    pr = pagerank(to_adjacency(7, ROWS, COLS))
+    assert abs(pr.sum() - 1) < 1e-9
+    assert pr.argmax() in (2, 3) and pr[6] == pr.min()
+
+
+def test_components_and_communities():
+    adj = to_adjacency(7, ROWS, COLS)
+    assert connected_components(adj, directed=False)[0] == 2
+    labels = label_propagation(adj)
+    assert len(set(labels[:3])) == 1 and len(set(labels[3:6])) == 1
+    assert labels[0] != labels[3] != labels[6]
+    np.testing.assert_allclose(degree_centrality(adj)[[2, 6]], [3 / 6, 0])
@@ -0,0 +1,38 @@
+import pytest
+
+from bench.corpus import make_corpus
+from bench.suite import compare, main
+from src.extraction.indicators import extract_indicators
+
+
+def test_corpus_is_reproducible_and_carries_indicators():
+    a, b = make_corpus(6, seed=3), make_corpus(6, seed=3)
+    assert [r.pages for r in a] == [r.pages for r in b]
+    assert make_corpus(6, seed=4)[0].pages != a[0].pages
+    for r in a:
+        found = {(x["type"], x["value"]) for page in r.pages for x in extract_indicators(page)}
+        for kind in ("domain", "url", "email"):
+            assert {(kind, v) for v in r.planted.get(kind, ())} <= found
+    # popular infrastructure recurs across documents
+    domains = [d for r in a for d in r.planted["domain"]]
+    assert len(set(domains)) < len(domains)
+
+
+def _report(**medians):
+    return {"results": [{"name": n, "size": 10, "median_ms": m} for n, m in medians.items()]}
+
+
+def test_compare_flags_only_meaningful_slowdowns():
+    base = _report(chunk=100.0, extract=100.0, tiny=0.2, gone=5.0)
+    cur = _report(chunk=140.0, extract=110.0, tiny=0.6, fresh=1.0)
+    status = {r["name"]: r["status"] for r in compare(cur, base, threshold=0.25, min_delta_ms=1.0)}
+    assert status == {"chunk": "regression", "extract": "ok", "tiny": "ok", "fresh": "new", "gone": "missing"}
+    assert compare(base, cur)[0]["status"] == "improved"
+
+
+def test_missing_baseline_is_a_clear_error(tmp_path, capsys):
+    missing = str(tmp_path / "baseline.json")
+    for argv in (["compare", str(tmp_path / "results.json"), missing], ["run", "--baseline", missing]):
+        with pytest.raises(SystemExit) as e:
+            main(argv)
+        assert e.value.code == 2 and "--update-baseline" in capsys.readouterr().err
@@ -0,0 +1,37 @@
+from langchain_core.documents import Document
+
+from src.preprocessing.chunking import chunk_text
+
+
+def _pages():
+    body = "Storm-1516 pushed stories through example.org and t.me/fakechannel. " * 40
+    return [Document(page_content=body, metadata={"page": i}) for i in range(3)]
+
+
+def test_chunk_ids_are_stable_and_unique():
+    first = chunk_text(_pages(), doc_id="doc_a")
+    second = chunk_text(_pages(), doc_id="doc_a")
+    ids = [c["id"] for c in first]
+    assert ids == [c["id"] for c in second]
+    assert len(set(ids)) == len(ids)  # repeated page text still gets distinct ids
+    assert all(i.startswith("doc_a:") for i in ids)
+
+
+def test_chunk_ids_differ_between_documents():
+    a = {c["id"] for c in chunk_text(_pages(), doc_id="doc_a")}
+    b = {c["id"] for c in chunk_text(_pages(), doc_id="doc_b")}
+    assert not a & b
+
+
+def test_chunk_ids_change_with_the_embedding_model(monkeypatch):
+    from src.config import settings
+
+    before = {c["id"] for c in chunk_text(_pages(), doc_id="doc_a")}
+    monkeypatch.setattr(settings, "embed_model", "another-model")
+    assert not before & {c["id"] for c in chunk_text(_pages(), doc_id="doc_a")}
+
+
+def test_chunks_record_page_offsets():
+    pages = _pages()
+    for c in chunk_text(pages, doc_id="doc_a"):
+        assert pages[c["page"]].page_content[c["start"]:c["end"]] == c["text"]
@@ -0,0 +1,23 @@
+from src.storage.graph_db import co_mention_delta
+
+
+def _weights(delta):
+    return {(a, b): w for a, b, w in delta}
+
+
+def test_first_ingest_adds_every_pair_once():
+    assert _weights(co_mention_delta(set(), {"a", "b", "c"})) == {("a", "b"): 1, ("a", "c"): 1, ("b", "c"): 1}
+
+
+def test_reingest_only_touches_changed_indicators():
+    delta = _weights(co_mention_delta({"a", "b", "c"}, {"a", "b", "d"}))
+    assert delta == {("a", "d"): 1, ("b", "d"): 1, ("a", "c"): -1, ("b", "c"): -1}
+    assert co_mention_delta({"a", "b"}, {"a", "b"}) == []
+
+
+def test_campaign_overlap_delta_sums_over_indicators():
+    from src.storage.graph_db import campaign_overlap_delta
+
+    old = {"x": {"A"}, "y": {"A", "B"}}
+    new = {"x": {"A", "B"}, "y": {"A"}, "z": {"B", "C"}}
+    assert sorted(campaign_overlap_delta(old, new)) == [["B", "C", 1]]
@@ -0,0 +1,141 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src import queries
+from src.config import settings
+from src.storage.embedded_db import AsyncEmbeddedGraph, EmbeddedGraph, fts_query
+from src.storage.graph_db import co_mention_delta
+
+
+def _vec(i, dim=8):
+    v = np.zeros(dim, dtype=np.float32)
+    v[i % dim] = 1.0
+    return v.tolist()
+
+
+def _ingest(g, doc_id, campaign, texts, indicators):
+    g.upsert_document({"id": doc_id, "path": f"{doc_id}.pdf"})
+    g.link_campaign(doc_id, campaign)
+    before = g.document_indicators(doc_id)
+    g.add_chunks_bulk(doc_id, [
+        {"id": f"{doc_id}:{i}", "text": t, "embedding": _vec(i)} for i, t in enumerate(texts)
+    ])
+    g.add_indicators_bulk([
+        {"value": v, "type": typ, "contextChunkId": f"{doc_id}:0", "chunkIds": [f"{doc_id}:0"]}
+        for v, typ in indicators
+    ], doc_id)
+    after = g.document_indicators(doc_id)
+    g.update_co_mentions(co_mention_delta(before, after))
+    g.refresh_campaign_summary(sorted(before | after))
+    g.bump_version()
+
+
+@pytest.fixture()
+def graph():
+    g = EmbeddedGraph(path="")
+    g.init_schema()
+    _ingest(g, "d1", "Doppelganger", ["fake news site spoofing le-monde", "telegram channel"],
+            [("lemonde.ltd", "domain"), ("@rrn_news", "social:telegram"), ("@bot_farm", "social:telegram")])
+    _ingest(g, "d2", "Storm-1516", ["video laundering via lemonde.ltd"],
+            [("lemonde.ltd", "domain"), ("@bot_farm", "social:telegram"), ("1.2.3.4", "ip")])
+    yield g
+    g.close()
+
+
+def test_writes_and_version(graph):
+    assert graph.version() == 2
+    assert graph.chunk_ids("d1") == {"d1:0", "d1:1"}
+    assert graph.document_indicators("d2") == {"lemonde.ltd", "@bot_farm", "1.2.3.4"}
+    assert graph.all_chunk_ids() == {"d1:0", "d1:1", "d2:0"}
+    assert dict(graph.iter_chunk_embeddings(ids=["d1:1"]))["d1:1"].tolist() == _vec(1)
+    assert graph.add_chunks_bulk("missing", [{"id": "x", "text": "x"}]) == 0
+    graph.relate("lemonde.ltd", "1.2.3.4")
+    assert graph.version() == 3
+
+
+def test_vector_and_hybrid_search(graph):
+    hits = graph.vector_search(_vec(1), k=2)
+    assert hits[0]["id"] == "d1:1" and hits[0]["_score"] == pytest.approx(1.0)
+    assert "embedding" not in hits[0]
+    hybrid = graph.hybrid_search("lemonde.ltd laundering", _vec(5), k=3)
+    assert hybrid[0]["id"] == "d2:0"
+    assert graph.hybrid_search("...", _vec(1), k=1)[0]["id"] == "d1:1"
+    assert fts_query('say "hi" -- now') == '"say" OR """hi""" OR "now"'
+
+
+def test_indicator_lookup_pages_and_context(graph):
+    assert [r["value"] for r in graph.indicator_lookup("social:telegram")] == ["@bot_farm", "@rrn_news"]
+    page = graph.indicator_page("social:telegram", limit=1)
+    rest = graph.indicator_page("social:telegram", cursor=page["next_cursor"], limit=1)
+    assert [r["value"] for r in page["results"] + rest["results"]] == ["@bot_farm", "@rrn_news"]
+    assert rest["next_cursor"] is None
+    assert [r["value"] for r in graph.iter_indicators("social:telegram")] == ["@bot_farm", "@rrn_news"]
+    ctx = graph.context_for_indicator("lemonde.ltd")
+    assert {(c["documentId"], c["chunkText"]) for c in ctx} == {
+        ("d1", "fake news site spoofing le-monde"), ("d2", "video laundering via lemonde.ltd")
+    }
+
+
+def test_delete_chunks_removes_mentions(graph):
+    assert graph.delete_chunks("d2", ["d2:0"]) == ["1.2.3.4", "@bot_farm", "lemonde.ltd"]
+    assert graph.chunk_ids("d2") == set() and graph.context_for_indicator("1.2.3.4") == []
+    assert [h["id"] for h in graph.vector_search(_vec(0), k=5)] == ["d1:0", "d1:1"]
+
+
+def test_bounded_traversal(graph):
+    t = graph.traverse("lemonde.ltd", hops=2)
+    related = {r["value"]: r["hop"] for r in t.related()}
+    assert related == {"@rrn_news": 2, "@bot_farm": 2, "1.2.3.4": 2}
+    small = graph.network("lemonde.ltd", hops=2, max_nodes=3)
+    assert small["truncated"] and len(small["nodes"]) == 3
+    assert graph.network("unknown", hops=1)["nodes"] == []
+
+
+def test_traversal_keeps_links_between_known_nodes(graph):
+    graph.relate("@bot_farm", "1.2.3.4")  # both first reached in the last hop
+    graph.relate("lemonde.ltd", "@rrn_news")  # hop 1 via RELATED_TO, then seen from d1
+    net = graph.network("lemonde.ltd", hops=2)
+    names = {n["id"]: n["value"] for n in net["nodes"]}
+    pairs = {frozenset((names[l["source"]], names[l["target"]])) for l in net["links"]}
+    assert frozenset(("@bot_farm", "1.2.3.4")) in pairs
+    assert frozenset(("@rrn_news", "d1")) in pairs
+    assert len(net["links"]) == len({l["id"] for l in net["links"]})
+
+
+def test_co_mentions_and_campaign_queries(graph):
+    assert {(r["a"], r["b"], r["w"]) for r in queries.clusters_by_handle(graph)} == {("@bot_farm", "@rrn_news", 1)}
+    across = {r["indicator"]: r["camps"] for r in queries.across_campaigns(graph)}
+    assert across == {"lemonde.ltd": ["Doppelganger", "Storm-1516"], "@bot_farm": ["Doppelganger", "Storm-1516"]}
+    shared = queries.shared_indicators(graph, "Doppelganger", "Storm-1516")
+    assert sorted(r["value"] for r in shared) == ["@bot_farm", "lemonde.ltd"]
+    assert queries.campaign_overlaps(graph, "Storm-1516") == [{"a": "Doppelganger", "b": "Storm-1516", "shared": 2}]
+    assert [r["documentId"] for r in queries.timeline(graph, "lemonde.ltd")] == ["d1", "d2"]
+
+    weights = {(r["a"], r["b"]): r["w"] for r in queries.clusters_by_handle(graph)}
+    assert graph.rebuild_co_mentions() == 1  # only social:* pairs by default (CO_MENTION_TYPES)
+    assert {(r["a"], r["b"]): r["w"] for r in queries.clusters_by_handle(graph)} == weights
+    assert graph.rebuild_campaign_summary() == 4
+    assert queries.campaign_overlaps(graph) == [{"a": "Doppelganger", "b": "Storm-1516", "shared": 2}]
+
+
+def test_co_mention_types(graph, monkeypatch):
+    assert graph.document_indicators("d2", ("social:",)) == {"@bot_farm"}
+    assert graph.document_indicators("d2", ("social:", "ip")) == {"@bot_farm", "1.2.3.4"}
+    monkeypatch.setattr(settings, "co_mention_types", "*")
+    assert graph.rebuild_co_mentions() == 5  # every distinct pair over both documents
+
+
+def test_async_wrapper(graph):
+    async def run():
+        ag = AsyncEmbeddedGraph(graph)
+        page = await ag.indicator_page("domain")
+        streamed = [r["value"] async for r in ag.stream_indicators("social:telegram")]
+        overlaps = await queries.campaign_overlaps(ag)
+        return page, streamed, overlaps, await ag.version()
+
+    page, streamed, overlaps, version = asyncio.run(run())
+    assert page["results"] == [{"value": "lemonde.ltd", "type": "domain"}]
+    assert streamed == ["@bot_farm", "@rrn_news"]
+    assert overlaps[0]["shared"] == 2 and version == 2
@@ -0,0 +1,56 @@
+import numpy as np
+
+from src.embedding.cache import EmbeddingCache, cache_key
+
+
+def test_key_normalizes_whitespace_and_includes_model():
+    assert cache_key("m", "a  b\n") == cache_key("m", "a b")
+    assert cache_key("m", "a b") != cache_key("other", "a b")
+
+
+def test_lru_eviction_and_stats():
+    cache = EmbeddingCache(max_entries=2, path=None)
+    vecs = {k: np.full(4, i, dtype=np.float32) for i, k in enumerate("abc")}
+    cache.put_many(vecs)
+    found = cache.get_many(["a", "b", "c"])
+    assert set(found) == {"b", "c"}  # "a" was evicted
+    stats = cache.stats()
+    assert stats["mem_hits"] == 2 and stats["misses"] == 1 and stats["mem_evictions"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "emb.sqlite")
+    cache = EmbeddingCache(max_entries=10, path=path)
+    cache.put_many({"k": np.arange(4, dtype=np.float32)})
+    cache.close()
+
+    reopened = EmbeddingCache(max_entries=10, path=path)
+    found = reopened.get_many(["k"])
+    np.testing.assert_array_equal(found["k"], np.arange(4, dtype=np.float32))
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_query_cache_coalesces_concurrent_misses():
+    import threading
+    import time
+
+    from src.embedding.cache import QueryVectorCache
+
+    cache = QueryVectorCache(max_entries=4)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return [1.0, 2.0]
+
+    threads = [threading.Thread(target=cache.get_or_compute, args=("q", compute)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    cache.get_or_compute("q", compute)
+
+    stats = cache.stats()
+    assert len(calls) == 1
+    assert stats["misses"] == 1 and stats["coalesced"] + stats["hits"] == 8
@@ -39,3 +39,79 @@ def test_semantic_search_returns_results(prepared_graph, embedder):
     results = prepared_graph.hybrid_search(query, vec, k=2)
     assert isinstance(results, list)
     assert len(results) > 0
+
+def test_bulk_writes(prepared_graph, embedder):
+    texts = ["bulk chunk one mentions example.org", "bulk chunk two"]
+    vecs = embedder.embed(texts)
+    chunks = [
+        {"id": f"doc_test_1_bulk_{i}", "text": t, "embedding": v}
+        for i, (t, v) in enumerate(zip(texts, vecs))
+    ]
+    assert prepared_graph.add_chunks_bulk("doc_test_1", chunks, batch_size=1) == 2
+    inds = [{"type": "domain", "value": "example.org", "contextChunkId": "doc_test_1_bulk_0"}]
+    assert prepared_graph.add_indicators_bulk(inds, "doc_test_1") == 1
+    with prepared_graph.driver.session() as s:
+        n = s.run(
+            "MATCH (c:Chunk)-[:PART_OF]->(:Document {id:'doc_test_1'}) "
+            "WHERE c.id STARTS WITH 'doc_test_1_bulk_' RETURN count(c) AS n"
+        ).single()["n"]
+        assert n == 2
+    ctx = prepared_graph.context_for_indicator("example.org")
+    assert any(r["chunkText"] == texts[0] for r in ctx)
+
+
+def test_hybrid_search_matches_keywords(prepared_graph, embedder):
+    text = "Infrastructure hosted on zz-unique-ioc-domain.org was reused."
+    prepared_graph.add_chunks_bulk(
+        "doc_test_1", [{"id": "doc_test_1_ioc", "text": text, "embedding": embedder.embed([text])[0]}]
+    )
+    query = "zz-unique-ioc-domain.org"
+    results = prepared_graph.hybrid_search(query, embedder.embed([query])[0], k=3)
+    assert results[0]["id"] == "doc_test_1_ioc"
+
+
+def test_network_is_bounded_around_hub(prepared_graph, monkeypatch):
+    from src.config import settings
+
+    monkeypatch.setattr(settings, "traversal_fanout", 3)
+    inds = [{"type": "domain", "value": "hub.example"}] + [
+        {"type": "domain", "value": f"leaf{i}.example"} for i in range(10)
+    ]
+    prepared_graph.add_indicators_bulk(inds, "doc_test_1")
+    net = prepared_graph.network("hub.example", hops=2, max_nodes=4)
+    assert len(net["nodes"]) == 4 and net["truncated"]
+    assert len({n["id"] for n in net["nodes"]}) == 4
+
+
+def test_co_mentions_follow_reingest(prepared_graph):
+    from src.pipeline import _finish_document
+
+    prepared_graph.upsert_document({"id": "doc_test_co"})
+    rows = [{"type": "social:x", "value": v} for v in ("@co_a", "@co_b", "@co_c")]
+    _finish_document(prepared_graph, "doc_test_co", rows, set())
+    weight_q = (
+        "MATCH (:Indicator {value:$a})-[r:CO_MENTIONED]->(:Indicator {value:$b}) RETURN r.weight AS w"
+    )
+    assert prepared_graph.fetch(weight_q, a="@co_a", b="@co_b") == [{"w": 1}]
+    assert prepared_graph.rebuild_co_mentions() > 0
+    assert prepared_graph.fetch(weight_q, a="@co_a", b="@co_b") == [{"w": 1}]
+
+
+def test_campaign_summary_answers_shared_lookup(prepared_graph):
+    from src.pipeline import _finish_document, _upsert_document
+    from src.queries import across_campaigns, shared_indicators
+
+    rows = [{"type": "domain", "value": "shared-camp.example"}]
+    for doc_id, campaign in (("doc_test_camp_a", "Test Camp A"), ("doc_test_camp_b", "Test Camp B")):
+        _upsert_document(prepared_graph, doc_id, f"{doc_id}.pdf", campaign)
+        _finish_document(prepared_graph, doc_id, rows, set())
+    shared = shared_indicators(prepared_graph, "Test Camp A", "Test Camp B")
+    assert [r["value"] for r in shared] == ["shared-camp.example"]
+    assert any(r["indicator"] == "shared-camp.example" for r in across_campaigns(prepared_graph))
+
+
+def test_query_plans_use_indexes(graph):
+    from src.storage.plan_check import check_plans, format_report
+
+    report = check_plans(graph)
+    assert not any(r["violations"] for r in report), format_report(report)
@@ -0,0 +1,31 @@
+import pytest
+
+from src.storage.graph_db import decode_keyset, indicator_lookup_query, indicator_page
+
+
+def test_page_trims_extra_row_and_cursor_resumes_after_it():
+    rows = [{"value": v, "type": "domain"} for v in ("a.com", "b.com", "c.com")]
+    page = indicator_page(rows, None, limit=2)
+    assert [r["value"] for r in page["results"]] == ["a.com", "b.com"]
+    assert decode_keyset(page["next_cursor"], None) == {"after_value": "b.com"}
+    assert indicator_page(rows, None, limit=3)["next_cursor"] is None
+
+
+def test_ranked_cursor_carries_score_and_rank():
+    rows = [{"value": "x", "score": 0.5}, {"value": "y", "score": 0.25}]
+    cursor = indicator_page(rows, "pagerank", limit=1)["next_cursor"]
+    assert decode_keyset(cursor, "pagerank") == {"after_score": 0.5, "after_value": "x"}
+    with pytest.raises(ValueError):
+        decode_keyset(cursor, None)
+    assert "$after_score" in indicator_lookup_query("pagerank", after=True)
+    assert "LIMIT" not in indicator_lookup_query(None, limit=False)
+
+
+def test_short_or_malformed_keyset_is_rejected():
+    import base64
+    import json
+
+    for token in ({"r": None, "k": []}, {"r": "pagerank", "k": [0.5]}, {"r": None, "k": "a.com"}):
+        cursor = base64.urlsafe_b64encode(json.dumps(token).encode()).decode()
+        with pytest.raises(ValueError):
+            decode_keyset(cursor, token["r"])
@@ -0,0 +1,34 @@
+from bench.extraction import reference_extract
+from src.extraction.indicators import (extract_for_chunks, extract_indicators,
+                                       extract_many)
+
+SAMPLES = [
+    "Visit https://Example.COM/path) or mail Admin@Evil-Site.org now.",
+    "Call +33 (1) 23-45-67-89 from 192.168.10.1; GA UA-123456-1, pub-1234567890123456.",
+    "Channels: t.me/FakeNews, twitter.com/@handle, https://www.youtube.com/@Chan.nel",
+    "linkedin.com/in/some.one vk.com/grp truthsocial.com/@Trump reddit.com/u/user_1",
+    "Aucun indicateur ici, seulement du texte accentué é à ü.",
+    "ſtrange ＵＡ-1234-1 and TikTok.com/@Mixed.Case facebook.com/page-1 instagram.com/x_y",
+    "",
+]
+
+
+def test_engine_matches_reference_loop():
+    for text in SAMPLES:
+        assert extract_indicators(text) == reference_extract(text)
+
+
+def test_extract_many_preserves_order():
+    assert extract_many(SAMPLES) == [reference_extract(t) for t in SAMPLES]
+
+
+def test_extract_for_chunks_maps_spans_to_chunks():
+    text = "intro text here. see example.org and example.net today"
+    chunks = [
+        {"id": "c0", "start": 0, "end": 28},   # ends inside "example.org"
+        {"id": "c1", "start": 20, "end": 40},  # overlaps c0, contains example.org
+        {"id": "c2", "start": 36, "end": len(text)},
+    ]
+    rows = {r["value"]: r for r in extract_for_chunks(text, chunks).values()}
+    assert rows["example.org"]["chunkIds"] == ["c1"]
+    assert rows["example.net"]["contextChunkId"] == "c2"
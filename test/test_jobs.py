@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from src import pipeline, registry
+from src.jobs.manager import JobConflict, JobManager
+
+
+@pytest.fixture
+def fake_pipeline(monkeypatch, tmp_path):
+    for name in ("a.pdf", "b.pdf", "notes.txt"):
+        (tmp_path / name).write_text("x")
+    release = threading.Event()
+
+    def process_pdfs(graph, pdf_paths, embedder, progress, should_stop, **kw):
+        for p in sorted(pdf_paths):
+            if not p.endswith(".pdf"):
+                continue
+            release.wait(5)
+            if should_stop():
+                break
+            progress(p[:-4], {"chunks": 10})
+
+    monkeypatch.setattr(pipeline, "process_pdfs", process_pdfs)
+    monkeypatch.setattr(registry, "get_graph", lambda: None)
+    monkeypatch.setattr(registry, "get_embedder", lambda: None)
+    return tmp_path, release
+
+
+def _wait(job):
+    for _ in range(500):
+        if job.status not in ("queued", "running"):
+            return
+        threading.Event().wait(0.01)
+
+
+def test_job_reports_progress_and_rejects_overlap(fake_pipeline):
+    data_dir, release = fake_pipeline
+    jobs = JobManager(workers=1)
+    job = jobs.submit(data_dir=str(data_dir))
+    with pytest.raises(JobConflict):
+        jobs.submit(data_dir=str(data_dir))
+    release.set()
+    _wait(job)
+
+    report = job.to_dict()
+    assert report["status"] == "succeeded"
+    assert report["progress"] == {"done": 2, "total": 2}
+    assert report["chunks"] == 20
+
+
+def test_overlap_is_keyed_on_documents_not_directories(fake_pipeline):
+    data_dir, release = fake_pipeline
+    same_names, disjoint = data_dir / "copy", data_dir / "other"
+    for d, name in ((same_names, "a.pdf"), (disjoint, "c.pdf")):
+        d.mkdir()
+        (d / name).write_text("x")
+    jobs = JobManager(workers=2)
+    job = jobs.submit(data_dir=str(data_dir))
+    with pytest.raises(JobConflict, match="documents a$"):
+        jobs.submit(data_dir=str(same_names))  # would write Document "a" concurrently
+    other = jobs.submit(data_dir=str(disjoint))
+    release.set()
+    _wait(job)
+    _wait(other)
+    assert other.status == "succeeded" and jobs.submit(data_dir=str(same_names))
+
+
+def test_cancel_stops_between_documents(fake_pipeline):
+    data_dir, release = fake_pipeline
+    jobs = JobManager(workers=1)
+    job = jobs.submit(data_dir=str(data_dir))
+    jobs.cancel(job.id)
+    release.set()
+    _wait(job)
+    assert job.status == "cancelled"
+    assert job.to_dict()["progress"]["done"] < 2
+
+
+def test_workers_are_validated_and_capped(fake_pipeline, monkeypatch):
+    from pydantic import ValidationError
+
+    from src.config import settings
+    from src.models.models import IngestRequest
+
+    with pytest.raises(ValidationError):
+        IngestRequest(workers=0)
+    monkeypatch.setattr(settings, "ingest_workers", 4)
+    data_dir, release = fake_pipeline
+    release.set()
+    job = JobManager(workers=1).submit(data_dir=str(data_dir), workers=100_000)
+    assert job.workers == 4
+    _wait(job)
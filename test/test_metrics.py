@@ -0,0 +1,63 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src import metrics
+from src.metrics import Counter, Histogram, instrument
+
+
+@pytest.fixture(autouse=True)
+def isolated_metrics(monkeypatch):
+    """Keep test metrics and series out of the process-wide registry."""
+    monkeypatch.setattr(metrics, "_REGISTRY", list(metrics._REGISTRY))
+    for metric in (metrics.GRAPH_CALL_SECONDS, metrics.GRAPH_CALL_ERRORS):
+        monkeypatch.setattr(metric, "_values", {})
+
+
+def test_histogram_and_counter_render_in_exposition_format():
+    h = Histogram("t_latency_seconds", "test", ("stage",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 5.0):
+        h.observe(v, "parse")
+    c = Counter("t_docs_total", "test", ("status",))
+    c.inc("ok")
+    c.inc("ok", amount=2)
+    text = "\n".join(h.render() + c.render())
+    assert '# TYPE t_latency_seconds histogram' in text
+    assert 't_latency_seconds_bucket{stage="parse",le="0.1"} 1' in text
+    assert 't_latency_seconds_bucket{stage="parse",le="1"} 2' in text
+    assert 't_latency_seconds_bucket{stage="parse",le="+Inf"} 3' in text
+    assert 't_latency_seconds_count{stage="parse"} 3' in text
+    assert 't_docs_total{status="ok"} 3' in text
+
+
+def test_instrument_times_calls_generators_and_errors():
+    @instrument("fake")
+    class G:
+        def ok(self):
+            return 1
+
+        def rows(self):
+            yield from range(3)
+
+        def boom(self):
+            raise RuntimeError
+
+    g = G()
+    assert g.ok() == 1 and list(g.rows()) == [0, 1, 2]
+    with pytest.raises(RuntimeError):
+        g.boom()
+    text = metrics.render()
+    for method in ("ok", "rows", "boom"):
+        assert f'tip_graph_call_seconds_count{{backend="fake",method="{method}"}} 1' in text
+    assert 'tip_graph_call_errors_total{backend="fake",method="boom"} 1' in text
+
+
+def test_metrics_endpoint_labels_requests_by_route_template():
+    from src.api.api import app
+
+    client = TestClient(app)
+    assert client.get("/health").status_code == 200
+    assert client.get("/jobs/nope").status_code == 404
+    r = client.get("/metrics")
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'tip_http_requests_total{method="GET",route="/health",status="200"}' in r.text
+    assert 'tip_http_requests_total{method="GET",route="/jobs/{job_id}",status="404"}' in r.text
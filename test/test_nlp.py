@@ -0,0 +1,8 @@
+from src.embedding.nlp import needs_multilingual
+
+
+def test_language_routing():
+    assert not needs_multilingual("The campaign targeted users in France with fake articles.")
+    assert not needs_multilingual("example.org 192.168.0.1")
+    assert needs_multilingual("Кампания распространяла фейковые новости")
+    assert needs_multilingual("La campagne a ciblé les utilisateurs français avec de faux articles.")
@@ -0,0 +1,39 @@
+import numpy as np
+from langchain_core.documents import Document
+
+from src.config import settings
+from src.pipeline import write_prepared
+from src.preprocessing.chunking import chunk_text
+from src.storage.embedded_db import EmbeddedGraph
+from src.storage.graph_db import EMBED_DIM
+
+
+class FakeEmbedder:
+    def __init__(self, value: float):
+        self.value, self.calls = value, 0
+
+    def embed_array(self, texts):
+        self.calls += len(texts)
+        return np.full((len(texts), EMBED_DIM), self.value, dtype=np.float32)
+
+
+def _prepared(doc_id: str) -> dict:
+    pages = [Document(page_content="Storm-1516 pushed stories through example.org. " * 30, metadata={"page": 0})]
+    return {"doc_id": doc_id, "path": f"{doc_id}.pdf", "chunks": chunk_text(pages, doc_id=doc_id),
+            "indicators": [], "prepare_s": 0.0}
+
+
+def test_model_change_rewrites_every_vector(monkeypatch):
+    g = EmbeddedGraph(path="")
+    g.init_schema()
+    old = FakeEmbedder(1.0)
+    write_prepared(g, old, _prepared("doc"))
+    assert write_prepared(g, old, _prepared("doc"))["embedded"] == 0  # unchanged chunks are kept
+
+    monkeypatch.setattr(settings, "embed_model", "another-model")
+    new = FakeEmbedder(2.0)
+    stats = write_prepared(g, new, _prepared("doc"))
+    assert stats["embedded"] == stats["chunks"] == stats["removed"] > 0
+    vectors = dict(g.iter_chunk_embeddings())
+    assert set(vectors) == g.chunk_ids("doc") and all(np.allclose(v, 2.0) for v in vectors.values())
+    g.close()
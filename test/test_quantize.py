@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from src.embedding.quantize import decode_embedding, dequantize, embedding_props, quantize
+
+
+def test_int8_roundtrip_error_is_small():
+    vecs = np.random.default_rng(0).standard_normal((50, 384)).astype(np.float32)
+    codes, scales = quantize(vecs, "int8")
+    assert codes.dtype == np.int8 and scales.shape == (50,)
+    assert np.abs(dequantize(codes, scales) - vecs).max() <= scales.max() / 2 + 1e-6
+
+
+def test_compact_props_replace_list_property():
+    vec = np.linspace(-1, 1, 8, dtype=np.float32)
+    props = embedding_props(vec, "packed")
+    assert props["embedding"] is None and props["embedding_q"] is None and props["embedding_scale"] is None
+    np.testing.assert_array_equal(decode_embedding(props["embedding_f32"]), vec)
+    assert embedding_props(vec, "float")["embedding_f32"] is None
+    with pytest.raises(ValueError):
+        embedding_props(vec, "int8")  # quantized codes only live in the local index
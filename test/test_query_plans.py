@@ -0,0 +1,42 @@
+from src import queries
+from src.storage.graph_db import Graph
+from src.storage.migrations import MIGRATIONS, pending
+from src.storage.plan_check import PROBES, capture, violations
+
+
+def _plan(op, *children, ids=()):
+    return {"operatorType": op, "identifiers": list(ids), "children": list(children)}
+
+
+def test_label_scan_is_flagged_unless_allowed():
+    plan = _plan("ProduceResults@neo4j", _plan("Filter@neo4j", _plan("NodeByLabelScan@neo4j", ids=["i"])))
+    assert violations(plan) == ["NodeByLabelScan ['i']"]
+    assert violations(plan, allow_scan=True) == []
+
+
+def test_cartesian_product_of_seeks_is_allowed():
+    seeks = _plan("CartesianProduct", _plan("NodeUniqueIndexSeek"), _plan("NodeUniqueIndexSeek"))
+    assert violations(_plan("ProduceResults", seeks)) == []
+    scan = _plan("CartesianProduct", _plan("NodeUniqueIndexSeek"), _plan("Filter", _plan("NodeIndexScan")))
+    assert violations(scan) == ["CartesianProduct over ['NodeUniqueIndexSeek', 'NodeIndexScan']"]
+
+
+def test_capture_records_queries_without_a_database():
+    g = Graph()
+    try:
+        driver = g.driver
+        captured = capture(g, lambda g: queries.campaign_overlaps(g, "A", limit=5))
+        assert g.driver is driver
+        assert len(captured) == 1 and captured[0][1] == {"c": "A", "limit": 5}
+        # every probe runs offline and issues at least one query
+        assert all(capture(g, fn) for _, fn, _ in PROBES)
+    finally:
+        g.close()
+
+
+def test_migrations_are_ordered_and_pending_skips_applied():
+    versions = [m.version for m in MIGRATIONS]
+    assert versions == sorted(set(versions))
+    assert [m.version for m in pending({1})] == versions[1:]
+    statements = [q for m in MIGRATIONS for q in m.statements]
+    assert len(statements) == len(set(statements))  # each index belongs to exactly one version
@@ -0,0 +1,73 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.response_cache import ResponseCache
+
+
+class FakeGraph:
+    def __init__(self):
+        self.v = 1
+
+    async def version(self):
+        return self.v
+
+
+def _client(max_entries=8, max_bytes=1 << 20, version_ttl_s=0):
+    graph, calls = FakeGraph(), []
+    app = FastAPI()
+    cache = ResponseCache(graph, max_entries=max_entries, version_ttl_s=version_ttl_s, max_bytes=max_bytes)
+    app.middleware("http")(cache)
+
+    @app.get("/indicators/{typ}")
+    async def indicators(typ: str):
+        calls.append(typ)
+        return {"typ": typ, "version": graph.v}
+
+    return TestClient(app), graph, calls, cache
+
+
+def test_hit_then_version_bump_misses():
+    client, graph, calls, _ = _client()
+    assert client.get("/indicators/ip").headers["X-Cache"] == "miss"
+    assert client.get("/indicators/ip").headers["X-Cache"] == "hit"
+    graph.v = 2
+    r = client.get("/indicators/ip")
+    assert r.headers["X-Cache"] == "miss" and r.json()["version"] == 2
+    assert calls == ["ip", "ip"]
+
+
+def test_etag_revalidation_and_eviction():
+    client, graph, calls, cache = _client(max_entries=1)
+    etag = client.get("/indicators/ip").headers["ETag"]
+    client.get("/indicators/domain")  # evicts /indicators/ip
+    assert client.get("/indicators/ip", headers={"If-None-Match": etag}).status_code == 304
+    graph.v = 2
+    assert client.get("/indicators/ip", headers={"If-None-Match": etag}).status_code == 200
+    assert cache.stats()["evictions"] >= 1 and cache.stats()["not_modified"] == 1
+
+
+def test_byte_budget_evicts_and_skips_oversized_bodies():
+    size = len(_client()[0].get("/indicators/ip").content)
+    client, _, _, cache = _client(max_bytes=size * 2)
+    for typ in ("ip", "md", "id"):  # equal-sized bodies
+        client.get(f"/indicators/{typ}")
+    assert cache.stats()["entries"] == 2 and cache.stats()["bytes"] <= size * 2
+    client, _, _, cache = _client(max_bytes=size - 1)
+    client.get("/indicators/ip")
+    assert cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
+
+
+def test_revalidation_rereads_a_cached_version():
+    client, graph, calls, _ = _client(version_ttl_s=3600)
+    etag = client.get("/indicators/ip").headers["ETag"]
+    graph.v = 2
+    assert client.get("/indicators/ip").headers["X-Cache"] == "hit"  # within the TTL window
+    r = client.get("/indicators/ip", headers={"If-None-Match": etag})
+    assert r.status_code == 200 and r.json()["version"] == 2
+
+
+def test_encoded_separators_do_not_collide():
+    client, _, calls, _ = _client()
+    assert client.get("/indicators/ip?a=1%26b%3D2").headers["X-Cache"] == "miss"
+    assert client.get("/indicators/ip?a=1&b=2").headers["X-Cache"] == "miss"
+    assert client.get("/indicators/ip?b=2&a=1").headers["X-Cache"] == "hit"
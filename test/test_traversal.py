@@ -0,0 +1,44 @@
+import pytest
+
+from src.storage.traversal import Traversal, decode_cursor
+
+
+def _row(nid, source, target, labels=("Indicator",), degree=1):
+    return {"nid": nid, "labels": list(labels), "value": nid, "degree": degree,
+            "rid": f"{source}-{target}", "type": "MENTIONED_IN", "source": source, "target": target}
+
+
+def _star(n_leaves=5, max_nodes=100):
+    t = Traversal(max_nodes)
+    t.seed({"nid": "seed", "labels": ["Indicator"], "value": "seed", "degree": 1})
+    t.add_hop([_row("doc", "seed", "doc", labels=("Document",), degree=n_leaves + 1)], 1)
+    t.add_hop([_row(f"i{k}", f"i{k}", "doc") for k in range(n_leaves)], 2)
+    return t
+
+
+def test_budget_truncates_and_dedups():
+    t = _star(max_nodes=4)
+    t.add_hop([_row("i0", "i0", "doc")], 3)  # already seen: no new node
+    assert list(t.nodes) == ["seed", "doc", "i0", "i1"]
+    assert t.truncated and t.done
+    assert [r["value"] for r in t.related()] == ["i0", "i1"]
+
+
+def test_pages_deliver_each_link_once_after_its_nodes():
+    t = _star()
+    nodes, links, cursor = [], [], None
+    while True:
+        p = t.network_page(cursor=cursor, limit=3)
+        nodes += [n["id"] for n in p["nodes"]]
+        assert all(link["source"] in nodes and link["target"] in nodes for link in p["links"])
+        links += p["links"]
+        if not (cursor := p["next_cursor"]):
+            break
+    assert nodes == list(t.nodes)
+    assert len(links) == len(t.links) == 6
+
+
+def test_bad_cursor():
+    assert decode_cursor(None) == 0
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
@@ -0,0 +1,168 @@
+import threading
+from itertools import islice
+
+import numpy as np
+import pytest
+
+from src.config import settings
+from src.storage.vector_index import LocalVectorIndex
+
+
+class FakeGraph:
+    def __init__(self, vectors: dict):
+        self.vectors = vectors
+
+    def all_chunk_ids(self):
+        return set(self.vectors)
+
+    def iter_chunk_embeddings(self, ids=None):
+        for cid in (self.vectors if ids is None else ids):
+            yield cid, self.vectors[cid]
+
+
+def _vectors(n, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    return {f"c{i}": rng.standard_normal(dim).tolist() for i in range(n)}
+
+
+def test_ivf_search_finds_exact_match(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "vector_index_min_ivf", 100)
+    vectors = _vectors(400)
+    index = LocalVectorIndex(str(tmp_path))
+    assert index.build(FakeGraph(vectors))["ivf"]
+
+    reopened = LocalVectorIndex(str(tmp_path))
+    assert reopened.load()
+    hits = reopened.search(vectors["c42"], k=3)
+    assert hits[0][0] == "c42" and abs(hits[0][1] - 1.0) < 1e-5
+
+
+def test_refresh_appends_and_masks(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "vector_index_rebuild_ratio", 1.0)
+    vectors = _vectors(20)
+    graph = FakeGraph(dict(vectors))
+    index = LocalVectorIndex(str(tmp_path))
+    index.build(graph)
+
+    del graph.vectors["c3"]
+    graph.vectors["new"] = vectors["c3"]
+    assert index.refresh(graph) == {"added": 1, "removed": 1, "chunks": 20}
+    assert index.search(vectors["c3"], k=1)[0][0] == "new"
+
+
+def test_int8_candidates_rescored_exactly(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "vector_index_quantization", "int8")
+    vectors = _vectors(200)
+    index = LocalVectorIndex(str(tmp_path))
+    index.build(FakeGraph(vectors))
+    assert index._state.codes.dtype == np.int8
+
+    hits = index.search(vectors["c7"], k=5)
+    assert hits[0][0] == "c7" and abs(hits[0][1] - 1.0) < 1e-5
+    exact = index._state.vectors[[int(cid[1:]) for cid, _ in hits]] @ index._state.vectors[7]
+    np.testing.assert_allclose([s for _, s in hits], (1 + exact) / 2, rtol=1e-5)
+
+
+def test_index_built_elsewhere_is_picked_up(tmp_path, monkeypatch):
+    from src.storage.graph_db import VectorIndexUnavailable, uses_local_index
+
+    monkeypatch.setattr(settings, "embed_storage", "packed")
+    api_side = LocalVectorIndex(str(tmp_path))
+    assert not api_side.load()
+    with pytest.raises(VectorIndexUnavailable):
+        uses_local_index(api_side)
+
+    vectors = _vectors(20)
+    LocalVectorIndex(str(tmp_path)).build(FakeGraph(vectors))  # e.g. the CLI
+    assert uses_local_index(api_side)
+    assert api_side.search(vectors["c5"], k=1)[0][0] == "c5"
+
+
+def test_failed_refresh_leaves_rows_aligned(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "vector_index_rebuild_ratio", 1.0)
+    monkeypatch.setattr(settings, "vector_index_quantization", "int8")
+    vectors = _vectors(30)
+    graph = FakeGraph({k: vectors[k] for k in list(vectors)[:20]})
+    index = LocalVectorIndex(str(tmp_path))
+    index.build(graph)
+
+    class Failing(FakeGraph):
+        def iter_chunk_embeddings(self, ids=None):
+            yield from islice(super().iter_chunk_embeddings(ids), 2)
+            raise ConnectionError
+
+    graph.vectors.update({k: vectors[k] for k in list(vectors)[20:]})
+    with pytest.raises(ConnectionError):
+        index.refresh(Failing(graph.vectors))
+    assert index.refresh(graph)["added"] == 10
+    for cid in ("c21", "c29"):
+        assert index.search(vectors[cid], k=1)[0][0] == cid
+
+
+def test_concurrent_refreshes_append_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "vector_index_rebuild_ratio", 1.0)
+    vectors = _vectors(30)
+    graph = FakeGraph({k: vectors[k] for k in list(vectors)[:20]})
+    index = LocalVectorIndex(str(tmp_path))
+    index.build(graph)
+    graph.vectors.update(vectors)
+
+    threads = [threading.Thread(target=index.refresh, args=(graph,)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(index._state.ids) == len(set(index._state.ids)) == 30
+
+
+def test_vector_routes_answer_503_without_an_index(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from src.api import api
+    from src.storage.graph_db import VectorIndexUnavailable
+
+    class NoIndexGraph:
+        async def ensure_schema(self):
+            pass
+
+        async def hybrid_search(self, *args, **kw):
+            raise VectorIndexUnavailable("no local index")
+
+    async def embed_query(q):
+        return [0.0]
+
+    monkeypatch.setattr(settings, "response_cache_size", 0)
+    monkeypatch.setattr(api, "get_async_graph", NoIndexGraph)
+    monkeypatch.setattr(api, "_embed_query", embed_query)
+    client = TestClient(api.app)
+    for path in ("/search?q=apt28", "/test/semantic"):
+        r = client.get(path)
+        assert r.status_code == 503 and r.json() == {"detail": "no local index"}
+
+
+def test_async_graph_searches_the_local_index_off_the_event_loop(tmp_path):
+    import asyncio
+
+    from src.storage.async_graph_db import AsyncGraph
+
+    vectors = _vectors(20)
+    index = LocalVectorIndex(str(tmp_path))
+    index.build(FakeGraph(vectors))
+    threads = []
+    search = index.search
+    index.search = lambda *a, **kw: threads.append(threading.current_thread()) or search(*a, **kw)
+
+    async def run():
+        ag = AsyncGraph(local_index=index)
+
+        async def fetch(q, ids):
+            return [{"chunk": {"id": cid}} for cid in ids]
+
+        ag.fetch = fetch
+        try:
+            return await ag.vector_search(vectors["c4"], k=2)
+        finally:
+            await ag.close()
+
+    hits = asyncio.run(run())
+    assert hits[0]["id"] == "c4" and threads and threads[0] is not threading.main_thread()